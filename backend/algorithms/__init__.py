@@ -6,8 +6,16 @@ This module contains implementations of various pathfinding algorithms:
 - Dijkstra's Algorithm
 - A* Algorithm
 - Bidirectional BFS
+- Jump Point Search
+- HPA* (hierarchical A* over a cached cluster abstraction)
+- Bidirectional Dijkstra and bidirectional A* (NBA*)
+- ALT (A* on landmark heuristics precomputed per grid)
+
+All of them run on the flat, array-backed GridGraph defined in grid.py.
+BFS, Dijkstra and A* switch to a compiled kernel when it is built (native.py).
 """
 
-from . import bfs, dfs, dijkstra, a_star, bi_bfs
+from . import grid, native, bfs, dfs, dijkstra, a_star, bi_bfs, jps, hpa_star, bidirectional, alt
+from .grid import GridGraph, as_graph
 
-__all__ = ['bfs', 'dfs', 'dijkstra', 'a_star', 'bi_bfs']
+__all__ = ['grid', 'native', 'bfs', 'dfs', 'dijkstra', 'a_star', 'bi_bfs', 'jps', 'hpa_star', 'bidirectional', 'alt', 'GridGraph', 'as_graph']
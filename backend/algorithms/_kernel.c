@@ -0,0 +1,414 @@
+/*
+ * Compiled search kernel for bfs.py, dijkstra.py and a_star.py (see
+ * native.py, which builds and loads it).
+ *
+ * It runs the same searches on the same padded GridGraph buffers and
+ * mirrors the Python loops step for step - a FIFO queue for BFS, bucket
+ * queues popped last-in-first-out for Dijkstra and A* (each with a heap of
+ * the keys of its non-empty buckets), neighbours tried in the order of
+ * GridGraph.offsets then GridGraph.diagonals - so it produces
+ * the same visit order, path and counters as the pure-Python versions,
+ * which stay the reference.
+ *
+ * A search is resumable: kernel_run() stops after a given number of
+ * expansions so the caller can hand out visited batches and check budgets
+ * between calls, like the *_steps generators do.
+ *
+ * A state can also be reused for any number of searches on the same grid:
+ * kernel_start() begins a new one without clearing the per-cell arrays.
+ * Each search has its own generation number, and a cell's entries only
+ * count for the search whose generation they were stamped with.
+ *
+ * kernel_field() uses the Dijkstra loop to flood a whole distance field,
+ * forwards or backwards, like distances.distance_field.
+ */
+
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+enum { KIND_BFS = 0, KIND_DIJKSTRA = 1, KIND_A_STAR = 2 };
+enum { RUN_PAUSED = 0, RUN_FOUND = 1, RUN_EXHAUSTED = 2, RUN_NO_MEMORY = -1 };
+
+typedef struct {
+    int kind;
+    const uint8_t *blocked;
+    const uint8_t *cost;   /* NULL when every cell costs 1 */
+    int32_t *parent;       /* owned by the caller; valid where seen */
+    int size, width;
+    int offsets[4];
+    int diagonals[4][3];   /* offset, side, other side */
+    int n_diagonals;
+    int corner_limit;
+    int straight, diagonal;  /* step cost per unit of cell cost */
+    int target, end_row, end_col;
+    int reverse;           /* charge each step the cost of the cell it leaves */
+
+    uint32_t generation;
+    uint32_t *seen;        /* generation that reached the cell (parent, g set) */
+    uint32_t *closed;      /* generation that expanded the cell */
+    int64_t *g;            /* Dijkstra / A*: tentative cost, valid where seen */
+
+    /* BFS: every cell is queued at most once, so a flat array will do */
+    int32_t *queue;
+    int64_t head, tail;
+
+    /* Dijkstra / A*: ring of LIFO buckets, as singly linked stacks over a
+     * growable pool of entries */
+    int ring;
+    int32_t *bucket_head;
+    int32_t *entry_cell, *entry_next;
+    int64_t pool_size, pool_used;
+    int32_t free_entry;
+    int64_t key;           /* current distance / f-score */
+    int64_t *pending;      /* binary min-heap of the keys of non-empty buckets ahead */
+    int64_t n_pending, pending_size;
+    int64_t queued;
+
+    int64_t nodes_expanded, peak_frontier, queue_pushes, stale_pops;
+} search_t;
+
+static int heuristic(const search_t *s, int index) {
+    int dr, dc;
+    if (s->kind != KIND_A_STAR)
+        return 0;
+    dr = index / s->width - s->end_row;
+    dc = index % s->width - s->end_col;
+    if (dr < 0) dr = -dr;
+    if (dc < 0) dc = -dc;
+    if (!s->n_diagonals)
+        return dr + dc;
+    if (dr < dc) { int t = dr; dr = dc; dc = t; }
+    return s->straight * dr + (s->diagonal - s->straight) * dc;
+}
+
+static int pending_push(search_t *s, int64_t key) {
+    int64_t i, parent;
+    if (s->n_pending == s->pending_size) {
+        int64_t grown = s->pending_size * 2;
+        int64_t *keys = realloc(s->pending, grown * sizeof(int64_t));
+        if (!keys) return -1;
+        s->pending = keys;
+        s->pending_size = grown;
+    }
+    for (i = s->n_pending++; i > 0 && s->pending[parent = (i - 1) / 2] > key; i = parent)
+        s->pending[i] = s->pending[parent];
+    s->pending[i] = key;
+    return 0;
+}
+
+/* The lowest pending key; the heap must not be empty. */
+static int64_t pending_pop(search_t *s) {
+    int64_t top = s->pending[0];
+    int64_t last = s->pending[--s->n_pending];
+    int64_t i = 0, child;
+    while ((child = 2 * i + 1) < s->n_pending) {
+        if (child + 1 < s->n_pending && s->pending[child + 1] < s->pending[child])
+            child++;
+        if (s->pending[child] >= last)
+            break;
+        s->pending[i] = s->pending[child];
+        i = child;
+    }
+    s->pending[i] = last;
+    return top;
+}
+
+static int push(search_t *s, int64_t key, int cell) {
+    int32_t entry;
+    int bucket = (int)(key % s->ring);
+    if (s->bucket_head[bucket] < 0 && pending_push(s, key) < 0)
+        return -1;
+    if (s->free_entry >= 0) {
+        entry = s->free_entry;
+        s->free_entry = s->entry_next[entry];
+    } else {
+        if (s->pool_used == s->pool_size) {
+            int64_t grown = s->pool_size * 2;
+            int32_t *cells = realloc(s->entry_cell, grown * sizeof(int32_t));
+            if (!cells) return -1;
+            s->entry_cell = cells;
+            int32_t *next = realloc(s->entry_next, grown * sizeof(int32_t));
+            if (!next) return -1;
+            s->entry_next = next;
+            s->pool_size = grown;
+        }
+        entry = (int32_t)s->pool_used++;
+    }
+    s->entry_cell[entry] = cell;
+    s->entry_next[entry] = s->bucket_head[bucket];
+    s->bucket_head[bucket] = entry;
+    s->queued++;
+    s->queue_pushes++;
+    return 0;
+}
+
+static int pop(search_t *s, int bucket) {
+    int32_t entry = s->bucket_head[bucket];
+    int cell = s->entry_cell[entry];
+    s->bucket_head[bucket] = s->entry_next[entry];
+    s->entry_next[entry] = s->free_entry;
+    s->free_entry = entry;
+    s->queued--;
+    return cell;
+}
+
+void kernel_free(search_t *s) {
+    if (!s) return;
+    free(s->seen);
+    free(s->closed);
+    free(s->g);
+    free(s->queue);
+    free(s->bucket_head);
+    free(s->entry_cell);
+    free(s->entry_next);
+    free(s->pending);
+    free(s);
+}
+
+/*
+ * diagonals holds n_diagonals (offset, side, other side) triples. ring is
+ * the bucket count the Python version uses; it is ignored for BFS. Call
+ * kernel_start() before each search.
+ */
+search_t *kernel_new(int kind, const uint8_t *blocked, const uint8_t *cost, int32_t *parent,
+                     int size, int width, const int *diagonals, int n_diagonals,
+                     int corner_limit, int straight, int diagonal, int ring) {
+    search_t *s = calloc(1, sizeof(search_t));
+    int i;
+    if (!s) return NULL;
+    s->kind = kind;
+    s->blocked = blocked;
+    s->cost = cost;
+    s->parent = parent;
+    s->size = size;
+    s->width = width;
+    s->offsets[0] = 1;
+    s->offsets[1] = width;
+    s->offsets[2] = -1;
+    s->offsets[3] = -width;
+    s->n_diagonals = n_diagonals;
+    for (i = 0; i < n_diagonals; i++) {
+        s->diagonals[i][0] = diagonals[3 * i];
+        s->diagonals[i][1] = diagonals[3 * i + 1];
+        s->diagonals[i][2] = diagonals[3 * i + 2];
+    }
+    s->corner_limit = corner_limit;
+    s->straight = straight;
+    s->diagonal = diagonal;
+    s->seen = calloc((size_t)size, sizeof(uint32_t));
+    if (!s->seen) goto fail;
+
+    if (kind == KIND_BFS) {
+        s->queue = malloc((size_t)size * sizeof(int32_t));
+        if (!s->queue) goto fail;
+        return s;
+    }
+
+    s->ring = ring;
+    s->closed = calloc((size_t)size, sizeof(uint32_t));
+    s->g = malloc((size_t)size * sizeof(int64_t));
+    s->bucket_head = malloc((size_t)ring * sizeof(int32_t));
+    s->pool_size = 1024;
+    s->entry_cell = malloc(s->pool_size * sizeof(int32_t));
+    s->entry_next = malloc(s->pool_size * sizeof(int32_t));
+    s->pending_size = 64;
+    s->pending = malloc(s->pending_size * sizeof(int64_t));
+    if (!s->closed || !s->g || !s->bucket_head || !s->entry_cell || !s->entry_next || !s->pending)
+        goto fail;
+    return s;
+
+fail:
+    kernel_free(s);
+    return NULL;
+}
+
+/* Begin a new search from source to target, dropping any previous one. */
+int kernel_start(search_t *s, int source, int target) {
+    int i;
+    if (++s->generation == 0) {
+        /* Wrapped around: old stamps could now look current */
+        memset(s->seen, 0, (size_t)s->size * sizeof(uint32_t));
+        if (s->closed)
+            memset(s->closed, 0, (size_t)s->size * sizeof(uint32_t));
+        s->generation = 1;
+    }
+    s->target = target;
+    s->end_row = target / s->width;
+    s->end_col = target % s->width;
+    s->nodes_expanded = 0;
+    s->peak_frontier = 1;
+    s->stale_pops = 0;
+    s->seen[source] = s->generation;
+    s->parent[source] = source;
+
+    if (s->kind == KIND_BFS) {
+        s->head = s->tail = 0;
+        s->queue[s->tail++] = source;
+        s->queue_pushes = 1;
+        return 0;
+    }
+
+    for (i = 0; i < s->ring; i++)
+        s->bucket_head[i] = -1;
+    s->pool_used = 0;
+    s->free_entry = -1;
+    s->queued = 0;
+    s->n_pending = 0;
+    s->g[source] = 0;
+    s->key = heuristic(s, source);
+    if (push(s, s->key, source) < 0)
+        return RUN_NO_MEMORY;
+    s->queue_pushes = 1;
+    return 0;
+}
+
+static int run_bfs(search_t *s, int32_t *visited, int64_t limit, int64_t *written) {
+    const uint8_t *blocked = s->blocked;
+    int32_t *parent = s->parent;
+    uint32_t *seen = s->seen;
+    uint32_t generation = s->generation;
+    int64_t count = 0;
+    int i;
+    while (s->head < s->tail) {
+        int current = s->queue[s->head++];
+        s->nodes_expanded++;
+        if (visited) visited[count] = current;
+        count++;
+        if (current == s->target) {
+            *written = count;
+            return RUN_FOUND;
+        }
+        for (i = 0; i < 4; i++) {
+            int neighbor = current + s->offsets[i];
+            if (!blocked[neighbor] && seen[neighbor] != generation) {
+                s->queue[s->tail++] = neighbor;
+                seen[neighbor] = generation;
+                parent[neighbor] = current;
+            }
+        }
+        for (i = 0; i < s->n_diagonals; i++) {
+            int neighbor = current + s->diagonals[i][0];
+            if (!blocked[neighbor] && seen[neighbor] != generation
+                    && blocked[current + s->diagonals[i][1]] + blocked[current + s->diagonals[i][2]]
+                       <= s->corner_limit) {
+                s->queue[s->tail++] = neighbor;
+                seen[neighbor] = generation;
+                parent[neighbor] = current;
+            }
+        }
+        if (s->tail - s->head > s->peak_frontier)
+            s->peak_frontier = s->tail - s->head;
+        if (count == limit) {
+            *written = count;
+            return RUN_PAUSED;
+        }
+    }
+    *written = count;
+    return RUN_EXHAUSTED;
+}
+
+static int relax(search_t *s, int current, int neighbor, int64_t step) {
+    int64_t tentative = s->g[current] + step;
+    if (s->seen[neighbor] != s->generation || tentative < s->g[neighbor]) {
+        s->seen[neighbor] = s->generation;
+        s->g[neighbor] = tentative;
+        s->parent[neighbor] = current;
+        return push(s, tentative + heuristic(s, neighbor), neighbor);
+    }
+    return 0;
+}
+
+static int run_weighted(search_t *s, int32_t *visited, int64_t limit, int64_t *written) {
+    const uint8_t *blocked = s->blocked;
+    const uint8_t *cost = s->cost;
+    uint32_t *closed = s->closed;
+    uint32_t generation = s->generation;
+    int64_t count = 0;
+    int i;
+    while (s->queued) {
+        int bucket = (int)(s->key % s->ring);
+        int current;
+        if (s->bucket_head[bucket] < 0) {
+            s->key = pending_pop(s);
+            continue;
+        }
+        current = pop(s, bucket);
+        if (closed[current] == generation) {
+            s->stale_pops++;
+            continue;
+        }
+        closed[current] = generation;
+        s->nodes_expanded++;
+        if (visited) visited[count] = current;
+        count++;
+        if (current == s->target) {
+            *written = count;
+            return RUN_FOUND;
+        }
+        for (i = 0; i < 4; i++) {
+            int neighbor = current + s->offsets[i];
+            if (blocked[neighbor] || closed[neighbor] == generation)
+                continue;
+            if (relax(s, current, neighbor,
+                      (int64_t)(cost ? cost[s->reverse ? current : neighbor] : 1) * s->straight) < 0)
+                return RUN_NO_MEMORY;
+        }
+        for (i = 0; i < s->n_diagonals; i++) {
+            int neighbor = current + s->diagonals[i][0];
+            if (blocked[neighbor] || closed[neighbor] == generation
+                    || blocked[current + s->diagonals[i][1]] + blocked[current + s->diagonals[i][2]]
+                       > s->corner_limit)
+                continue;
+            if (relax(s, current, neighbor,
+                      (int64_t)(cost ? cost[s->reverse ? current : neighbor] : 1) * s->diagonal) < 0)
+                return RUN_NO_MEMORY;
+        }
+        if (s->queued > s->peak_frontier)
+            s->peak_frontier = s->queued;
+        if (count == limit) {
+            *written = count;
+            return RUN_PAUSED;
+        }
+    }
+    *written = count;
+    return RUN_EXHAUSTED;
+}
+
+/*
+ * Expand up to limit cells (limit <= 0: until done), writing each to
+ * visited if it is not NULL. *written is set to the number expanded.
+ */
+int kernel_run(search_t *s, int32_t *visited, int64_t limit, int64_t *written) {
+    if (s->kind == KIND_BFS)
+        return run_bfs(s, visited, limit, written);
+    return run_weighted(s, visited, limit, written);
+}
+
+/*
+ * Distance from source (to source if reverse) of every cell, -1 where
+ * unreachable, written to out; the state must be a Dijkstra one. Returns
+ * RUN_EXHAUSTED or RUN_NO_MEMORY.
+ */
+int kernel_field(search_t *s, int source, int reverse, int64_t *out) {
+    int64_t written;
+    int status, i;
+    if (kernel_start(s, source, -1) < 0)
+        return RUN_NO_MEMORY;
+    s->reverse = reverse;
+    status = run_weighted(s, NULL, 0, &written);
+    s->reverse = 0;
+    if (status < 0)
+        return status;
+    for (i = 0; i < s->size; i++)
+        out[i] = s->seen[i] == s->generation ? s->g[i] : -1;
+    return status;
+}
+
+/* nodes_expanded, peak_frontier, queue_pushes, stale_pops */
+void kernel_stats(const search_t *s, int64_t *out) {
+    out[0] = s->nodes_expanded;
+    out[1] = s->peak_frontier;
+    out[2] = s->queue_pushes;
+    out[3] = s->stale_pops;
+}
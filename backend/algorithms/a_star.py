@@ -2,106 +2,200 @@
 
 A* is an informed search algorithm that uses both the actual cost from start (g-score)
 and an estimated cost to the goal (h-score) to find the optimal path efficiently.
+
+Like dijkstra.py it keeps its open set in a bucket queue keyed by f-score.
+Every step costs at least 1 and the Manhattan heuristic changes by exactly
+1 per step, so a neighbour's f-score is between 0 and max_cost + 1 above the
+current one and a ring of max_cost + 2 buckets is enough. Each bucket is a
+stack, so among equal f-scores the most recently reached (deepest) cell is
+expanded first.
+
+With diagonal movement costs are in the scaled units of grid.py and the
+heuristic is the octile distance, STRAIGHT per step along the longer axis
+plus DIAGONAL - STRAIGHT per step along the shorter one. It changes by at
+most STRAIGHT per orthogonal and DIAGONAL per diagonal step, so it stays
+consistent and the ring only needs max_step_cost() + DIAGONAL + 1 buckets.
 """
 
-from typing import List, Tuple
-import heapq
+from array import array
+from heapq import heappop, heappush
+from typing import Generator, List, Tuple, Union
 import time
 
+from . import native
+from .grid import DIAGONAL, STRAIGHT, GridGraph, as_graph, run_steps, search_result
+
 
-def a_star(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> dict:
+def a_star(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+           record: bool = True) -> dict:
     """Find the shortest path from start to end using A* algorithm.
-    
+
     Args:
-        grid: 2D list where 0 represents an open cell and 1 represents a wall
+        grid: 2D list where 0 represents an open cell, 1 a wall and 2-255 an
+            open cell with that step cost, or an already-built GridGraph
         start: Starting position as (row, col) tuple
         end: Target position as (row, col) tuple
-        
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
     Returns:
         Dictionary containing:
         - found: Boolean indicating if a path was found
         - time_taken: Execution time in seconds
         - nodes_expanded: Number of nodes explored
         - path: List of (row, col) tuples representing the optimal path
+        - path_cost: Total step cost of path
         - visited: List of (row, col) tuples in order of exploration
     """
-    def is_valid(row: int, col: int) -> bool:
-        """Check if a position is within grid bounds and not a wall."""
-        return 0 <= row < m and 0 <= col < n and grid[row][col] == 0
+    return run_steps(a_star_steps(grid, start, end, record=record))
+
+
+def a_star_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+                 batch_size: int = 0, record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of a_star that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record: As for a_star
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The a_star result dict (via StopIteration), whose visited list holds
+        only the cells not already yielded. time_taken excludes time spent
+        suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    blocked = graph.blocked
+    cost, diagonal_cost = graph.step_costs()
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    width = graph.width
+    source = graph.index(*start)
+    target = graph.index(*end)
+    # The compiled kernel runs this same loop, when it is built (see native.py)
+    if native.available():
+        return (yield from native.search_steps(native.A_STAR, graph, source, target, batch_size, record, grid_ns))
+    # Padded coordinates of the goal; only differences matter for the heuristic
+    end_row, end_col = divmod(target, width)
 
-    def heuristic(r: int, c: int) -> int:
-        """Calculate Manhattan distance heuristic (admissible for grid movement)."""
-        return abs(r - end[0]) + abs(c - end[1])
+    def heuristic(index: int) -> int:
+        """Calculate Manhattan distance heuristic (admissible, as no step costs less than 1)."""
+        r, c = divmod(index, width)
+        return abs(r - end_row) + abs(c - end_col)
 
-    m, n = len(grid), len(grid[0])
-    visited_order = []
+    if diagonals:
+        def heuristic(index: int) -> int:
+            """Octile distance in scaled units (see the module docstring)."""
+            r, c = divmod(index, width)
+            dr, dc = abs(r - end_row), abs(c - end_col)
+            if dr < dc:
+                dr, dc = dc, dr
+            return STRAIGHT * dr + (DIAGONAL - STRAIGHT) * dc
+
+    visited_order = array("i")
     nodes_expanded = 0
-    start_time = time.time()
+    peak_frontier = 1
+    queue_pushes = 1  # the start node
+    stale_pops = 0
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
 
-    # Priority queue: (f_score, g_score, position)
+    # Bucket queue: buckets[f % ring] holds the cells queued with that
     # f_score = g_score + heuristic (total estimated cost)
-    open_set = []
-    heapq.heappush(open_set, (heuristic(*start), 0, start))
-    came_from = {start: None}  # Track path reconstruction
-    g_score = {start: 0}  # Actual cost from start to each node
-    visited = set()  # Closed set - nodes already explored
-
-    # 4-directional movement: right, down, left, up
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-
-    while open_set:
-        _, current_g, current = heapq.heappop(open_set)
-        
-        # Skip if already processed (can happen with duplicate entries in heap)
-        if current in visited:
+    ring = graph.max_step_cost() + (DIAGONAL if diagonals else 1) + 1
+    f = heuristic(source)
+    buckets = [[] for _ in range(ring)]
+    buckets[f % ring].append(source)
+    pending = []  # f-scores of the non-empty buckets ahead, lowest first
+    queued = 1  # entries across all buckets, stale ones included
+    came_from = graph.new_parents()  # Track path reconstruction
+    came_from[source] = source
+    g_score = array("q", [-1]) * graph.size  # Actual cost from start, -1 = unknown
+    g_score[source] = 0
+    closed = bytearray(graph.size)  # Closed set - nodes already explored
+
+    while queued:
+        bucket = buckets[f % ring]
+        if not bucket:
+            f = heappop(pending)
+            continue
+        current = bucket.pop()
+        queued -= 1
+
+        # Skip if already processed (can happen with duplicate entries in the queue)
+        if closed[current]:
+            stale_pops += 1
             continue
-            
+
         nodes_expanded += 1
-        visited_order.append(current)
-        visited.add(current)
+        if record:
+            visited_order.append(current)
+        closed[current] = 1
 
         # Goal reached - reconstruct and return path
-        if current == end:
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = came_from[node]
-            path.reverse()
-            end_time = time.time()
-            return {
-                "found": True,
-                "time_taken": end_time - start_time,
-                "nodes_expanded": nodes_expanded,
-                "path": path,
-                "visited": visited_order
-            }
+        if current == target:
+            stop_ns = time.perf_counter_ns()
+            return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                 graph.path_to(came_from, target),
+                                 grid_ns=grid_ns, peak_frontier=peak_frontier,
+                                 queue_pushes=queue_pushes, stale_pops=stale_pops)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
+
+        current_g = g_score[current]
 
         # Explore neighbors
-        for dr, dc in directions:
-            nr, nc = current[0] + dr, current[1] + dc
-            neighbor = (nr, nc)
-            
+        for offset in offsets:
+            neighbor = current + offset
+
             # Skip invalid positions or already visited nodes
-            if not is_valid(nr, nc) or neighbor in visited:
+            if blocked[neighbor] or closed[neighbor]:
                 continue
 
             # Calculate new g_score (cost from start to neighbor)
-            tentative_g = current_g + 1
-            
+            tentative_g = current_g + cost[neighbor]
+
             # If we found a better path to this neighbor, update it
-            if tentative_g < g_score.get(neighbor, float('inf')):
+            known = g_score[neighbor]
+            if known < 0 or tentative_g < known:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g
+                f_score = tentative_g + heuristic(neighbor)
+                bucket = buckets[f_score % ring]
+                if not bucket:
+                    heappush(pending, f_score)
+                bucket.append(neighbor)
+                queued += 1
+                queue_pushes += 1
+        for offset, side, other_side in diagonals:
+            neighbor = current + offset
+            if (blocked[neighbor] or closed[neighbor]
+                    or blocked[current + side] + blocked[current + other_side] > corner_limit):
+                continue
+            tentative_g = current_g + diagonal_cost[neighbor]
+            known = g_score[neighbor]
+            if known < 0 or tentative_g < known:
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g
-                f_score = tentative_g + heuristic(nr, nc)
-                heapq.heappush(open_set, (f_score, tentative_g, neighbor))
+                f_score = tentative_g + heuristic(neighbor)
+                bucket = buckets[f_score % ring]
+                if not bucket:
+                    heappush(pending, f_score)
+                bucket.append(neighbor)
+                queued += 1
+                queue_pushes += 1
+        if queued > peak_frontier:
+            peak_frontier = queued
 
     # No path found
-    end_time = time.time()
-    return {
-        "found": False,
-        "time_taken": end_time - start_time,
-        "nodes_expanded": nodes_expanded,
-        "path": [],
-        "visited": visited_order
-    }
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier,
+                         queue_pushes=queue_pushes, stale_pops=stale_pops)
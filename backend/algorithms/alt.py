@@ -0,0 +1,372 @@
+"""A* with landmark heuristics (ALT).
+
+On maze-like grids the Manhattan (or octile) estimate ignores every wall,
+so A* expands nearly as much as Dijkstra. ALT - A*, Landmarks and the
+Triangle inequality (Goldberg and Harrelson, "Computing the shortest path:
+A* search meets graph theory", 2005) - instead precomputes exact distances
+from a few landmark cells L and bounds the remaining cost with
+
+    d(v, end) >= d(L, end) - d(L, v)      and      d(v, end) >= d(v, L) - d(end, L)
+
+The heuristic is the largest of these over all landmarks and of the usual
+Manhattan / octile estimate, so it is never looser than a_star.py's. Each
+bound is consistent, hence so is their maximum, and the search is
+a_star.py's with its bucket queue. A heuristic that follows real distances
+changes by up to a whole step cost between neighbours rather than by one
+unit, so the ring holds 2 * max_step_cost() + 1 buckets.
+
+Landmarks are chosen by farthest selection: the first is the cell farthest
+from an arbitrary cell of the largest component, each next one the cell
+farthest from its nearest chosen landmark, so they sit around the edge of
+the reachable area, where they bound the most pairs. Cells outside the
+largest component only get the Manhattan / octile estimate.
+
+The landmarks depend only on the grid and its movement rules, so like
+HPA*'s abstraction they are built once per grid content (cached by digest)
+and reused by every later query in the same process. Searches run in the
+worker pool (see workers.py) and each worker keeps its own cache, so a
+worker that has not seen a grid yet builds the landmarks again. Each
+landmark's distances are flooded with the compiled kernel when it is built
+(native.py), else with distances.distance_field, and kept in the smallest
+unsigned type that holds them. Without terrain every step costs the same both ways and the
+backward distances are the forward ones, so they are not stored twice.
+
+A query only picks the landmarks that bound its endpoints; each cell's
+estimate is worked out the first time the search reaches it and kept for
+the rest of the query, so a query costs time in the cells it touches, not
+in the size of the grid. The search itself always runs the Python loop
+below.
+"""
+
+from array import array
+from collections import OrderedDict
+from heapq import heappop, heappush
+from typing import Callable, Generator, List, Optional, Tuple, Union
+import threading
+import time
+
+import numpy as np
+
+from . import native
+from .components import ComponentIndex
+from .distances import distance_field
+from .grid import DIAGONAL, STRAIGHT, GridGraph, as_graph, run_steps, search_result
+
+
+# Landmarks per grid
+LANDMARKS = 8
+
+# Landmark sets kept, least recently used first out, and the most memory
+# their distance arrays may hold together; a set larger than that on its
+# own is not kept. The bound is per process: every search worker has its
+# own cache, so with the default 4 workers they hold up to 256 MiB
+_CACHE_ENTRIES = 8
+_CACHE_BYTES = 64 * 1024 * 1024
+_cache: "OrderedDict[tuple, LandmarkIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class LandmarkIndex:
+    """Distances between the landmarks of a grid and every cell.
+
+    Attributes:
+        landmarks: Flat indices of the landmarks
+        forward: landmarks x cells array, the distance from each landmark to
+            each cell; the dtype's maximum marks cells it cannot reach
+        backward: The same for the distance from each cell to each
+            landmark; forward itself on a grid without terrain
+        build_ns: Time it took to build
+    """
+
+    __slots__ = ("landmarks", "forward", "backward", "build_ns")
+
+    def __init__(self, landmarks: List[int], forward: np.ndarray, backward: np.ndarray, build_ns: int = 0):
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.build_ns = build_ns
+
+    @classmethod
+    def build(cls, graph: GridGraph, count: int = LANDMARKS) -> "LandmarkIndex":
+        """Choose up to count landmarks for graph and measure their distances
+        (see the module docstring)."""
+        began = time.perf_counter_ns()
+        labels = ComponentIndex.build(graph).labels
+        if not (labels >= 0).any():
+            empty = np.empty((0, graph.size), dtype=np.uint16)
+            return cls([], empty, empty, time.perf_counter_ns() - began)
+        largest = np.bincount(labels[labels >= 0]).argmax()
+        weighted = graph.cost is not None
+        kernel = native.Kernel(native.DIJKSTRA, graph) if native.available() else None
+        landmarks: List[int] = []
+        forward: List[np.ndarray] = []
+        backward: List[np.ndarray] = []
+        try:
+            # Farthest selection: nearest[v] is v's distance from the closest
+            # landmark so far (from the seed cell before there is one)
+            nearest = _flood(graph, kernel, int(np.argmax(labels == largest)), False)
+            for _ in range(count):
+                landmark = int(np.argmax(nearest))
+                if landmarks and nearest[landmark] <= 0:
+                    break  # every cell of the component is a landmark
+                field = _flood(graph, kernel, landmark, False)
+                landmarks.append(landmark)
+                forward.append(field)
+                if weighted:
+                    backward.append(_flood(graph, kernel, landmark, True))
+                nearest = field if len(landmarks) == 1 else np.minimum(nearest, field)
+        finally:
+            if kernel is not None:
+                kernel.close()
+
+        forward_array = _compact(forward)
+        backward_array = _compact(backward) if weighted else forward_array
+        return cls(landmarks, forward_array, backward_array, time.perf_counter_ns() - began)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the distance arrays."""
+        if self.backward is self.forward:
+            return self.forward.nbytes
+        return self.forward.nbytes + self.backward.nbytes
+
+    def estimator(self, graph: GridGraph, source: int, target: int) -> Callable[[int], int]:
+        """Lower bound on the cost from a cell to target, as a function of
+        the cell's flat index, for a search from source.
+
+        Only landmarks that reach both source and target are used. Others
+        could only tighten the bound on cells the search never reaches, and
+        would let a start on a wall - searched from like an open cell, but
+        in no landmark's component - see its neighbours' estimates leap.
+        """
+        width = graph.width
+        end_row, end_col = divmod(target, width)
+        diagonal = bool(graph.diagonals)
+        unreached = np.iinfo(self.forward.dtype).max
+        # (d(L, v) by cell, d(L, end), d(v, L) by cell, d(end, L)) per landmark,
+        # as memoryviews, which index to plain ints much faster than arrays
+        bounds = []
+        for i in range(len(self.landmarks)):
+            forward = memoryview(self.forward[i])
+            backward = memoryview(self.backward[i])
+            if forward[target] == unreached or forward[source] == unreached:
+                continue
+            bounds.append((forward, forward[target], backward, backward[target]))
+
+        def estimate(cell: int) -> int:
+            row, col = divmod(cell, width)
+            dr = abs(row - end_row)
+            dc = abs(col - end_col)
+            if diagonal:
+                h = STRAIGHT * max(dr, dc) + (DIAGONAL - STRAIGHT) * min(dr, dc)
+            else:
+                h = dr + dc
+            for forward, from_landmark, backward, to_landmark in bounds:
+                distance = forward[cell]
+                if distance == unreached:
+                    continue
+                if from_landmark - distance > h:
+                    h = from_landmark - distance
+                if backward[cell] - to_landmark > h:
+                    h = backward[cell] - to_landmark
+            return h
+
+        return estimate
+
+
+def _flood(graph: GridGraph, kernel: Optional[native.Kernel], root: int, reverse: bool) -> np.ndarray:
+    """int64 distance field of graph from (to, if reverse) root, -1 where
+    unreachable - on kernel if the compiled kernel is built."""
+    if kernel is not None:
+        return np.frombuffer(kernel.field(root, reverse), dtype=np.int64)
+    return np.frombuffer(distance_field(graph, root, reverse=reverse)[0], dtype=np.int64)
+
+
+def _compact(fields: List[np.ndarray]) -> np.ndarray:
+    """Stack int64 distance fields (-1 = unreached) into the smallest
+    unsigned type that holds them, the type's maximum marking unreached."""
+    stacked = np.stack(fields)
+    farthest = stacked.max()
+    dtype = next(t for t in (np.uint16, np.uint32, np.uint64) if farthest < np.iinfo(t).max)
+    compact = stacked.astype(dtype)
+    compact[stacked < 0] = np.iinfo(dtype).max
+    return compact
+
+
+def landmark_index(graph: GridGraph, count: int = LANDMARKS) -> Tuple[LandmarkIndex, bool]:
+    """The LandmarkIndex of graph, from the cache if it was built before.
+
+    Returns:
+        The index and whether it came from the cache
+    """
+    key = (graph.digest(), len(graph.diagonals), graph.corner_limit, count)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index, True
+    index = LandmarkIndex.build(graph, count)
+    if index.nbytes > _CACHE_BYTES:
+        return index, False
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > _CACHE_ENTRIES or sum(i.nbytes for i in _cache.values()) > _CACHE_BYTES:
+            _cache.popitem(last=False)
+    return index, False
+
+
+def alt(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+        landmarks: int = LANDMARKS, record: bool = True) -> dict:
+    """Find the cheapest path from start to end with A* on landmark heuristics.
+
+    Args:
+        grid: 2D list where 0 represents an open cell, 1 a wall and 2-255 an
+            open cell with that step cost, or an already-built GridGraph
+        start: Starting position as (row, col) tuple
+        end: Target position as (row, col) tuple
+        landmarks: Number of landmarks to pick for the grid
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
+    Returns:
+        Dictionary containing:
+        - found: Boolean indicating if a path was found
+        - time_taken: Execution time in seconds, excluding building the landmarks
+        - nodes_expanded: Number of nodes explored
+        - path: List of (row, col) tuples representing the cheapest path
+        - path_cost: Total step cost of path
+        - visited: List of (row, col) tuples in order of exploration
+        - profile: also holds landmarks_ns (time spent choosing the
+          landmarks and measuring their distances, 0 when they were
+          cached) and landmarks (how many there are)
+    """
+    return run_steps(alt_steps(grid, start, end, landmarks=landmarks, record=record))
+
+
+def alt_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+              batch_size: int = 0, landmarks: int = LANDMARKS,
+              record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of alt that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, landmarks, record: As for alt
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The alt result dict (via StopIteration), whose visited list holds
+        only the cells not already yielded. time_taken excludes time spent
+        suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    index, cached = landmark_index(graph, landmarks)
+    landmarks_ns = 0 if cached else index.build_ns
+    blocked = graph.blocked
+    cost, diagonal_cost = graph.step_costs()
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    source = graph.index(*start)
+    target = graph.index(*end)
+
+    visited_order = array("i")
+    nodes_expanded = 0
+    peak_frontier = 1
+    queue_pushes = 1  # the start node
+    stale_pops = 0
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
+    estimate = index.estimator(graph, source, target)
+    heuristic = {source: estimate(source)}  # estimates of the cells reached so far
+
+    # Bucket queue over f-scores, as in a_star.py
+    ring = 2 * graph.max_step_cost() + 1
+    f = heuristic[source]
+    buckets = [[] for _ in range(ring)]
+    buckets[f % ring].append(source)
+    pending = []  # f-scores of the non-empty buckets ahead, lowest first
+    queued = 1  # entries across all buckets, stale ones included
+    came_from = graph.new_parents()
+    came_from[source] = source
+    g_score = array("q", [-1]) * graph.size  # -1 = unknown
+    g_score[source] = 0
+    closed = bytearray(graph.size)
+    profile = {"grid_ns": grid_ns, "landmarks_ns": landmarks_ns, "landmarks": len(index.landmarks)}
+
+    while queued:
+        bucket = buckets[f % ring]
+        if not bucket:
+            f = heappop(pending)
+            continue
+        current = bucket.pop()
+        queued -= 1
+        if closed[current]:
+            stale_pops += 1
+            continue
+
+        nodes_expanded += 1
+        if record:
+            visited_order.append(current)
+        closed[current] = 1
+
+        if current == target:
+            stop_ns = time.perf_counter_ns()
+            return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                 graph.path_to(came_from, target), peak_frontier=peak_frontier,
+                                 queue_pushes=queue_pushes, stale_pops=stale_pops, **profile)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
+
+        current_g = g_score[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            tentative_g = current_g + cost[neighbor]
+            known = g_score[neighbor]
+            if known < 0 or tentative_g < known:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g
+                h = heuristic.get(neighbor)
+                if h is None:
+                    h = heuristic[neighbor] = estimate(neighbor)
+                f_score = tentative_g + h
+                bucket = buckets[f_score % ring]
+                if not bucket:
+                    heappush(pending, f_score)
+                bucket.append(neighbor)
+                queued += 1
+                queue_pushes += 1
+        for offset, side, other_side in diagonals:
+            neighbor = current + offset
+            if (blocked[neighbor] or closed[neighbor]
+                    or blocked[current + side] + blocked[current + other_side] > corner_limit):
+                continue
+            tentative_g = current_g + diagonal_cost[neighbor]
+            known = g_score[neighbor]
+            if known < 0 or tentative_g < known:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g
+                h = heuristic.get(neighbor)
+                if h is None:
+                    h = heuristic[neighbor] = estimate(neighbor)
+                f_score = tentative_g + h
+                bucket = buckets[f_score % ring]
+                if not bucket:
+                    heappush(pending, f_score)
+                bucket.append(neighbor)
+                queued += 1
+                queue_pushes += 1
+        if queued > peak_frontier:
+            peak_frontier = queued
+
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         peak_frontier=peak_frontier, queue_pushes=queue_pushes,
+                         stale_pops=stale_pops, **profile)
@@ -4,19 +4,31 @@ BFS explores all nodes at the current depth level before moving to the next leve
 guaranteeing the shortest path in unweighted graphs.
 """
 
-from typing import List, Tuple
+from array import array
+from typing import Generator, List, Tuple, Union
 from collections import deque
 import time
 
+from . import native
+from .frontier import bfs_levels
+from .grid import GridGraph, as_graph, run_steps, search_result
 
-def bfs(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> dict:
+
+def bfs(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+        vectorized: bool = False, record: bool = True) -> dict:
     """Find the shortest path from start to end using BFS algorithm.
-    
+
     Args:
-        grid: 2D list where 0 represents an open cell and 1 represents a wall
+        grid: 2D list where 0 represents an open cell and 1 represents a wall,
+            or an already-built GridGraph
         start: Starting position as (row, col) tuple
         end: Target position as (row, col) tuple
-        
+        vectorized: Advance the whole frontier per step with NumPy instead of
+            one cell at a time (see frontier.py). Same path length; visit
+            order is level by level, row-major within a level.
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
     Returns:
         Dictionary containing:
         - found: Boolean indicating if a path was found
@@ -24,59 +36,94 @@ def bfs(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) ->
         - nodes_expanded: Number of nodes explored
         - path: List of (row, col) tuples representing the shortest path
         - visited: List of (row, col) tuples in order of exploration
+        - profile: Phase timings in ns and peak_frontier (see search_result)
     """
-    def is_valid(row: int, col: int) -> bool:
-        """Check if a position is within grid bounds and not a wall."""
-        return 0 <= row < m and 0 <= col < n and grid[row][col] == 0
-    
-    m = len(grid)
-    n = len(grid[0])
-    # 4-directional movement: right, down, left, up
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    
-    queue = deque([start])
-    visited = set([start])
-    parent = {start: None}  # Track path reconstruction
-    
+    if vectorized:
+        began = time.perf_counter_ns()
+        graph = as_graph(grid)
+        start_ns = time.perf_counter_ns()
+        found, path, visited, nodes_expanded, peak_frontier = bfs_levels(
+            graph, graph.index(*start), graph.index(*end), record
+        )
+        return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded,
+                             visited, path if found else None,
+                             grid_ns=start_ns - began, peak_frontier=peak_frontier)
+    return run_steps(bfs_steps(grid, start, end, record=record))
+
+
+def bfs_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+              batch_size: int = 0, record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of bfs that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record: As for bfs
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The bfs result dict (via StopIteration), whose visited list holds
+        only the cells not already yielded. time_taken excludes time spent
+        suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    blocked = graph.blocked
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    source = graph.index(*start)
+    target = graph.index(*end)
+    # The compiled kernel runs this same loop, when it is built (see native.py)
+    if native.available():
+        return (yield from native.search_steps(native.BFS, graph, source, target, batch_size, record, grid_ns))
+
+    queue = deque([source])
+    parent = graph.new_parents()  # -1 = unseen, root points at itself
+    parent[source] = source
+
     nodes_expanded = 0
-    visited_order = []  # Track the order of node expansion for visualization
-    start_time = time.time()
-    
+    peak_frontier = 1
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    visited_order = array("i")  # Track the order of node expansion for visualization
+    start_ns = time.perf_counter_ns()
+
     while queue:
-        row, col = queue.popleft()
+        current = queue.popleft()
         nodes_expanded += 1
-        visited_order.append((row, col))
-        
+        if record:
+            visited_order.append(current)
+
         # Goal reached - reconstruct and return path
-        if (row, col) == end:
-            end_time = time.time()
-            path = []
-            curr = end
-            while curr is not None:
-                path.append(curr)
-                curr = parent[curr]
-            return {
-                "found": True,
-                "time_taken": end_time - start_time,
-                "nodes_expanded": nodes_expanded,
-                "path": path[::-1],
-                "visited": visited_order
-            }
-        
+        if current == target:
+            stop_ns = time.perf_counter_ns()
+            return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                 graph.path_to(parent, target),
+                                 grid_ns=grid_ns, peak_frontier=peak_frontier)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
+
         # Explore neighbors
-        for dx, dy in directions:
-            next_row, next_col = row + dx, col + dy
-            if is_valid(next_row, next_col) and (next_row, next_col) not in visited:
-                queue.append((next_row, next_col))
-                visited.add((next_row, next_col))
-                parent[(next_row, next_col)] = (row, col)
-    
+        for offset in offsets:
+            neighbor = current + offset
+            if not blocked[neighbor] and parent[neighbor] < 0:
+                queue.append(neighbor)
+                parent[neighbor] = current
+        # With 8-connectivity every step, diagonal or not, counts as one
+        for offset, side, other_side in diagonals:
+            neighbor = current + offset
+            if (not blocked[neighbor] and parent[neighbor] < 0
+                    and blocked[current + side] + blocked[current + other_side] <= corner_limit):
+                queue.append(neighbor)
+                parent[neighbor] = current
+        if len(queue) > peak_frontier:
+            peak_frontier = len(queue)
+
     # No path found
-    end_time = time.time()
-    return {
-        "found": False,
-        "time_taken": end_time - start_time,
-        "nodes_expanded": nodes_expanded,
-        "path": [],
-        "visited": visited_order
-    }
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier)
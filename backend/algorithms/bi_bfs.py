@@ -4,19 +4,29 @@ Bidirectional BFS searches from both start and end simultaneously, meeting in th
 This can be more efficient than standard BFS, especially when the solution path is long.
 """
 
-from typing import List, Tuple
+from array import array
+from typing import Generator, List, Optional, Tuple, Union
 from collections import deque
 import time
 
+from .frontier import bidirectional_levels
+from .grid import GridGraph, as_graph, run_steps, search_result
 
-def bidirectional_bfs(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> dict:
+
+def bidirectional_bfs(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+                      vectorized: bool = False, record: bool = True) -> dict:
     """Find the shortest path from start to end using Bidirectional BFS algorithm.
-    
+
     Args:
-        grid: 2D list where 0 represents an open cell and 1 represents a wall
+        grid: 2D list where 0 represents an open cell and 1 represents a wall,
+            or an already-built GridGraph
         start: Starting position as (row, col) tuple
         end: Target position as (row, col) tuple
-        
+        vectorized: Advance whole frontiers per step with NumPy, always
+            growing the smaller side (see frontier.py)
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
     Returns:
         Dictionary containing:
         - found: Boolean indicating if a path was found
@@ -24,117 +34,154 @@ def bidirectional_bfs(grid: List[List[int]], start: Tuple[int, int], end: Tuple[
         - nodes_expanded: Number of nodes explored
         - path: List of (row, col) tuples representing the shortest path
         - visited: List of (row, col) tuples in order of exploration
+        - profile: Phase timings in ns and peak_frontier, both sides together
     """
-    def is_valid(row: int, col: int) -> bool:
-        """Check if a position is within grid bounds and not a wall."""
-        return 0 <= row < m and 0 <= col < n and grid[row][col] == 0
-
-    m, n = len(grid), len(grid[0])
-    # 4-directional movement: right, down, left, up
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    start_time = time.time()
+    if vectorized:
+        began = time.perf_counter_ns()
+        graph = as_graph(grid)
+        grid_ns = time.perf_counter_ns() - began
+        source, target = graph.index(*start), graph.index(*end)
+        trivial = _trivial_result(graph, source, target, grid_ns, record)
+        if trivial is not None:
+            return trivial
+        start_ns = time.perf_counter_ns()
+        found, path, visited, nodes_expanded, peak_frontier = bidirectional_levels(graph, source, target, record)
+        return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded,
+                             visited, path if found else None,
+                             grid_ns=grid_ns, peak_frontier=peak_frontier)
+    return run_steps(bidirectional_bfs_steps(grid, start, end, record=record))
+
+
+def _trivial_result(graph: GridGraph, source: int, target: int, grid_ns: int,
+                    record: bool = True) -> Optional[dict]:
+    """Result for the cases decided before any search, or None."""
+    start_ns = time.perf_counter_ns()
 
     # start == end resolves immediately, before any wall check - this mirrors
     # bfs/dfs/dijkstra/a_star, which never check the start cell's wall status
     # either and return found on the first pop regardless.
-    if start == end:
-        return {
-            "found": True,
-            "time_taken": time.time() - start_time,
-            "nodes_expanded": 1,
-            "path": [start],
-            "visited": [start]
-        }
+    if source == target:
+        return search_result(graph, start_ns, time.perf_counter_ns(), 1,
+                             [source] if record else [], [source],
+                             grid_ns=grid_ns, peak_frontier=1)
 
     # A walled end can never be reached - consistent with bfs/dfs/dijkstra/
-    # a_star, which only ever add a cell to a frontier via is_valid() (grid
-    # == 0). Without this check, seeding end_visited with a walled end let
-    # bi_bfs "find" a path the other four algorithms correctly reject.
-    if grid[end[0]][end[1]] == 1:
-        return {
-            "found": False,
-            "time_taken": time.time() - start_time,
-            "nodes_expanded": 0,
-            "path": [],
-            "visited": []
-        }
+    # a_star, which only ever add an open cell to a frontier. Without this
+    # check, seeding the end side with a walled end let bi_bfs "find" a path
+    # the other four algorithms correctly reject.
+    if graph.blocked[target]:
+        return search_result(graph, start_ns, time.perf_counter_ns(), 0, [],
+                             grid_ns=grid_ns, peak_frontier=1)
+    return None
+
+
+def bidirectional_bfs_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int],
+                            end: Tuple[int, int],
+                            batch_size: int = 0, record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of bidirectional_bfs that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record: As for bidirectional_bfs
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The bidirectional_bfs result dict (via StopIteration), whose visited
+        list holds only the cells not already yielded. time_taken excludes
+        time spent suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    blocked = graph.blocked
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    source = graph.index(*start)
+    target = graph.index(*end)
+
+    trivial = _trivial_result(graph, source, target, grid_ns, record)
+    if trivial is not None:
+        return trivial
 
     # Two queues for bidirectional search
-    start_queue = deque([start])
-    end_queue = deque([end])
+    start_queue = deque([source])
+    end_queue = deque([target])
 
-    # Track visited nodes and parent pointers for path reconstruction
-    start_visited = {start: None}
-    end_visited = {end: None}
+    # Parent pointers for each side (-1 = unseen, root points at itself)
+    start_parent = graph.new_parents()
+    start_parent[source] = source
+    end_parent = graph.new_parents()
+    end_parent[target] = target
 
-    visited_order = []
+    visited_order = array("i")
     nodes_expanded = 0
+    peak_frontier = 2
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
 
-    def reconstruct_path(meeting_point: Tuple[int, int]) -> List[Tuple[int, int]]:
+    def reconstruct_path(meeting_point: int) -> List[int]:
         """Reconstruct the full path from start to end through the meeting point."""
-        path = []
         # Build path from start to meeting point
-        curr = meeting_point
-        while curr is not None:
-            path.append(curr)
-            curr = start_visited[curr]
-        path.reverse()
+        path = graph.path_to(start_parent, meeting_point)
         # Build path from meeting point to end
-        curr = end_visited[meeting_point]
-        while curr is not None:
+        curr = meeting_point
+        while curr != target:
+            curr = end_parent[curr]
             path.append(curr)
-            curr = end_visited[curr]
         return path
 
     while start_queue and end_queue:
-        # Expand from start side
-        row, col = start_queue.popleft()
-        nodes_expanded += 1
-        visited_order.append((row, col))
-
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
-            if is_valid(nr, nc) and (nr, nc) not in start_visited:
-                start_queue.append((nr, nc))
-                start_visited[(nr, nc)] = (row, col)
-                # Check if we've met the search from the end
-                if (nr, nc) in end_visited:
-                    end_time = time.time()
-                    return {
-                        "found": True,
-                        "time_taken": end_time - start_time,
-                        "nodes_expanded": nodes_expanded,
-                        "path": reconstruct_path((nr, nc)),
-                        "visited": visited_order
-                    }
-
-        # Expand from end side
-        row, col = end_queue.popleft()
-        nodes_expanded += 1
-        visited_order.append((row, col))
-
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
-            if is_valid(nr, nc) and (nr, nc) not in end_visited:
-                end_queue.append((nr, nc))
-                end_visited[(nr, nc)] = (row, col)
-                # Check if we've met the search from the start
-                if (nr, nc) in start_visited:
-                    end_time = time.time()
-                    return {
-                        "found": True,
-                        "time_taken": end_time - start_time,
-                        "nodes_expanded": nodes_expanded,
-                        "path": reconstruct_path((nr, nc)),
-                        "visited": visited_order
-                    }
+        # Expand one whole level of the smaller side (ties go to the start
+        # side), as the vectorized search does. Finishing levels is what
+        # makes the first meeting a shortest path: neither side has seen a
+        # cell closer to the other's root, which swapping sides after every
+        # cell cannot promise once diagonal steps make the grid non-bipartite.
+        if len(start_queue) <= len(end_queue):
+            queue, parent, other_parent = start_queue, start_parent, end_parent
+        else:
+            queue, parent, other_parent = end_queue, end_parent, start_parent
+        for _ in range(len(queue)):
+            current = queue.popleft()
+            nodes_expanded += 1
+            if record:
+                visited_order.append(current)
+
+            if nodes_expanded == next_flush:
+                paused = time.perf_counter_ns()
+                yield graph.cells(visited_order)
+                del visited_order[:]
+                next_flush += batch_size
+                start_ns += time.perf_counter_ns() - paused
+
+            for offset in offsets:
+                neighbor = current + offset
+                if not blocked[neighbor] and parent[neighbor] < 0:
+                    queue.append(neighbor)
+                    parent[neighbor] = current
+                    # Check if we've met the search from the other side
+                    if other_parent[neighbor] >= 0:
+                        stop_ns = time.perf_counter_ns()
+                        return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                             reconstruct_path(neighbor),
+                                             grid_ns=grid_ns, peak_frontier=peak_frontier)
+            # A diagonal step cuts across the same two cells in either
+            # direction, so the corner rule holds backwards as well
+            for offset, side, other_side in diagonals:
+                neighbor = current + offset
+                if (not blocked[neighbor] and parent[neighbor] < 0
+                        and blocked[current + side] + blocked[current + other_side] <= corner_limit):
+                    queue.append(neighbor)
+                    parent[neighbor] = current
+                    if other_parent[neighbor] >= 0:
+                        stop_ns = time.perf_counter_ns()
+                        return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                             reconstruct_path(neighbor),
+                                             grid_ns=grid_ns, peak_frontier=peak_frontier)
+
+        if len(start_queue) + len(end_queue) > peak_frontier:
+            peak_frontier = len(start_queue) + len(end_queue)
 
     # No path found
-    end_time = time.time()
-    return {
-        "found": False,
-        "time_taken": end_time - start_time,
-        "nodes_expanded": nodes_expanded,
-        "path": [],
-        "visited": visited_order
-    }
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier)
@@ -0,0 +1,288 @@
+"""Bidirectional Dijkstra and bidirectional A* (NBA*).
+
+Both grow one search forward from start and one backward from end - the
+backward side follows edges in reverse, so stepping back from a cell costs
+that cell's cost, just as stepping onto it does forwards. Each iteration
+expands a cell from whichever side has the smaller queue, so a long
+corridor query floods two small balls around its ends instead of one large
+one around start.
+
+Termination follows NBA* (Pijls & Post, "Yet another bidirectional
+algorithm for shortest paths", 2009). L is the cheapest start-to-end path
+seen so far, through any cell both sides have reached. A cell popped on
+one side is dropped (never expanded) if
+
+    g(x) + h(x) >= L                  it cannot beat L on this side, or
+    g(x) + F' - h'(x) >= L            it cannot beat L joined to the other,
+
+where h is this side's heuristic, h' the other side's and F' the lowest
+f-score queued on the other side. Either way the cell is finished for
+both sides. The search stops when either side's queue runs dry, and L is
+then optimal. With a zero heuristic this is bidirectional Dijkstra, whose
+second rule is the usual "stop once the two queue minimums add up to L".
+
+Like dijkstra.py and a_star.py, each side keeps a bucket queue over
+integer f-scores; the heuristics (Manhattan, or octile in the scaled units
+of grid.py with diagonal movement) are consistent in both directions, so
+f-scores only grow and a ring of buckets keeps them ordered, with a heap of
+the f-scores of its non-empty buckets to find the next one.
+"""
+
+from array import array
+from heapq import heappop, heappush
+from typing import Callable, Generator, List, Tuple, Union
+import time
+
+from .bi_bfs import _trivial_result
+from .grid import DIAGONAL, STRAIGHT, GridGraph, as_graph, run_steps, search_result
+
+
+def bidirectional_dijkstra(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int],
+                           end: Tuple[int, int], record: bool = True) -> dict:
+    """Find the cheapest path from start to end by searching from both ends.
+
+    Args:
+        grid: 2D list where 0 represents an open cell, 1 a wall and 2-255 an
+            open cell with that step cost, or an already-built GridGraph
+        start: Starting position as (row, col) tuple
+        end: Target position as (row, col) tuple
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
+    Returns:
+        Dictionary containing:
+        - found: Boolean indicating if a path was found
+        - time_taken: Execution time in seconds
+        - nodes_expanded: Number of nodes explored, both sides together
+        - path: List of (row, col) tuples representing the cheapest path
+        - path_cost: Total step cost of path
+        - visited: List of (row, col) tuples in order of exploration
+        - profile: Phase timings in ns, peak_frontier, queue_pushes and
+          stale_pops (entries of cells already finished, or pruned)
+    """
+    return run_steps(bidirectional_dijkstra_steps(grid, start, end, record=record))
+
+
+def bidirectional_dijkstra_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int],
+                                 end: Tuple[int, int], batch_size: int = 0,
+                                 record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of bidirectional_dijkstra that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record: As for bidirectional_dijkstra
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The bidirectional_dijkstra result dict (via StopIteration), whose
+        visited list holds only the cells not already yielded. time_taken
+        excludes time spent suspended at a yield.
+    """
+    return (yield from _search(grid, start, end, batch_size, record, informed=False))
+
+
+def bidirectional_a_star(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int],
+                         end: Tuple[int, int], record: bool = True) -> dict:
+    """Find the cheapest path from start to end with NBA*, a bidirectional A*.
+
+    Args:
+        grid, start, end, record: As for bidirectional_dijkstra
+
+    Returns:
+        As for bidirectional_dijkstra
+    """
+    return run_steps(bidirectional_a_star_steps(grid, start, end, record=record))
+
+
+def bidirectional_a_star_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int],
+                               end: Tuple[int, int], batch_size: int = 0,
+                               record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of bidirectional_a_star that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record, batch_size: As for bidirectional_dijkstra_steps
+
+    Returns:
+        As for bidirectional_dijkstra_steps
+    """
+    return (yield from _search(grid, start, end, batch_size, record, informed=True))
+
+
+def _toward(graph: GridGraph, goal: int) -> Callable[[int], int]:
+    """Consistent estimate of the cost between a cell and goal (either way)."""
+    width = graph.width
+    goal_row, goal_col = divmod(goal, width)
+    if graph.diagonals:
+        def heuristic(index: int) -> int:
+            r, c = divmod(index, width)
+            dr, dc = abs(r - goal_row), abs(c - goal_col)
+            if dr < dc:
+                dr, dc = dc, dr
+            return STRAIGHT * dr + (DIAGONAL - STRAIGHT) * dc
+    else:
+        def heuristic(index: int) -> int:
+            r, c = divmod(index, width)
+            return abs(r - goal_row) + abs(c - goal_col)
+    return heuristic
+
+
+def _zero(index: int) -> int:
+    return 0
+
+
+def _search(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+            batch_size: int, record: bool, informed: bool) -> Generator[List[Tuple[int, int]], None, dict]:
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    blocked = graph.blocked
+    cost, diagonal_cost = graph.step_costs()
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    source = graph.index(*start)
+    target = graph.index(*end)
+
+    trivial = _trivial_result(graph, source, target, grid_ns, record)
+    if trivial is not None:
+        return trivial
+
+    # Side 0 searches forward from source, side 1 backward from target; each
+    # tuple below is indexed by side
+    if informed:
+        heuristics = (_toward(graph, target), _toward(graph, source))
+        h_step = DIAGONAL if diagonals else 1
+    else:
+        heuristics = (_zero, _zero)
+        h_step = 0
+    ring = graph.max_step_cost() + h_step + 1
+    g_scores = (array("q", [-1]) * graph.size, array("q", [-1]) * graph.size)
+    parents = (graph.new_parents(), graph.new_parents())
+    queues = ([[] for _ in range(ring)], [[] for _ in range(ring)])
+    pending = ([], [])  # f-scores of the non-empty buckets ahead on each side
+    keys = [heuristics[0](source), heuristics[1](target)]  # lowest f-score queued on each side
+    queued = [1, 1]  # entries per side, stale ones included
+    for side, root in enumerate((source, target)):
+        g_scores[side][root] = 0
+        parents[side][root] = root
+        queues[side][keys[side] % ring].append(root)
+    # NBA*'s complement of M: cells expanded or dropped by either side
+    finished = bytearray(graph.size)
+
+    best = -1  # L, the cost of the best path so far; -1 = none yet
+    meeting = -1
+    visited_order = array("i")
+    nodes_expanded = 0
+    peak_frontier = 2
+    queue_pushes = 2
+    stale_pops = 0
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
+
+    def lowest(side: int) -> int:
+        """Advance keys[side] to the lowest live f-score on side, dropping
+        finished entries on the way; -1 if the side has run dry."""
+        nonlocal stale_pops
+        buckets = queues[side]
+        f = keys[side]
+        while queued[side]:
+            bucket = buckets[f % ring]
+            while bucket and finished[bucket[-1]]:
+                bucket.pop()
+                queued[side] -= 1
+                stale_pops += 1
+            if bucket:
+                keys[side] = f
+                return f
+            if queued[side]:
+                f = heappop(pending[side])
+        return -1
+
+    while lowest(0) >= 0 and lowest(1) >= 0:
+        # Grow the smaller side
+        side = 0 if queued[0] <= queued[1] else 1
+        other = 1 - side
+        f = keys[side]
+        current = queues[side][f % ring].pop()
+        queued[side] -= 1
+        finished[current] = 1
+        g_score = g_scores[side]
+        other_g = g_scores[other]
+        current_g = g_score[current]
+        if best >= 0 and (f >= best or current_g + keys[other] - heuristics[other](current) >= best):
+            stale_pops += 1
+            continue
+
+        nodes_expanded += 1
+        if record:
+            visited_order.append(current)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
+
+        heuristic = heuristics[side]
+        parent = parents[side]
+        buckets = queues[side]
+        ahead = pending[side]
+        backward = side == 1
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or finished[neighbor]:
+                continue
+            # Backwards the step runs from neighbor onto current
+            tentative_g = current_g + (cost[current] if backward else cost[neighbor])
+            known = g_score[neighbor]
+            if known < 0 or tentative_g < known:
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                f_score = tentative_g + heuristic(neighbor)
+                bucket = buckets[f_score % ring]
+                if not bucket:
+                    heappush(ahead, f_score)
+                bucket.append(neighbor)
+                queued[side] += 1
+                queue_pushes += 1
+                reached = other_g[neighbor]
+                if reached >= 0 and (best < 0 or tentative_g + reached < best):
+                    best = tentative_g + reached
+                    meeting = neighbor
+        for offset, cut, other_cut in diagonals:
+            neighbor = current + offset
+            if (blocked[neighbor] or finished[neighbor]
+                    or blocked[current + cut] + blocked[current + other_cut] > corner_limit):
+                continue
+            tentative_g = current_g + (diagonal_cost[current] if backward else diagonal_cost[neighbor])
+            known = g_score[neighbor]
+            if known < 0 or tentative_g < known:
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                f_score = tentative_g + heuristic(neighbor)
+                bucket = buckets[f_score % ring]
+                if not bucket:
+                    heappush(ahead, f_score)
+                bucket.append(neighbor)
+                queued[side] += 1
+                queue_pushes += 1
+                reached = other_g[neighbor]
+                if reached >= 0 and (best < 0 or tentative_g + reached < best):
+                    best = tentative_g + reached
+                    meeting = neighbor
+        if queued[0] + queued[1] > peak_frontier:
+            peak_frontier = queued[0] + queued[1]
+
+    stop_ns = time.perf_counter_ns()
+    path = None
+    if meeting >= 0:
+        path = graph.path_to(parents[0], meeting)
+        to_end = parents[1]
+        index = meeting
+        while index != target:
+            index = to_end[index]
+            path.append(index)
+    return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order, path,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier,
+                         queue_pushes=queue_pushes, stale_pops=stale_pops)
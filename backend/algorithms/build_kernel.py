@@ -0,0 +1,31 @@
+"""Compile the optional search kernel (_kernel.c, see native.py).
+
+    python -m algorithms.build_kernel [output]
+
+needs a C compiler (the one Python was built with, else cc) and writes
+algorithms/_kernel.so unless given another output path.
+"""
+
+import os
+import subprocess
+import sys
+import sysconfig
+
+from .native import LIBRARY
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_kernel.c")
+
+
+def build(output: str = LIBRARY) -> str:
+    """Compile _kernel.c into a shared library at output.
+
+    Raises:
+        subprocess.CalledProcessError: If the compiler fails
+    """
+    compiler = (sysconfig.get_config_var("CC") or "cc").split()
+    subprocess.run(compiler + ["-O3", "-shared", "-fPIC", "-o", output, SOURCE], check=True)
+    return output
+
+
+if __name__ == "__main__":
+    print(build(sys.argv[1] if len(sys.argv) > 1 else LIBRARY))
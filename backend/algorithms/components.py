@@ -0,0 +1,206 @@
+"""Connected-component labelling of a grid's open cells.
+
+A search between cells in different components can only fail, and only
+after flooding everything reachable from the start. Labelling the grid once
+lets that case be answered with two array lookups instead.
+
+Labelling works on runs rather than cells: every maximal horizontal run of
+open cells is found with NumPy over the padded blocked buffer (border walls
+keep runs from wrapping rows), the pairs of runs in neighbouring rows that
+overlap are found with two searchsorted calls and merged with union-find,
+and each run's component id is then scattered to its cells. The Python-level
+work is proportional to the number of runs, which on open or maze-like grids
+is far below the number of cells.
+
+Diagonal movement only changes the components when it may squeeze between
+two walls (corner_cutting "always"): otherwise a diagonal step always has an
+open side cell to go round by. In that case runs that touch at a corner are
+merged too.
+
+A grid patched from a labelled one (GridGraph.patched) is labelled from
+that index instead, with work in the number of changed cells plus, when
+components merge or vanish, one vectorized pass renumbering the labels:
+an opened cell joins the components around it, and a closed cell is
+dropped when its open neighbours provably stay connected without it - they
+are linked through the eight cells around it, and no other closed cell is
+among those. A closing that cannot be decided that way (possibly a split)
+falls back to labelling the whole grid.
+"""
+
+import numpy as np
+
+from typing import Dict, Sequence
+
+from .grid import GridGraph
+
+
+def links_corners(graph: GridGraph) -> bool:
+    """Whether graph's movement joins cells that only touch at a corner, so
+    its components differ from the 4-connected ones (see the module docstring)."""
+    return bool(graph.diagonals) and graph.corner_limit == 2
+
+
+class ComponentIndex:
+    """Component label of every cell of a GridGraph.
+
+    Attributes:
+        labels: int32 array over the padded buffer, the component id of
+            each open cell and -1 for walls and the border
+        count: Number of components
+    """
+
+    __slots__ = ("labels", "count")
+
+    def __init__(self, labels: np.ndarray, count: int):
+        self.labels = labels
+        self.count = count
+
+    @classmethod
+    def build(cls, graph: GridGraph) -> "ComponentIndex":
+        """Label the open cells of graph under its movement rules (see the
+        module docstring)."""
+        width = graph.width
+        free = np.frombuffer(bytes(graph.blocked), dtype=np.uint8) == 0
+        labels = np.full(graph.size, -1, dtype=np.int32)
+        # Runs start where a wall turns open and stop where it turns back;
+        # the border guarantees every run is closed within its row
+        edges = np.diff(free.view(np.int8))
+        starts = np.flatnonzero(edges == 1) + 1
+        stops = np.flatnonzero(edges == -1) + 1
+        if not len(starts):
+            return cls(labels, 0)
+
+        # Runs of the row above overlapping run i are the consecutive runs
+        # from the first ending after starts[i] - width to the last
+        # starting before stops[i] - width (one further each way if
+        # corners count)
+        reach = 1 if links_corners(graph) else 0
+        first = np.searchsorted(stops, starts - width - reach, side="right")
+        last = np.searchsorted(starts, stops - width + reach, side="left")
+        counts = np.maximum(last - first, 0)
+        runs = np.repeat(np.arange(len(starts)), counts)
+        above = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        parent = list(range(len(starts)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]  # path halving
+                x = parent[x]
+            return x
+
+        for a, b in zip(runs.tolist(), above.tolist()):
+            a, b = find(a), find(b)
+            if a != b:
+                parent[a] = b
+
+        roots = np.fromiter(map(find, range(len(starts))), dtype=np.int64, count=len(starts))
+        _, component = np.unique(roots, return_inverse=True)
+        # Open cells in index order are exactly the runs laid end to end
+        labels[free] = np.repeat(component.astype(np.int32), stops - starts)
+        return cls(labels, int(component.max()) + 1)
+
+    def patched(self, graph: GridGraph, cells: Sequence[int]) -> "ComponentIndex":
+        """The index of graph, which is this index's grid with the cells at
+        flat indices cells changed (see the module docstring).
+
+        Returns this index itself if no cell changed between open and wall.
+        """
+        blocked = graph.blocked
+        labels = self.labels
+        changed = set(cells)
+        opened = sorted(c for c in changed if not blocked[c] and labels[c] < 0)
+        closed = sorted(c for c in changed if blocked[c] and labels[c] >= 0)
+        if not opened and not closed:
+            return self
+        corners = links_corners(graph)
+        width = graph.width
+        # Clockwise from the top left; the edge cells are the odd positions
+        ring = (-width - 1, -width, -width + 1, 1, width + 1, width, width - 1, -1)
+        vanished = []
+        if closed:
+            if corners:
+                return ComponentIndex.build(graph)
+            # Tested before any opening, when opened cells are still walls
+            dropped = set(closed)
+            for cell in closed:
+                if any(cell + offset in dropped for offset in ring):
+                    return ComponentIndex.build(graph)
+                around = [bool(labels[cell + offset] >= 0) for offset in ring]
+                if _arcs(around) > 1:
+                    return ComponentIndex.build(graph)
+                if not any(around[1::2]):
+                    vanished.append(int(labels[cell]))  # it was a component of its own
+        labels = labels.copy()
+        labels[closed] = -1
+
+        # Union-find over component ids; opened cells get new ids after count
+        count = self.count
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            while parent.get(x, x) != x:
+                parent[x] = parent.get(parent[x], parent[x])  # path halving
+                x = parent[x]
+            return x
+
+        labels[opened] = np.arange(count, count + len(opened), dtype=np.int32)
+        steps = ring if corners else ring[1::2]
+        for cell in opened:
+            for offset in steps:
+                other = int(labels[cell + offset])
+                if other >= 0:
+                    a, b = find(int(labels[cell])), find(other)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)  # keep existing ids as roots
+
+        table = np.arange(count + len(opened), dtype=np.int32)
+        for x in parent:
+            table[x] = find(x)
+        keep = table == np.arange(len(table))
+        keep[vanished] = False
+        renumber = np.cumsum(keep, dtype=np.int32) - 1
+        table = renumber[table]
+        if keep[:count].all():
+            # Existing ids are unchanged; only the opened cells need theirs
+            labels[opened] = table[labels[opened]]
+        else:
+            open_cells = labels >= 0
+            labels[open_cells] = table[labels[open_cells]]
+        return ComponentIndex(labels, int(keep.sum()))
+
+    def connected(self, a: int, b: int) -> bool:
+        """Whether flat indices a and b are open cells in the same component."""
+        label = self.labels[a]
+        return bool(label >= 0 and label == self.labels[b])
+
+    def region(self, index: int) -> np.ndarray:
+        """Flat indices, in row-major order, of the component holding index."""
+        label = self.labels[index]
+        if label < 0:
+            return np.array([index], dtype=np.intp)
+        return np.flatnonzero(self.labels == label)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the label array."""
+        return self.labels.nbytes
+
+
+def _arcs(around: Sequence[bool]) -> int:
+    """Number of separate runs of open cells, going round the eight cells
+    around a cell (see ComponentIndex.patched), that hold one of its four
+    edge neighbours. Consecutive cells of the ring are 4-neighbours."""
+    if all(around):
+        return 1
+    # Start just after a wall so no run wraps round the end
+    first = around.index(False) + 1
+    arcs = 0
+    edge = False
+    for i in range(first, first + 8):
+        if around[i % 8]:
+            edge = edge or i % 2 == 1
+        else:
+            arcs += edge
+            edge = False
+    return arcs + edge
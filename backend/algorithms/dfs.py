@@ -4,18 +4,25 @@ DFS explores as far as possible along each branch before backtracking.
 Note: DFS does not guarantee the shortest path.
 """
 
-from typing import List, Tuple
+from array import array
+from typing import Generator, List, Tuple, Union
 import time
 
+from .grid import GridGraph, as_graph, run_steps, search_result
 
-def dfs(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> dict:
+
+def dfs(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+        record: bool = True) -> dict:
     """Find a path from start to end using DFS algorithm.
-    
+
     Args:
-        grid: 2D list where 0 represents an open cell and 1 represents a wall
+        grid: 2D list where 0 represents an open cell and 1 represents a wall,
+            or an already-built GridGraph
         start: Starting position as (row, col) tuple
         end: Target position as (row, col) tuple
-        
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
     Returns:
         Dictionary containing:
         - found: Boolean indicating if a path was found
@@ -24,57 +31,76 @@ def dfs(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) ->
         - path: List of (row, col) tuples representing a path (not necessarily shortest)
         - visited: List of (row, col) tuples in order of exploration
     """
-    def is_valid(row: int, col: int) -> bool:
-        """Check if a position is within grid bounds and not a wall."""
-        return 0 <= row < m and 0 <= col < n and grid[row][col] == 0
-
-    m, n = len(grid), len(grid[0])
-    stack = [start]
-    visited = set([start])
-    parent = {start: None}  # Track path reconstruction
-    visited_order = []
-    nodes_expanded = 0
-    start_time = time.time()
+    return run_steps(dfs_steps(grid, start, end, record=record))
 
-    # 4-directional movement: right, down, left, up
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+def dfs_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+              batch_size: int = 0, record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of dfs that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record: As for dfs
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The dfs result dict (via StopIteration), whose visited list holds
+        only the cells not already yielded. time_taken excludes time spent
+        suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    blocked = graph.blocked
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    source = graph.index(*start)
+    target = graph.index(*end)
+
+    stack = [source]
+    parent = graph.new_parents()  # -1 = unseen, root points at itself
+    parent[source] = source
+    visited_order = array("i")
+    nodes_expanded = 0
+    peak_frontier = 1
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
 
     while stack:
-        row, col = stack.pop()
-        visited_order.append((row, col))
+        current = stack.pop()
+        if record:
+            visited_order.append(current)
         nodes_expanded += 1
 
         # Goal reached - reconstruct and return path
-        if (row, col) == end:
-            end_time = time.time()
-            path = []
-            curr = end
-            while curr is not None:
-                path.append(curr)
-                curr = parent[curr]
-            path.reverse()
-            return {
-                "found": True,
-                "time_taken": end_time - start_time,
-                "nodes_expanded": nodes_expanded,
-                "path": path,
-                "visited": visited_order
-            }
+        if current == target:
+            stop_ns = time.perf_counter_ns()
+            return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                 graph.path_to(parent, target), grid_ns=grid_ns, peak_frontier=peak_frontier)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
 
         # Explore neighbors (add to stack for later processing)
-        for dx, dy in directions:
-            next_row, next_col = row + dx, col + dy
-            if is_valid(next_row, next_col) and (next_row, next_col) not in visited:
-                stack.append((next_row, next_col))
-                visited.add((next_row, next_col))
-                parent[(next_row, next_col)] = (row, col)
+        for offset in offsets:
+            neighbor = current + offset
+            if not blocked[neighbor] and parent[neighbor] < 0:
+                stack.append(neighbor)
+                parent[neighbor] = current
+        for offset, side, other_side in diagonals:
+            neighbor = current + offset
+            if (not blocked[neighbor] and parent[neighbor] < 0
+                    and blocked[current + side] + blocked[current + other_side] <= corner_limit):
+                stack.append(neighbor)
+                parent[neighbor] = current
+        if len(stack) > peak_frontier:
+            peak_frontier = len(stack)
 
     # No path found
-    end_time = time.time()
-    return {
-        "found": False,
-        "time_taken": end_time - start_time,
-        "nodes_expanded": nodes_expanded,
-        "path": [],
-        "visited": visited_order
-    }
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier)
@@ -1,92 +1,174 @@
 """Dijkstra's pathfinding algorithm implementation.
 
-Dijkstra's algorithm finds the shortest path in weighted graphs. For uniform
-edge weights (as in this grid), it behaves similarly to BFS but uses a priority queue.
+Dijkstra's algorithm finds the shortest path in weighted graphs. Here the
+weights are the grid's terrain costs (stepping onto a cell costs its value,
+1 for plain open cells); on a grid without terrain it behaves like BFS.
+
+Step costs are small integers, so the priority queue is a bucket queue
+(Dial's algorithm) rather than a binary heap: every tentative distance still
+in the queue lies within max_cost of the one being expanded, so a ring of
+max_cost + 1 buckets indexed by distance modulo the ring size keeps them
+ordered with no comparisons. With diagonal movement distances are in the
+scaled units of grid.py and the ring grows to match - up to 255 * DIAGONAL
+buckets with terrain - so the queue does not walk the ring to find the next
+non-empty bucket: the distances of the non-empty buckets are also kept in a
+heap, pushed when a bucket fills and popped when the search moves on to it.
+That is one heap operation per distinct distance rather than per cell, and
+a thin frontier taking large steps jumps straight to its next distance.
 """
 
-from typing import List, Tuple
-import heapq
+from array import array
+from heapq import heappop, heappush
+from typing import Generator, List, Tuple, Union
 import time
 
+from . import native
+from .grid import GridGraph, as_graph, run_steps, search_result
+
 
-def dijkstra(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> dict:
+def dijkstra(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+             record: bool = True) -> dict:
     """Find the shortest path from start to end using Dijkstra's algorithm.
-    
+
     Args:
-        grid: 2D list where 0 represents an open cell and 1 represents a wall
+        grid: 2D list where 0 represents an open cell, 1 a wall and 2-255 an
+            open cell with that step cost, or an already-built GridGraph
         start: Starting position as (row, col) tuple
         end: Target position as (row, col) tuple
-        
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
     Returns:
         Dictionary containing:
         - found: Boolean indicating if a path was found
         - time_taken: Execution time in seconds
         - nodes_expanded: Number of nodes explored
-        - path: List of (row, col) tuples representing the shortest path
+        - path: List of (row, col) tuples representing the cheapest path
+        - path_cost: Total step cost of path
         - visited: List of (row, col) tuples in order of exploration
     """
-    def is_valid(row: int, col: int) -> bool:
-        """Check if a position is within grid bounds and not a wall."""
-        return 0 <= row < m and 0 <= col < n and grid[row][col] == 0
+    return run_steps(dijkstra_steps(grid, start, end, record=record))
 
-    m, n = len(grid), len(grid[0])
-    visited_order = []
-    nodes_expanded = 0
-    start_time = time.time()
 
-    # Min-heap: (distance, (row, col))
-    heap = [(0, start)]
-    distances = {start: 0}  # Shortest distance from start to each node
-    parent = {start: None}  # Track path reconstruction
-    visited = set()  # Closed set - nodes already processed
+def dijkstra_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+                   batch_size: int = 0, record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of dijkstra that hands out expanded cells as it goes.
+
+    Args:
+        grid, start, end, record: As for dijkstra
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The dijkstra result dict (via StopIteration), whose visited list holds
+        only the cells not already yielded. time_taken excludes time spent
+        suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    blocked = graph.blocked
+    cost, diagonal_cost = graph.step_costs()
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    source = graph.index(*start)
+    target = graph.index(*end)
+    # The compiled kernel runs this same loop, when it is built (see native.py)
+    if native.available():
+        return (yield from native.search_steps(native.DIJKSTRA, graph, source, target, batch_size, record, grid_ns))
 
-    # 4-directional movement: right, down, left, up
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+    visited_order = array("i")
+    nodes_expanded = 0
+    peak_frontier = 1
+    queue_pushes = 1  # the start node
+    stale_pops = 0
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
 
-    while heap:
-        dist, (row, col) = heapq.heappop(heap)
+    # Bucket queue: buckets[d % ring] holds the cells queued at distance d,
+    # and the pending heap the distances of the non-empty buckets ahead
+    ring = graph.max_step_cost() + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(source)
+    pending = []
+    queued = 1  # entries across all buckets, stale ones included
+    dist = 0
+    distances = array("q", [-1]) * graph.size  # -1 = no tentative distance yet
+    distances[source] = 0
+    parent = graph.new_parents()  # Track path reconstruction
+    parent[source] = source
+    closed = bytearray(graph.size)  # Closed set - nodes already processed
 
-        # Skip if already processed (can happen with duplicate entries in heap)
-        if (row, col) in visited:
+    while queued:
+        bucket = buckets[dist % ring]
+        if not bucket:
+            dist = heappop(pending)
             continue
-        visited.add((row, col))
-        visited_order.append((row, col))
+        current = bucket.pop()
+        queued -= 1
+
+        # Skip if already processed (can happen with duplicate entries in the queue)
+        if closed[current]:
+            stale_pops += 1
+            continue
+        closed[current] = 1
+        if record:
+            visited_order.append(current)
         nodes_expanded += 1
 
         # Goal reached - reconstruct and return path
-        if (row, col) == end:
-            end_time = time.time()
-            path = []
-            curr = end
-            while curr is not None:
-                path.append(curr)
-                curr = parent[curr]
-            path.reverse()
-            return {
-                "found": True,
-                "time_taken": end_time - start_time,
-                "nodes_expanded": nodes_expanded,
-                "path": path,
-                "visited": visited_order
-            }
+        if current == target:
+            stop_ns = time.perf_counter_ns()
+            return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                 graph.path_to(parent, target),
+                                 grid_ns=grid_ns, peak_frontier=peak_frontier,
+                                 queue_pushes=queue_pushes, stale_pops=stale_pops)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
 
         # Explore neighbors
-        for dx, dy in directions:
-            next_row, next_col = row + dx, col + dy
-            if is_valid(next_row, next_col) and (next_row, next_col) not in visited:
-                new_dist = dist + 1  # Uniform cost of 1 per step
-                # Update if we found a shorter path to this neighbor
-                if (next_row, next_col) not in distances or new_dist < distances[(next_row, next_col)]:
-                    distances[(next_row, next_col)] = new_dist
-                    heapq.heappush(heap, (new_dist, (next_row, next_col)))
-                    parent[(next_row, next_col)] = (row, col)
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            # Update if we found a shorter path to this neighbor
+            new_dist = dist + cost[neighbor]
+            known = distances[neighbor]
+            if known < 0 or new_dist < known:
+                distances[neighbor] = new_dist
+                bucket = buckets[new_dist % ring]
+                if not bucket:
+                    heappush(pending, new_dist)
+                bucket.append(neighbor)
+                queued += 1
+                queue_pushes += 1
+                parent[neighbor] = current
+        for offset, side, other_side in diagonals:
+            neighbor = current + offset
+            if (blocked[neighbor] or closed[neighbor]
+                    or blocked[current + side] + blocked[current + other_side] > corner_limit):
+                continue
+            new_dist = dist + diagonal_cost[neighbor]
+            known = distances[neighbor]
+            if known < 0 or new_dist < known:
+                distances[neighbor] = new_dist
+                bucket = buckets[new_dist % ring]
+                if not bucket:
+                    heappush(pending, new_dist)
+                bucket.append(neighbor)
+                queued += 1
+                queue_pushes += 1
+                parent[neighbor] = current
+        if queued > peak_frontier:
+            peak_frontier = queued
 
     # No path found
-    end_time = time.time()
-    return {
-        "found": False,
-        "time_taken": end_time - start_time,
-        "nodes_expanded": nodes_expanded,
-        "path": [],
-        "visited": visited_order
-    }
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier,
+                         queue_pushes=queue_pushes, stale_pops=stale_pops)
@@ -0,0 +1,219 @@
+"""Many-to-many shortest distances from shared distance fields.
+
+Answering S sources x T targets with one search per pair repeats the same
+flood S x T times. Here each source gets a single Dijkstra distance field
+(the bucket queue of dijkstra.py; on a grid without terrain it expands in
+BFS order) that stops as soon as all of its targets are settled, and every
+path is read back from that one field's parent array.
+
+With fewer targets than sources the fields are grown backwards from the
+targets instead, so the number of searches is always min(S, T). A reverse
+field charges each step the cost of the cell it moves onto, exactly as the
+forward searches do, so distances and paths are the same either way.
+
+many_to_many_steps is the same as a generator that pauses between fields,
+for the worker pool to check its budgets and cancellation (see
+workers.submit_task).
+"""
+
+from array import array
+from heapq import heappop, heappush
+from typing import Generator, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import time
+
+from .grid import GridGraph, as_graph, run_steps
+
+
+def distance_field(graph: GridGraph, root: int, stop: Iterable[int] = (),
+                   reverse: bool = False) -> Tuple[array, array, int]:
+    """Cheapest distances from root (to root if reverse) to every cell reached.
+
+    Args:
+        graph: The grid to search; with diagonal movement distances are in
+            the scaled units of grid.py
+        root: Flat index the field grows from
+        stop: Flat indices; the search ends once all of them are settled.
+            Empty floods everything reachable from root.
+        reverse: Measure the cost of reaching root from each cell rather
+            than of reaching each cell from root
+
+    Returns:
+        (distance, parent, nodes_expanded): distance is -1 for cells never
+        reached; parent points one step back towards root (root's parent
+        is itself)
+    """
+    blocked = graph.blocked
+    cost, diagonal_cost = graph.step_costs()
+    offsets = graph.offsets
+    diagonals = graph.diagonals
+    corner_limit = graph.corner_limit
+    remaining: Set[int] = set(stop)
+    remaining.discard(root)
+    open_ended = not remaining
+
+    ring = graph.max_step_cost() + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(root)
+    pending = []  # distances of the non-empty buckets ahead, as in dijkstra.py
+    queued = 1
+    dist = 0
+    distance = array("q", [-1]) * graph.size
+    distance[root] = 0
+    parent = graph.new_parents()
+    parent[root] = root
+    closed = bytearray(graph.size)
+    nodes_expanded = 0
+
+    while queued:
+        bucket = buckets[dist % ring]
+        if not bucket:
+            dist = heappop(pending)
+            continue
+        current = bucket.pop()
+        queued -= 1
+        if closed[current]:
+            continue
+        closed[current] = 1
+        nodes_expanded += 1
+        if current in remaining:
+            remaining.discard(current)
+            if not remaining and not open_ended:
+                break
+        # Backwards, every step out of current is a step onto it
+        step = cost[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            new_dist = dist + (step if reverse else cost[neighbor])
+            known = distance[neighbor]
+            if known < 0 or new_dist < known:
+                distance[neighbor] = new_dist
+                bucket = buckets[new_dist % ring]
+                if not bucket:
+                    heappush(pending, new_dist)
+                bucket.append(neighbor)
+                queued += 1
+                parent[neighbor] = current
+        step = diagonal_cost[current]
+        for offset, side, other_side in diagonals:
+            neighbor = current + offset
+            if (blocked[neighbor] or closed[neighbor]
+                    or blocked[current + side] + blocked[current + other_side] > corner_limit):
+                continue
+            new_dist = dist + (step if reverse else diagonal_cost[neighbor])
+            known = distance[neighbor]
+            if known < 0 or new_dist < known:
+                distance[neighbor] = new_dist
+                bucket = buckets[new_dist % ring]
+                if not bucket:
+                    heappush(pending, new_dist)
+                bucket.append(neighbor)
+                queued += 1
+                parent[neighbor] = current
+    return distance, parent, nodes_expanded
+
+
+def many_to_many(grid: Union[GridGraph, List[List[int]]], sources: Sequence[Tuple[int, int]],
+                 targets: Sequence[Tuple[int, int]], paths: bool = False,
+                 connected: Optional[Sequence[Sequence[bool]]] = None) -> dict:
+    """Cheapest distance (and optionally path) from every source to every target.
+
+    Args:
+        grid: 2D list of cell values or a GridGraph
+        sources: (row, col) tuples to measure from
+        targets: (row, col) tuples to measure to
+        paths: Also return the path of every reachable pair
+        connected: Optional sources x targets matrix; pairs marked False
+            are known to be unreachable (e.g. from a ComponentIndex) and are
+            neither searched for nor waited on
+
+    Returns:
+        Dictionary containing:
+        - distances: sources x targets matrix of path costs, None where unreachable
+        - paths: sources x targets matrix of (row, col) paths, None where
+          unreachable (only if paths is set)
+        - searches: Number of distance fields grown
+        - nodes_expanded: Cells expanded across all of them
+        - time_taken: Execution time in seconds
+    """
+    return run_steps(many_to_many_steps(grid, sources, targets, paths, connected))
+
+
+def many_to_many_steps(grid: Union[GridGraph, List[List[int]]], sources: Sequence[Tuple[int, int]],
+                       targets: Sequence[Tuple[int, int]], paths: bool = False,
+                       connected: Optional[Sequence[Sequence[bool]]] = None
+                       ) -> Generator[int, Optional[bool], dict]:
+    """Generator version of many_to_many that pauses after each distance
+    field but the last.
+
+    Yields:
+        The number of cells the field just grown expanded. Sending True
+        back stops before the next field.
+
+    Returns:
+        The many_to_many result dict (via StopIteration). If it was stopped
+        early, pairs not yet measured are None and budget_exceeded is set.
+        time_taken excludes time spent suspended at a yield.
+    """
+    graph = as_graph(grid)
+    start_ns = time.perf_counter_ns()
+    source_cells = [graph.index(*cell) for cell in sources]
+    target_cells = [graph.index(*cell) for cell in targets]
+    reverse = len(set(target_cells)) < len(set(source_cells))
+    # Grow fields from the "roots" side and stop on the "ends" side
+    roots, ends = (target_cells, source_cells) if reverse else (source_cells, target_cells)
+
+    def wanted(root_at: int, end_at: int) -> bool:
+        if connected is None:
+            return True
+        return connected[end_at][root_at] if reverse else connected[root_at][end_at]
+
+    distances: List[List[Optional[int]]] = [[None] * len(targets) for _ in sources]
+    routes: List[List[Optional[list]]] = [[None] * len(targets) for _ in sources]
+    # One field per distinct root, dropped as soon as it has been read
+    by_root = {}
+    for i, root in enumerate(roots):
+        by_root.setdefault(root, []).append(i)
+    fields = []
+    for root, indices in by_root.items():
+        stop = {end for i in indices for j, end in enumerate(ends) if wanted(i, j)}
+        if stop:
+            fields.append((root, indices, stop))
+    searches = 0
+    nodes_expanded = 0
+    stopped = False
+    for n, (root, indices, stop) in enumerate(fields):
+        distance, parent, expanded = distance_field(graph, root, stop, reverse)
+        searches += 1
+        nodes_expanded += expanded
+        for i in indices:
+            for j, end in enumerate(ends):
+                if not wanted(i, j) or distance[end] < 0:
+                    continue
+                row, col = (j, i) if reverse else (i, j)
+                distances[row][col] = distance[end]
+                if paths:
+                    # path_to runs root first; a reverse field's root is the target
+                    route = graph.path_to(parent, end)
+                    if reverse:
+                        route.reverse()
+                    routes[row][col] = graph.cells(route)
+        if n + 1 < len(fields):
+            paused = time.perf_counter_ns()
+            stopped = bool((yield expanded))
+            start_ns += time.perf_counter_ns() - paused
+            if stopped:
+                break
+
+    result = {
+        "distances": distances,
+        "searches": searches,
+        "nodes_expanded": nodes_expanded,
+        "time_taken": (time.perf_counter_ns() - start_ns) / 1e9,
+    }
+    if paths:
+        result["paths"] = routes
+    if stopped:
+        result["budget_exceeded"] = True
+    return result
@@ -0,0 +1,149 @@
+"""Level-synchronous, NumPy-vectorized BFS and bidirectional BFS.
+
+Instead of popping one cell at a time from a deque, these advance the whole
+frontier per step: each level is an array of flat cell indices, and its
+neighbours in each direction are one array add plus a boolean mask over the
+open-cell grid. Parents are recorded in a flat index array, so the path is
+recovered exactly as in the scalar versions.
+
+Within a level cells are expanded in row-major order, so the visit order
+handed to the visualization is level by level rather than the exact deque
+order of bfs.bfs. Path lengths are identical (both are shortest paths).
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from .grid import GridGraph
+
+
+def _walk(parent: np.ndarray, index: int) -> List[int]:
+    """Follow parent pointers from index back to the root (parent == self)."""
+    path = [index]
+    while int(parent[index]) != index:
+        index = int(parent[index])
+        path.append(index)
+    return path
+
+
+def _expand(frontier: np.ndarray, graph: GridGraph, free: np.ndarray,
+            parent: np.ndarray) -> np.ndarray:
+    """Discover every unseen open neighbour of frontier and set its parent.
+
+    Directions are applied in the usual right, down, left, up order, then
+    graph's diagonals, so a cell reachable from two frontier cells keeps the
+    first one, matching the scalar search. Returns the next level sorted
+    into row-major order.
+    """
+    discovered = []
+    for offset in graph.offsets:
+        neighbors = frontier + offset
+        neighbors = neighbors[free[neighbors] & (parent[neighbors] < 0)]
+        parent[neighbors] = neighbors - offset
+        discovered.append(neighbors)
+    if graph.diagonals:
+        walls = np.frombuffer(graph.blocked, dtype=np.uint8)
+        for offset, side, other_side in graph.diagonals:
+            neighbors = frontier + offset
+            allowed = walls[frontier + side] + walls[frontier + other_side] <= graph.corner_limit
+            neighbors = neighbors[free[neighbors] & (parent[neighbors] < 0) & allowed]
+            parent[neighbors] = neighbors - offset
+            discovered.append(neighbors)
+    return np.sort(np.concatenate(discovered))
+
+
+def _order(levels: List[np.ndarray]) -> np.ndarray:
+    """The recorded levels as one visit-order array (empty if none were kept)."""
+    return np.concatenate(levels) if levels else np.empty(0, dtype=np.intp)
+
+
+def bfs_levels(graph: GridGraph, source: int, target: int,
+               record: bool = True) -> Tuple[bool, List[int], np.ndarray, int, int]:
+    """Run a vectorized BFS from source until target is reached.
+
+    Returns:
+        (found, path, visited, nodes_expanded, peak_frontier), with path a
+        list of flat indices and visited an index array (empty unless
+        record is set)
+    """
+    free = np.frombuffer(graph.blocked, dtype=np.uint8) == 0
+    parent = np.full(graph.size, -1, dtype=np.intp)
+    parent[source] = source
+    frontier = np.array([source], dtype=np.intp)
+    levels = []
+    nodes_expanded = 0
+    peak_frontier = 1
+
+    while frontier.size:
+        # The target was discovered by the previous level - expand it alone,
+        # like the scalar BFS which stops as soon as it pops the target.
+        if parent[target] >= 0:
+            if record:
+                levels.append(np.array([target], dtype=np.intp))
+            nodes_expanded += 1
+            path = _walk(parent, target)
+            path.reverse()
+            return True, path, _order(levels), nodes_expanded, peak_frontier
+
+        if record:
+            levels.append(frontier)
+        nodes_expanded += frontier.size
+        frontier = _expand(frontier, graph, free, parent)
+        peak_frontier = max(peak_frontier, frontier.size)
+
+    return False, [], _order(levels), nodes_expanded, peak_frontier
+
+
+def bidirectional_levels(graph: GridGraph, source: int, target: int,
+                         record: bool = True) -> Tuple[bool, List[int], np.ndarray, int, int]:
+    """Run a vectorized bidirectional BFS, always advancing the smaller frontier.
+
+    Both sides only ever expand whole levels, so the first level that
+    discovers a cell already seen by the other side yields a shortest path
+    through any such cell.
+
+    Returns:
+        (found, path, visited, nodes_expanded, peak_frontier), with path a
+        list of flat indices and visited an index array (empty unless
+        record is set)
+    """
+    free = np.frombuffer(graph.blocked, dtype=np.uint8) == 0
+    start_parent = np.full(graph.size, -1, dtype=np.intp)
+    start_parent[source] = source
+    end_parent = np.full(graph.size, -1, dtype=np.intp)
+    end_parent[target] = target
+    start_frontier = np.array([source], dtype=np.intp)
+    end_frontier = np.array([target], dtype=np.intp)
+    levels = []
+    nodes_expanded = 0
+    peak_frontier = 2
+
+    while start_frontier.size and end_frontier.size:
+        # Ties go to the start side so the first expansion is always start
+        forward = start_frontier.size <= end_frontier.size
+        if forward:
+            frontier, parent, other = start_frontier, start_parent, end_parent
+        else:
+            frontier, parent, other = end_frontier, end_parent, start_parent
+
+        if record:
+            levels.append(frontier)
+        nodes_expanded += frontier.size
+        frontier = _expand(frontier, graph, free, parent)
+
+        met = frontier[other[frontier] >= 0]
+        if met.size:
+            meeting_point = int(met[0])
+            path = _walk(start_parent, meeting_point)
+            path.reverse()
+            path.extend(_walk(end_parent, meeting_point)[1:])
+            return True, path, _order(levels), nodes_expanded, peak_frontier
+
+        if forward:
+            start_frontier = frontier
+        else:
+            end_frontier = frontier
+        peak_frontier = max(peak_frontier, start_frontier.size + end_frontier.size)
+
+    return False, [], _order(levels), nodes_expanded, peak_frontier
@@ -0,0 +1,370 @@
+"""Flat, array-backed grid representation shared by every search algorithm.
+
+Cells are stored row-major in a single bytearray that is padded with a
+one-cell wall border, so a cell is a plain integer index and its four
+neighbours are fixed offsets from it. Because of the border, stepping off
+the grid always lands on a wall, so neighbour probes never need a bounds
+check and never allocate a (row, col) tuple.
+
+Per-search state (parents, distances, closed sets) lives in flat arrays
+indexed the same way; (row, col) tuples are only produced once, when a
+result is handed back to the caller.
+
+Cell values: 0 is an open cell, 1 is a wall, and 2-255 is open terrain that
+costs that much to step onto (a 0 cell costs 1). Grids without terrain keep
+cost set to None, and every step costs 1.
+
+Movement is 4-connected unless a search is given with_connectivity(8), which
+adds diagonal steps costing sqrt(2) times the cell's cost. Searches add up
+costs as integers, so in that mode they count in units of 1/STRAIGHT: an
+orthogonal step costs STRAIGHT and a diagonal one DIAGONAL per unit of cell
+cost (99/70 is within 0.001% of sqrt(2)).
+"""
+
+from array import array
+from hashlib import blake2b
+from typing import Generator, Iterable, List, Optional, Sequence, Tuple, Union
+import math
+import time
+
+
+# bytes.translate tables from cell values to blocked flags and step costs
+_WALLS = bytes(1 if value == 1 else 0 for value in range(256))
+_COSTS = bytes(max(value, 1) for value in range(256))
+
+# Integer step costs with diagonal movement (see the module docstring)
+STRAIGHT = 70
+DIAGONAL = 99
+
+# How many of the two cells a diagonal step cuts across may be walls
+CORNER_CUTTING = {"never": 0, "single": 1, "always": 2}
+
+
+class GridGraph:
+    """A rows x cols grid of open (0), blocked (1) and weighted (2-255) cells.
+
+    Attributes:
+        rows: Number of rows in the original grid
+        cols: Number of columns in the original grid
+        width: Row stride of the padded buffer (cols + 2)
+        size: Total number of cells in the padded buffer
+        blocked: bytearray of length size, 1 for walls and border cells
+        cost: bytearray of length size holding the cost of stepping onto
+            each cell, or None when every step costs 1. Both can also be
+            writable memoryviews, e.g. of shared memory (see shared.py)
+        max_cost: Largest step cost (1 without terrain)
+        offsets: Index offsets for right, down, left, up - the same
+            neighbour order the algorithms have always used
+        diagonals: (offset, side, side) for each diagonal step, the sides
+            being the offsets of the two cells it cuts across; empty unless
+            the graph came from with_connectivity(8)
+        corner_limit: How many of a diagonal step's sides may be walls
+            (see CORNER_CUTTING)
+        flat_cells: If set, cells() leaves flat indices as they are (see
+            index_view)
+        patched_from: (graph, flat indices) if this graph came from
+            graph.patched() with those cells changed, so derived data of the
+            original can be updated rather than rebuilt; None otherwise, and
+            never pickled
+    """
+
+    __slots__ = ("rows", "cols", "width", "size", "blocked", "cost", "max_cost", "offsets", "_digest",
+                 "flat_cells", "diagonals", "corner_limit", "patched_from")
+
+    def __init__(self, rows: int, cols: int, blocked: bytearray,
+                 cost: Optional[bytearray] = None, max_cost: Optional[int] = None):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.size = self.width * (rows + 2)
+        if len(blocked) != self.size:
+            raise ValueError("Blocked buffer does not match the padded grid size")
+        if cost is not None and len(cost) != self.size:
+            raise ValueError("Cost buffer does not match the padded grid size")
+        self.blocked = blocked
+        self.cost = cost
+        if max_cost is None:
+            max_cost = max(cost) if cost is not None else 1
+        self.max_cost = max_cost
+        self._digest: Optional[str] = None
+        self.flat_cells = False
+        # 4-directional movement: right, down, left, up
+        self.offsets = (1, self.width, -1, -self.width)
+        self.diagonals: Tuple[Tuple[int, int, int], ...] = ()
+        self.corner_limit = 0
+        self.patched_from: Optional[Tuple["GridGraph", Tuple[int, ...]]] = None
+
+    def __getstate__(self):
+        # Workers get the grid alone, not the grid it was patched from
+        return None, {name: getattr(self, name) for name in GridGraph.__slots__ if name != "patched_from"}
+
+    def __setstate__(self, state):
+        for name, value in state[1].items():
+            setattr(self, name, value)
+        self.patched_from = None
+
+    @classmethod
+    def from_rows(cls, grid: Sequence[Sequence[int]]) -> "GridGraph":
+        """Build a graph from a 2D list of cell values (see the module docstring).
+
+        Raises:
+            ValueError: If rows differ in length or a value is outside 0-255
+        """
+        rows, cols = len(grid), len(grid[0])
+        width = cols + 2
+        values = bytearray(b"\x01") * (width * (rows + 2))
+        for r, row in enumerate(grid, 1):
+            if len(row) != cols:
+                raise ValueError("Grid rows must all have the same length")
+            base = r * width + 1
+            try:
+                values[base:base + cols] = bytes(row)
+            except (TypeError, ValueError):
+                raise ValueError("Grid cells must be integers from 0 to 255")
+        blocked = bytearray(values.translate(_WALLS))
+        # Deleting every 0 and 1 leaves something only if there is terrain
+        weighted = bool(values.translate(None, b"\x00\x01"))
+        cost = bytearray(values.translate(_COSTS)) if weighted else None
+        return cls(rows, cols, blocked, cost)
+
+    def digest(self) -> str:
+        """Content hash of the grid, for keying caches. Computed once."""
+        if self._digest is None:
+            h = blake2b(digest_size=16)
+            h.update(self.rows.to_bytes(4, "little"))
+            h.update(self.cols.to_bytes(4, "little"))
+            h.update(self.blocked)
+            if self.cost is not None:
+                h.update(self.cost)
+            self._digest = h.hexdigest()
+        return self._digest
+
+    def index(self, row: int, col: int) -> int:
+        """Flat buffer index of (row, col)."""
+        return (row + 1) * self.width + col + 1
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        """(row, col) of a flat buffer index."""
+        row, col = divmod(index, self.width)
+        return (row - 1, col - 1)
+
+    def cells(self, indices: Iterable[int]) -> Union[List[Tuple[int, int]], array]:
+        """Convert a sequence of flat indices to (row, col) tuples.
+
+        NumPy index arrays are converted in bulk rather than element by
+        element. On an index_view() the indices come back unconverted, as
+        an array('i').
+        """
+        width = self.width
+        if self.flat_cells:
+            flat = array("i")
+            if hasattr(indices, "__array__"):
+                flat.frombytes(indices.astype("int32").tobytes())
+            else:
+                flat.extend(indices)
+            return flat
+        if hasattr(indices, "__array__"):
+            rows, cols = divmod(indices, width)
+            return list(zip((rows - 1).tolist(), (cols - 1).tolist()))
+        return [(i // width - 1, i % width - 1) for i in indices]
+
+    def is_open(self, row: int, col: int) -> bool:
+        """Check if a position is within grid bounds and not a wall."""
+        return (
+            0 <= row < self.rows
+            and 0 <= col < self.cols
+            and not self.blocked[self.index(row, col)]
+        )
+
+    def index_view(self) -> "GridGraph":
+        """This graph, sharing its buffers, but with cells() a no-op.
+
+        Searches run on the view return path and visited as flat indices
+        (array('i')), for callers that re-encode the visit order anyway and
+        would otherwise pay for a (row, col) tuple per expanded cell.
+        """
+        view = self._view()
+        view.flat_cells = True
+        return view
+
+    def with_connectivity(self, connectivity: int, corner_cutting: str = "never") -> "GridGraph":
+        """This graph, sharing its buffers, with the given movement rules.
+
+        Args:
+            connectivity: 4, or 8 to add the diagonal steps (down-right,
+                down-left, up-left, up-right, tried after the orthogonal ones)
+            corner_cutting: When a diagonal step may pass a wall on one of
+                the two cells it cuts across: "never" (both must be open),
+                "single" (one may be a wall) or "always" (even between two)
+
+        Raises:
+            ValueError: For any other connectivity or corner_cutting
+        """
+        if connectivity not in (4, 8) or corner_cutting not in CORNER_CUTTING:
+            raise ValueError("connectivity must be 4 or 8, corner_cutting one of " + ", ".join(CORNER_CUTTING))
+        view = self._view()
+        width = self.width
+        if connectivity == 8:
+            view.diagonals = ((width + 1, 1, width), (width - 1, -1, width),
+                              (-width - 1, -1, -width), (-width + 1, 1, -width))
+            view.corner_limit = CORNER_CUTTING[corner_cutting]
+        else:
+            view.diagonals = ()
+            view.corner_limit = 0
+        return view
+
+    def _view(self) -> "GridGraph":
+        view = object.__new__(GridGraph)
+        for name in GridGraph.__slots__:
+            setattr(view, name, getattr(self, name))
+        return view
+
+    def step_costs(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """Per-cell costs of an orthogonal and of a diagonal step onto each cell.
+
+        Plain cell costs (see the module docstring) on a 4-connected graph,
+        scaled by STRAIGHT and DIAGONAL with diagonal movement.
+        """
+        base = self.cost if self.cost is not None else b"\x01" * self.size
+        if not self.diagonals:
+            return base, base
+        return array("i", [STRAIGHT * value for value in base]), array("i", [DIAGONAL * value for value in base])
+
+    def max_step_cost(self) -> int:
+        """Largest value step_costs() can hold."""
+        return self.max_cost * DIAGONAL if self.diagonals else self.max_cost
+
+    def copy(self) -> "GridGraph":
+        """An independent copy, safe to edit with set_value."""
+        return GridGraph(self.rows, self.cols, bytearray(self.blocked),
+                         bytearray(self.cost) if self.cost is not None else None)
+
+    def set_value(self, index: int, value: int) -> None:
+        """Change the cell at flat index to a new cell value (0-255).
+
+        Graphs are shared through caches keyed by digest(), so only edit a
+        copy() you own. max_cost never shrinks; it stays an upper bound.
+
+        Raises:
+            ValueError: If value is outside 0-255
+        """
+        if not 0 <= value <= 255:
+            raise ValueError("Grid cells must be integers from 0 to 255")
+        self._digest = None
+        self.patched_from = None
+        self.blocked[index] = value == 1
+        if value > 1 and self.cost is None:
+            self.cost = bytearray(b"\x01") * self.size
+        if self.cost is not None:
+            self.cost[index] = max(value, 1)
+            self.max_cost = max(self.max_cost, value)
+
+    def patched(self, changes: Sequence[Tuple[int, int, int]]) -> "GridGraph":
+        """A copy with (row, col, value) edits applied.
+
+        The copy's digest is derived from this graph's digest and the edits,
+        so it costs O(len(changes)) instead of rehashing the whole grid. The
+        same content reached through different edits gets a different
+        digest, which only costs a cache miss. The copy records
+        patched_from.
+        """
+        graph = self.copy()
+        h = blake2b(self.digest().encode(), digest_size=16)
+        for row, col, value in changes:
+            graph.set_value(graph.index(row, col), value)
+            h.update(b"%d,%d,%d;" % (row, col, value))
+        graph._digest = h.hexdigest()
+        graph.patched_from = (self, tuple(graph.index(row, col) for row, col, _ in changes))
+        return graph
+
+    def path_cost(self, path: Sequence[int]) -> Union[int, float]:
+        """Total cost of walking path (flat indices), not counting its first cell.
+
+        With diagonal movement diagonal steps cost exactly sqrt(2) times the
+        cell's cost, and the total is a float rounded to 4 decimals.
+        """
+        if not path:
+            return 0
+        if not self.diagonals:
+            if self.cost is None:
+                return len(path) - 1
+            cost = self.cost
+            return sum(cost[index] for index in path[1:])
+        cost = self.cost if self.cost is not None else b"\x01" * self.size
+        orthogonal = (1, self.width)
+        straight = diagonal = 0
+        for a, b in zip(path, path[1:]):
+            if abs(b - a) in orthogonal:
+                straight += cost[b]
+            else:
+                diagonal += cost[b]
+        return round(straight + diagonal * math.sqrt(2), 4)
+
+    def new_parents(self) -> array:
+        """A parent array with every cell marked unseen (-1)."""
+        return array("i", [-1]) * self.size
+
+    def path_to(self, parent: array, index: int) -> List[int]:
+        """Walk parent pointers back from index to the search root.
+
+        The root is the cell whose parent is itself. Returns flat indices in
+        root-to-index order.
+        """
+        path = [index]
+        while parent[index] != index:
+            index = parent[index]
+            path.append(index)
+        path.reverse()
+        return path
+
+
+def as_graph(grid: Union[GridGraph, Sequence[Sequence[int]]]) -> GridGraph:
+    """Return grid as a GridGraph, converting a 2D list if needed."""
+    if isinstance(grid, GridGraph):
+        return grid
+    return GridGraph.from_rows(grid)
+
+
+def search_result(graph: GridGraph, start_ns: int, stop_ns: int, nodes_expanded: int,
+                  visited: Iterable[int], path: Optional[List[int]] = None,
+                  **profile: int) -> dict:
+    """Assemble the result dict every algorithm returns.
+
+    Args:
+        graph: The graph that was searched
+        start_ns: perf_counter_ns() when the search loop started
+        stop_ns: perf_counter_ns() when it stopped, before any path work
+        nodes_expanded: Number of nodes explored
+        visited: Flat indices in order of exploration
+        path: Flat indices from start to end, or None if no path was found
+        **profile: Extra counters for the profile block (grid_ns,
+            peak_frontier, queue_pushes, ...)
+
+    Returns:
+        Dictionary containing found, time_taken (search plus path
+        reconstruction, in seconds), nodes_expanded, path and visited as
+        (row, col) tuples, path_cost (see GridGraph.path_cost), and profile: search_ns, path_ns and the extra
+        counters.
+    """
+    path_cells = graph.cells(path) if path is not None else []
+    visited_cells = graph.cells(visited)
+    path_ns = time.perf_counter_ns() - stop_ns
+    search_ns = stop_ns - start_ns
+    return {
+        "found": path is not None,
+        "time_taken": (search_ns + path_ns) / 1e9,
+        "nodes_expanded": nodes_expanded,
+        "path": path_cells,
+        "path_cost": graph.path_cost(path) if path is not None else 0,
+        "visited": visited_cells,
+        "profile": {"search_ns": search_ns, "path_ns": path_ns, **profile},
+    }
+
+
+def run_steps(steps: Generator[List[Tuple[int, int]], None, dict]) -> dict:
+    """Exhaust a *_steps search generator and return its final result dict."""
+    try:
+        while True:
+            next(steps)
+    except StopIteration as done:
+        return done.value
@@ -0,0 +1,452 @@
+"""Hierarchical pathfinding A* (HPA*) for very large grids.
+
+HPA* (Botea, Mueller and Schaeffer) splits the grid into square clusters
+and plans on a small abstract graph instead of on cells:
+
+- Entrances: along each border between two clusters, every maximal run of
+  cell pairs open on both sides gets one transition in its middle, or two
+  at its ends if it is 6 or more cells long. The two cells of a transition
+  become abstract nodes joined by a one-step edge.
+- Intra-cluster edges: the exact shortest distance between each pair of
+  abstract nodes of a cluster, moving only inside that cluster.
+
+The abstraction depends only on the grid, so it is built once per grid
+content (cached by digest) and reused by every later query. Building it
+runs one NumPy frontier relaxation per entrance rank across all clusters
+at once, rather than one search per entrance.
+
+A query links start and end to the entrances of their own clusters with
+small in-cluster searches, runs A* over the abstract graph, and then
+refines only the abstract edges on the result into cells, each with an A*
+confined to one cluster. Paths are valid but near-optimal rather than
+shortest: a path is only as short as the entrances placed on it allow.
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, Generator, List, Optional, Tuple, Union
+import heapq
+import threading
+import time
+
+import numpy as np
+
+from .grid import GridGraph, as_graph, run_steps, search_result
+
+
+# Cluster side length, in cells
+CLUSTER_SIZE = 32
+
+# Abstractions kept, least recently used first out
+_CACHE_ENTRIES = 8
+_cache: "OrderedDict[Tuple[str, int], AbstractGraph]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+_UNREACHED = np.iinfo(np.int32).max
+_NO_EDGES = ((), ())
+
+
+class AbstractGraph:
+    """Entrances and abstract edges of a grid split into clusters.
+
+    Attributes:
+        cluster_size: Cluster side length in cells
+        cluster_cols: Number of clusters per row of clusters
+        entrances: Cluster id -> flat indices of its abstract nodes
+        edges: Abstract node -> (nodes, costs), two parallel int arrays
+            of the edges out of it (arrays rather than tuples keep the
+            cached abstraction of a large grid small)
+        build_ns: Time it took to build
+    """
+
+    __slots__ = ("cluster_size", "cluster_cols", "entrances", "edges", "build_ns")
+
+    def __init__(self, cluster_size: int, cluster_cols: int):
+        self.cluster_size = cluster_size
+        self.cluster_cols = cluster_cols
+        self.entrances: Dict[int, List[int]] = {}
+        self.edges: Dict[int, Tuple[array, array]] = {}
+        self.build_ns = 0
+
+    def _edges_from(self, node: int) -> Tuple[array, array]:
+        edges = self.edges.get(node)
+        if edges is None:
+            edges = self.edges[node] = (array("i"), array("i"))
+        return edges
+
+    def _add_edge(self, a: int, b: int, cost: int) -> None:
+        nodes, costs = self._edges_from(a)
+        nodes.append(b)
+        costs.append(cost)
+
+    @classmethod
+    def build(cls, graph: GridGraph, cluster_size: int = CLUSTER_SIZE) -> "AbstractGraph":
+        """Find the entrances and intra-cluster distances of graph."""
+        began = time.perf_counter_ns()
+        size = cluster_size
+        rows, cols, width = graph.rows, graph.cols, graph.width
+        abstract = cls(size, -(-cols // size))
+        free = np.frombuffer(bytes(graph.blocked), dtype=np.uint8) == 0
+        if graph.cost is not None:
+            step = np.frombuffer(bytes(graph.cost), dtype=np.uint8)
+        else:
+            step = np.ones(graph.size, dtype=np.uint8)
+        grid = free.reshape(rows + 2, width)[1:-1, 1:-1]
+        entrance_set = set()
+
+        def transitions(pairs: np.ndarray) -> List[int]:
+            """Positions of the transitions along one border segment."""
+            edges = np.diff(np.concatenate(([0], pairs.view(np.int8), [0])))
+            found = []
+            for first, stop in zip(np.flatnonzero(edges == 1).tolist(),
+                                   np.flatnonzero(edges == -1).tolist()):
+                length = stop - first
+                found.extend((first + length // 2,) if length < 6 else (first, stop - 1))
+            return found
+
+        def link(a: int, b: int) -> None:
+            abstract._add_edge(a, b, int(step[b]))
+            abstract._add_edge(b, a, int(step[a]))
+            entrance_set.update((a, b))
+
+        for col in range(size, cols, size):
+            pairs = grid[:, col - 1] & grid[:, col]
+            for top in range(0, rows, size):
+                for offset in transitions(pairs[top:top + size]):
+                    row = top + offset
+                    link(graph.index(row, col - 1), graph.index(row, col))
+        for row in range(size, rows, size):
+            pairs = grid[row - 1, :] & grid[row, :]
+            for left in range(0, cols, size):
+                for offset in transitions(pairs[left:left + size]):
+                    col = left + offset
+                    link(graph.index(row - 1, col), graph.index(row, col))
+
+        for index in sorted(entrance_set):
+            abstract.entrances.setdefault(abstract.cluster(graph, index), []).append(index)
+
+        # Distances between the entrances of each cluster come from a
+        # frontier relaxation run on every entrance at once, in chunks. Each
+        # source gets its own copy of its cluster, laid out as a row of
+        # (size + 2) ** 2 cells with a wall border, so moves can never leave
+        # the cluster and sources never interfere.
+        stride = size + 2
+        local_size = stride * stride
+        cluster_rows = -(-rows // size)
+        clusters = cluster_rows * abstract.cluster_cols
+
+        def tiles(values: np.ndarray, fill) -> np.ndarray:
+            """values (rows x cols) cut into per-cluster tiles, bordered by fill."""
+            whole = np.full((cluster_rows * size, abstract.cluster_cols * size), fill, dtype=values.dtype)
+            whole[:rows, :cols] = values
+            blocks = whole.reshape(cluster_rows, size, abstract.cluster_cols, size).swapaxes(1, 2)
+            tiled = np.full((clusters, stride, stride), fill, dtype=values.dtype)
+            tiled[:, 1:-1, 1:-1] = blocks.reshape(clusters, size, size)
+            return tiled.reshape(clusters, local_size)
+
+        open_tiles = tiles(grid, False)
+        weighted = graph.cost is not None
+        if weighted:
+            step_tiles = tiles(step.reshape(rows + 2, width)[1:-1, 1:-1].astype(np.int32), 1)
+
+        def local(index: int) -> int:
+            row, col = divmod(index, width)
+            return ((row - 1) % size + 1) * stride + (col - 1) % size + 1
+
+        targets = {cluster: (np.array(nodes), np.array([local(node) for node in nodes], dtype=np.int64))
+                   for cluster, nodes in abstract.entrances.items()}
+        sources = [(cluster, node, position) for cluster, (nodes, positions) in targets.items()
+                   for node, position in zip(nodes.tolist(), positions.tolist())]
+        chunk = max(1, (1 << 22) // local_size)
+        offsets = (1, stride, -1, -stride)
+        for first in range(0, len(sources), chunk):
+            batch = sources[first:first + chunk]
+            owner = np.array([cluster for cluster, _, _ in batch], dtype=np.int64)
+            free_cells = open_tiles[owner].ravel()
+            costs = step_tiles[owner].ravel() if weighted else None
+            distance = np.full(len(batch) * local_size, _UNREACHED, dtype=np.int32)
+            # Scratch for dropping repeats from a frontier without sorting it
+            slot = np.empty(len(distance), dtype=np.int64)
+            frontier = np.arange(len(batch), dtype=np.int64) * local_size + \
+                np.array([position for _, _, position in batch], dtype=np.int64)
+            distance[frontier] = 0
+            level = 0
+            while len(frontier):
+                level += 1
+                improved = []
+                for offset in offsets:
+                    origin = frontier[free_cells[frontier + offset]]
+                    neighbors = origin + offset
+                    if weighted:
+                        candidate = distance[origin] + costs[neighbors]
+                        better = candidate < distance[neighbors]
+                        neighbors = neighbors[better]
+                        np.minimum.at(distance, neighbors, candidate[better])
+                    else:
+                        # Breadth-first: every cell reached now is at this level
+                        neighbors = neighbors[distance[neighbors] == _UNREACHED]
+                        distance[neighbors] = level
+                    improved.append(neighbors)
+                frontier = np.concatenate(improved)
+                order = np.arange(len(frontier))
+                slot[frontier] = order
+                frontier = frontier[slot[frontier] == order]
+            distance = distance.reshape(len(batch), local_size)
+            for row, (cluster, source, position) in enumerate(batch):
+                nodes, positions = targets[cluster]
+                reached = distance[row, positions]
+                keep = (reached != _UNREACHED) & (positions != position)
+                out_nodes, out_costs = abstract._edges_from(source)
+                out_nodes.extend(nodes[keep].tolist())
+                out_costs.extend(reached[keep].tolist())
+
+        abstract.build_ns = time.perf_counter_ns() - began
+        return abstract
+
+    def cluster(self, graph: GridGraph, index: int) -> int:
+        """Cluster id of the cell at flat index."""
+        row, col = divmod(index, graph.width)
+        return ((row - 1) // self.cluster_size) * self.cluster_cols + (col - 1) // self.cluster_size
+
+    def bounds(self, graph: GridGraph, index: int) -> Tuple[int, int, int, int]:
+        """Padded (first row, end row, first col, end col) of index's cluster."""
+        row, col = divmod(index, graph.width)
+        size = self.cluster_size
+        top = (row - 1) // size * size + 1
+        left = (col - 1) // size * size + 1
+        return top, min(top + size, graph.rows + 1), left, min(left + size, graph.cols + 1)
+
+
+def abstraction(graph: GridGraph, cluster_size: int = CLUSTER_SIZE) -> Tuple[AbstractGraph, bool]:
+    """The AbstractGraph of graph, from the cache if it was built before.
+
+    Returns:
+        The abstraction and whether it came from the cache
+    """
+    key = (graph.digest(), cluster_size)
+    with _cache_lock:
+        abstract = _cache.get(key)
+        if abstract is not None:
+            _cache.move_to_end(key)
+            return abstract, True
+    abstract = AbstractGraph.build(graph, cluster_size)
+    with _cache_lock:
+        _cache[key] = abstract
+        while len(_cache) > _CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return abstract, False
+
+
+def _local_search(graph: GridGraph, source: int, bounds: Tuple[int, int, int, int],
+                  goal: Optional[int] = None, reverse: bool = False):
+    """A* (Dijkstra without a goal) from source, never leaving bounds.
+
+    With reverse set, distances are to source rather than from it (the cost
+    of a step is still that of the cell stepped onto).
+
+    Returns:
+        (distance, parent, order): dicts of the distance and parent of every
+        settled cell, and the cells in order of expansion
+    """
+    blocked, width, offsets = graph.blocked, graph.width, graph.offsets
+    cost = graph.cost
+    top, bottom, left, right = bounds
+    if goal is not None:
+        goal_row, goal_col = divmod(goal, width)
+
+    def heuristic(index: int) -> int:
+        if goal is None:
+            return 0
+        r, c = divmod(index, width)
+        return abs(r - goal_row) + abs(c - goal_col)
+
+    distance = {source: 0}
+    parent = {source: source}
+    settled = set()
+    order = []
+    queue = [(heuristic(source), 0, source)]
+    while queue:
+        _, d, current = heapq.heappop(queue)
+        if current in settled:
+            continue
+        settled.add(current)
+        order.append(current)
+        if current == goal:
+            break
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or neighbor in settled:
+                continue
+            r, c = divmod(neighbor, width)
+            if not (top <= r < bottom and left <= c < right):
+                continue
+            step = 1 if cost is None else cost[current if reverse else neighbor]
+            known = distance.get(neighbor)
+            if known is None or d + step < known:
+                distance[neighbor] = d + step
+                parent[neighbor] = current
+                heapq.heappush(queue, (d + step + heuristic(neighbor), d + step, neighbor))
+    return {index: distance[index] for index in settled}, parent, order
+
+
+def _walk(parent: Dict[int, int], index: int) -> List[int]:
+    path = [index]
+    while parent[index] != index:
+        index = parent[index]
+        path.append(index)
+    path.reverse()
+    return path
+
+
+def hpa_star(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+             cluster_size: int = CLUSTER_SIZE, record: bool = True) -> dict:
+    """Find a near-shortest path from start to end using HPA*.
+
+    Args:
+        grid: 2D list where 0 represents an open cell, 1 a wall and 2-255 an
+            open cell with that step cost, or an already-built GridGraph
+        start: Starting position as (row, col) tuple
+        end: Target position as (row, col) tuple
+        cluster_size: Cluster side length in cells
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
+    Returns:
+        Dictionary containing:
+        - found: Boolean indicating if a path was found
+        - time_taken: Execution time in seconds, excluding building the abstraction
+        - nodes_expanded: Number of cells and abstract nodes explored
+        - path: List of (row, col) tuples representing the path
+        - path_cost: Total step cost of path
+        - visited: List of (row, col) tuples in order of exploration
+        - profile: also holds abstraction_ns (time spent building the
+          abstraction, 0 when it was cached) and abstract_nodes
+    """
+    return run_steps(hpa_star_steps(grid, start, end, cluster_size=cluster_size,
+                                    record=record))
+
+
+def hpa_star_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+                   batch_size: int = 0,
+                   cluster_size: int = CLUSTER_SIZE,
+                   record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of hpa_star that hands out explored cells as it goes.
+
+    Args:
+        grid, start, end, cluster_size, record: As for hpa_star
+        batch_size: Yield the visit order in lists of at least this many
+            (row, col) cells while the search runs; 0 never yields
+
+    Returns:
+        The hpa_star result dict (via StopIteration), whose visited list
+        holds only the cells not already yielded. time_taken excludes time
+        spent suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    if graph.diagonals:
+        raise ValueError("HPA* only supports 4-connected movement")
+    abstract, cached = abstraction(graph, cluster_size)
+    abstraction_ns = 0 if cached else abstract.build_ns
+    width = graph.width
+    source = graph.index(*start)
+    target = graph.index(*end)
+    end_row, end_col = divmod(target, width)
+
+    visited_order = array("i")
+    nodes_expanded = 0
+    peak_frontier = 1
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
+
+    def finish(path: Optional[List[int]]) -> dict:
+        return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                             path, grid_ns=grid_ns, peak_frontier=peak_frontier,
+                             abstraction_ns=abstraction_ns, abstract_nodes=len(abstract.edges))
+
+    # Link start and end into the abstract graph through their clusters,
+    # without touching the cached edges
+    extra: Dict[int, Tuple[List[int], List[int]]] = {}
+    from_start, _, order = _local_search(graph, source, abstract.bounds(graph, source))
+    nodes_expanded += len(order)
+    if record:
+        visited_order.extend(order)
+    start_cluster = abstract.cluster(graph, source)
+    linked = [node for node in abstract.entrances.get(start_cluster, ()) if node in from_start]
+    if target in from_start:
+        linked.append(target)
+    extra[source] = (linked, [from_start[node] for node in linked])
+    if graph.blocked[target]:
+        # Walls are never entered, so only start == end can reach one
+        to_end = {}
+    else:
+        to_end, _, order = _local_search(graph, target, abstract.bounds(graph, target), reverse=True)
+        nodes_expanded += len(order)
+        if record:
+            visited_order.extend(order)
+    for node in abstract.entrances.get(abstract.cluster(graph, target), ()):
+        if node in to_end:
+            nodes, weights = extra.setdefault(node, ([], []))
+            nodes.append(target)
+            weights.append(to_end[node])
+
+    # A* over the abstract graph; heap entries are (f, -g, node) so the
+    # deepest node goes first among equal f-scores, as in jps.py
+    g_score = {source: 0}
+    came_from = {source: source}
+    closed = set()
+    queue = [(0, 0, source)]
+    found = False
+    while queue:
+        current = heapq.heappop(queue)[2]
+        if current in closed:
+            continue
+        closed.add(current)
+        nodes_expanded += 1
+        if record:
+            visited_order.append(current)
+        if current == target:
+            found = True
+            break
+        if batch_size and nodes_expanded >= next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush = nodes_expanded + batch_size
+            start_ns += time.perf_counter_ns() - paused
+        current_g = g_score[current]
+        for nodes, weights in (abstract.edges.get(current, _NO_EDGES), extra.get(current, _NO_EDGES)):
+            for node, weight in zip(nodes, weights):
+                tentative = current_g + weight
+                known = g_score.get(node)
+                if node not in closed and (known is None or tentative < known):
+                    g_score[node] = tentative
+                    came_from[node] = current
+                    r, c = divmod(node, width)
+                    heapq.heappush(queue, (tentative + abs(r - end_row) + abs(c - end_col), -tentative, node))
+        if len(queue) > peak_frontier:
+            peak_frontier = len(queue)
+    if not found:
+        return finish(None)
+
+    # Refine each abstract edge into cells: transitions are already one
+    # step, anything else is a search confined to one cluster
+    waypoints = _walk(came_from, target)
+    path = [source]
+    for a, b in zip(waypoints, waypoints[1:]):
+        if b - a in graph.offsets and abstract.cluster(graph, a) != abstract.cluster(graph, b):
+            path.append(b)
+            continue
+        _, parent, order = _local_search(graph, a, abstract.bounds(graph, a), goal=b)
+        if record:
+            visited_order.extend(order)
+        nodes_expanded += len(order)
+        path.extend(_walk(parent, b)[1:])
+        if batch_size and nodes_expanded >= next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush = nodes_expanded + batch_size
+            start_ns += time.perf_counter_ns() - paused
+    return finish(path)
@@ -0,0 +1,219 @@
+"""Jump Point Search (JPS) pathfinding algorithm implementation.
+
+JPS is A* with symmetry pruning for uniform-cost grids. Instead of pushing
+every neighbour, it scans in a straight line ("jumps") until it reaches the
+goal, a wall, or a cell with a forced neighbour - an open cell beside the
+scan line that can only be reached optimally by turning there. Only those
+jump points go into the open set, so large open areas cost a few heap
+operations instead of one per cell.
+
+This is the 4-connected variant (the same rules as PathFinding.js's
+JPFNeverMoveDiagonally): a horizontal scan stops where a wall beside it
+ends, and a vertical scan also stops wherever a horizontal scan from it
+would find a jump point. Terrain costs break the symmetry JPS relies on, so
+weighted grids are handed to A* instead, as are graphs with diagonal
+movement, whose jump rules differ.
+"""
+
+from array import array
+from typing import Generator, List, Tuple, Union
+import heapq
+import time
+
+from .a_star import a_star_steps
+from .grid import GridGraph, as_graph, run_steps, search_result
+
+
+def jps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+        record: bool = True) -> dict:
+    """Find the shortest path from start to end using Jump Point Search.
+
+    Args:
+        grid: 2D list where 0 represents an open cell and 1 represents a wall,
+            or an already-built GridGraph. Grids with terrain costs or
+            diagonal movement are searched with A* instead.
+        start: Starting position as (row, col) tuple
+        end: Target position as (row, col) tuple
+        record: Record the visit order; False leaves visited empty, for
+            callers that only want the stats
+
+    Returns:
+        Dictionary containing:
+        - found: Boolean indicating if a path was found
+        - time_taken: Execution time in seconds
+        - nodes_expanded: Number of jump points expanded
+        - path: List of (row, col) tuples representing the optimal path,
+          with the straight runs between jump points filled in
+        - path_cost: Total step cost of path
+        - visited: List of (row, col) tuples of the jump points, in order of expansion
+    """
+    return run_steps(jps_steps(grid, start, end, record=record))
+
+
+def jps_steps(grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int], end: Tuple[int, int],
+              batch_size: int = 0, record: bool = True) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Generator version of jps that hands out expanded jump points as it goes.
+
+    Args:
+        grid, start, end, record: As for jps
+        batch_size: Yield the visit order in lists of this many (row, col)
+            cells while the search runs; 0 never yields
+
+    Returns:
+        The jps result dict (via StopIteration), whose visited list holds
+        only the cells not already yielded. time_taken excludes time spent
+        suspended at a yield.
+    """
+    began = time.perf_counter_ns()
+    graph = as_graph(grid)
+    grid_ns = time.perf_counter_ns() - began
+    if graph.cost is not None or graph.diagonals:
+        return (yield from a_star_steps(graph, start, end, batch_size, record))
+
+    blocked = graph.blocked
+    if not isinstance(blocked, (bytes, bytearray)):
+        # Row scans need bytes.find / rfind, which a memoryview (e.g. of a
+        # shared grid, see shared.py) lacks; the copy costs no more than the
+        # per-search arrays every algorithm allocates anyway
+        blocked = bytes(blocked)
+    width = graph.width
+    source = graph.index(*start)
+    target = graph.index(*end)
+    end_row, end_col = divmod(target, width)
+
+    def heuristic(index: int) -> int:
+        """Calculate Manhattan distance heuristic (admissible for grid movement)."""
+        r, c = divmod(index, width)
+        return abs(r - end_row) + abs(c - end_col)
+
+    def jump(node: int, step: int) -> int:
+        """Scan from node (just entered by moving step) to the next jump point, or -1."""
+        if step == 1:
+            # Row scans run as bytes searches: stop at the next wall, or where
+            # a wall above or below ends (a forced neighbour)
+            wall = blocked.find(1, node)
+            found = wall
+            above = blocked.find(b"\x01\x00", node - 1 - width, wall - width)
+            if above >= 0:
+                found = above + 1 + width
+            below = blocked.find(b"\x01\x00", node - 1 + width, wall + width)
+            if below >= 0 and below + 1 - width < found:
+                found = below + 1 - width
+            if node <= target < found:
+                return target
+            return found if found < wall else -1
+        if step == -1:
+            wall = blocked.rfind(1, 0, node + 1)
+            found = wall
+            above = blocked.rfind(b"\x00\x01", wall + 1 - width, node - width + 2)
+            if above >= 0:
+                found = above + width
+            below = blocked.rfind(b"\x00\x01", wall + 1 + width, node + width + 2)
+            if below >= 0 and below - width > found:
+                found = below - width
+            if found < target <= node:
+                return target
+            return found if found > wall else -1
+        while True:
+            if blocked[node]:
+                return -1
+            if node == target:
+                return node
+            if ((not blocked[node - 1] and blocked[node - 1 - step])
+                    or (not blocked[node + 1] and blocked[node + 1 - step])):
+                return node
+            # A vertical scan must stop where a horizontal one would turn off
+            if jump(node + 1, 1) >= 0 or jump(node - 1, -1) >= 0:
+                return node
+            node += step
+
+    visited_order = array("i")
+    nodes_expanded = 0
+    peak_frontier = 1
+    queue_pushes = 1  # the start node
+    stale_pops = 0
+    next_flush = batch_size  # nodes_expanded count at which to yield a batch
+    start_ns = time.perf_counter_ns()
+
+    # Priority queue: (f_score, -g_score, cell index). Among equal f-scores
+    # the deepest jump point goes first, or the plateaus Manhattan ties
+    # create would be expanded breadth-first.
+    open_set = [(heuristic(source), 0, source)]
+    came_from = graph.new_parents()  # Previous jump point of each jump point
+    came_from[source] = source
+    g_score = array("i", [-1]) * graph.size  # Actual cost from start, -1 = unknown
+    g_score[source] = 0
+    closed = bytearray(graph.size)  # Closed set - jump points already expanded
+
+    def reconstruct_path() -> List[int]:
+        """Fill in the straight runs between the jump points leading to target."""
+        jump_points = graph.path_to(came_from, target)
+        path = [source]
+        for node in jump_points[1:]:
+            previous = path[-1]
+            step = (1 if node > previous else -1) if abs(node - previous) < width else \
+                (width if node > previous else -width)
+            path.extend(range(previous + step, node + step, step))
+        return path
+
+    while open_set:
+        current = heapq.heappop(open_set)[2]
+
+        # Skip if already processed (can happen with duplicate entries in heap)
+        if closed[current]:
+            stale_pops += 1
+            continue
+
+        nodes_expanded += 1
+        if record:
+            visited_order.append(current)
+        closed[current] = 1
+
+        # Goal reached - reconstruct and return path
+        if current == target:
+            stop_ns = time.perf_counter_ns()
+            return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order,
+                                 reconstruct_path(),
+                                 grid_ns=grid_ns, peak_frontier=peak_frontier,
+                                 queue_pushes=queue_pushes, stale_pops=stale_pops)
+
+        if nodes_expanded == next_flush:
+            paused = time.perf_counter_ns()
+            yield graph.cells(visited_order)
+            del visited_order[:]
+            next_flush += batch_size
+            start_ns += time.perf_counter_ns() - paused
+
+        current_g = g_score[current]
+
+        # Prune to the directions an optimal path through current can take:
+        # all four from the start, otherwise straight on plus both sides
+        parent = came_from[current]
+        if current == parent:
+            directions = graph.offsets
+        elif abs(current - parent) < width:
+            directions = (1 if current > parent else -1, width, -width)
+        else:
+            directions = (width if current > parent else -width, 1, -1)
+
+        for step in directions:
+            if blocked[current + step]:
+                continue
+            jump_point = jump(current + step, step)
+            if jump_point < 0 or closed[jump_point]:
+                continue
+            # Jumps are straight lines, so their cost is the cells crossed
+            tentative_g = current_g + abs(jump_point - current) // abs(step)
+            known = g_score[jump_point]
+            if known < 0 or tentative_g < known:
+                came_from[jump_point] = current
+                g_score[jump_point] = tentative_g
+                heapq.heappush(open_set, (tentative_g + heuristic(jump_point), -tentative_g, jump_point))
+                queue_pushes += 1
+        if len(open_set) > peak_frontier:
+            peak_frontier = len(open_set)
+
+    # No path found
+    return search_result(graph, start_ns, time.perf_counter_ns(), nodes_expanded, visited_order,
+                         grid_ns=grid_ns, peak_frontier=peak_frontier,
+                         queue_pushes=queue_pushes, stale_pops=stale_pops)
@@ -0,0 +1,158 @@
+"""Lifelong Planning A* (LPA*) for replanning after grid edits.
+
+LPA* (Koenig, Likhachev and Furcy) is A* that keeps its search state
+between queries. Every cell has g, its current distance from start, and
+rhs, a one-step lookahead computed from its neighbours' g values. A cell
+whose g and rhs disagree is "inconsistent" and waits in the priority queue.
+Editing a cell only changes the rhs of that cell and its neighbours, so the
+next search only re-expands the cells whose distance actually changed,
+rather than the whole grid.
+
+The start and end are fixed for the planner's lifetime; only cells change.
+Step costs follow the grid (stepping onto a cell costs its terrain value,
+1 for plain open cells), with the same Manhattan heuristic as a_star.py.
+"""
+
+from array import array
+from typing import Iterable, List, Tuple, Union
+import heapq
+import time
+
+from .grid import GridGraph, as_graph, search_result
+
+
+INFINITY = 1 << 60
+
+
+class LPAStar:
+    """Incremental shortest-path planner between two fixed cells of a grid.
+
+    The planner edits a private copy of the grid, so the graph it was built
+    from is never modified.
+
+    Args:
+        grid: 2D list of cell values or a GridGraph
+        start: Starting position as (row, col) tuple
+        end: Target position as (row, col) tuple
+    """
+
+    def __init__(self, grid: Union[GridGraph, List[List[int]]], start: Tuple[int, int],
+                 end: Tuple[int, int]):
+        began = time.perf_counter_ns()
+        self.graph = as_graph(grid).copy()
+        self.grid_ns = time.perf_counter_ns() - began
+        graph = self.graph
+        self.source = graph.index(*start)
+        self.target = graph.index(*end)
+        self.end_row, self.end_col = divmod(self.target, graph.width)
+
+        self.g = array("q", [INFINITY]) * graph.size
+        self.rhs = array("q", [INFINITY]) * graph.size
+        self.rhs[self.source] = 0
+        # Min-heap of (key1, key2, cell). Entries are never removed in place:
+        # one is live only while its key is still the cell's current key.
+        self.queue = [self._key(self.source) + (self.source,)]
+
+    def _heuristic(self, index: int) -> int:
+        """Manhattan distance to the goal (admissible, as no step costs less than 1)."""
+        r, c = divmod(index, self.graph.width)
+        return abs(r - self.end_row) + abs(c - self.end_col)
+
+    def _key(self, index: int) -> Tuple[int, int]:
+        best = min(self.g[index], self.rhs[index])
+        return (best + self._heuristic(index), best)
+
+    def _update_vertex(self, index: int) -> None:
+        """Recompute rhs of index from its neighbours and requeue it if inconsistent."""
+        graph = self.graph
+        if index != self.source:
+            best = INFINITY
+            if not graph.blocked[index]:
+                g = self.g
+                blocked = graph.blocked
+                for offset in graph.offsets:
+                    neighbor = index + offset
+                    if not blocked[neighbor] and g[neighbor] < best:
+                        best = g[neighbor]
+                if best < INFINITY:
+                    best += graph.cost[index] if graph.cost is not None else 1
+            self.rhs[index] = best
+        if self.g[index] != self.rhs[index]:
+            heapq.heappush(self.queue, self._key(index) + (index,))
+
+    def _top_key(self) -> Tuple[int, int]:
+        """Key of the first live queue entry, dropping dead ones; INFINITY if empty."""
+        queue = self.queue
+        while queue:
+            k1, k2, index = queue[0]
+            if self.g[index] != self.rhs[index] and self._key(index) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(queue)
+        return (INFINITY, INFINITY)
+
+    def compute(self) -> dict:
+        """Bring the search up to date and return the current shortest path.
+
+        Returns:
+            The usual result dict (see search_result). nodes_expanded and
+            visited only cover the cells re-expanded by this call.
+        """
+        graph = self.graph
+        g, rhs, queue = self.g, self.rhs, self.queue
+        target = self.target
+        visited_order = array("i")
+        peak_frontier = len(queue)
+        start_ns = time.perf_counter_ns()
+
+        while self._top_key() < self._key(target) or rhs[target] != g[target]:
+            index = heapq.heappop(queue)[2]
+            visited_order.append(index)
+            if g[index] > rhs[index]:
+                # Overconsistent: the new, lower distance is final
+                g[index] = rhs[index]
+            else:
+                # Underconsistent: the old distance is gone, rebuild it
+                g[index] = INFINITY
+                self._update_vertex(index)
+            for offset in graph.offsets:
+                self._update_vertex(index + offset)
+            if len(queue) > peak_frontier:
+                peak_frontier = len(queue)
+
+        stop_ns = time.perf_counter_ns()
+        path = self._path() if g[target] < INFINITY else None
+        return search_result(graph, start_ns, stop_ns, len(visited_order), visited_order, path,
+                             grid_ns=self.grid_ns, peak_frontier=peak_frontier)
+
+    def _path(self) -> List[int]:
+        """Walk back from the goal to the neighbour that gives each cell its g."""
+        graph = self.graph
+        g, blocked = self.g, graph.blocked
+        index = self.target
+        path = [index]
+        while index != self.source:
+            index = min((index + offset for offset in graph.offsets if not blocked[index + offset]),
+                        key=g.__getitem__)
+            path.append(index)
+        path.reverse()
+        return path
+
+    def update(self, changes: Iterable[Tuple[int, int, int]]) -> dict:
+        """Apply (row, col, value) cell edits and replan.
+
+        Raises:
+            ValueError: If a value is outside 0-255
+        """
+        began = time.perf_counter_ns()
+        graph = self.graph
+        touched = set()
+        for row, col, value in changes:
+            index = graph.index(row, col)
+            graph.set_value(index, value)
+            touched.add(index)
+            touched.update(index + offset for offset in graph.offsets)
+        for index in touched:
+            # Border cells stay walls and never enter the queue
+            self._update_vertex(index)
+        self.grid_ns = time.perf_counter_ns() - began
+        return self.compute()
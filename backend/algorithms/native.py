@@ -0,0 +1,195 @@
+"""Optional compiled search kernel for BFS, Dijkstra and A*.
+
+The per-cell loops of bfs.py, dijkstra.py and a_star.py run at interpreter
+speed. _kernel.c runs the same loops in C over the same GridGraph buffers,
+mirroring them step for step, so it returns the same path, visit order and
+counters - just faster. It is a plain shared library loaded with ctypes;
+build it with a local C compiler:
+
+    cd backend
+    python -m algorithms.build_kernel
+
+which writes algorithms/_kernel.so. When the library is present the three
+searches use it automatically (their result profiles then carry
+native=True); without it, or with SEARCH_KERNEL=python in the environment,
+they run the pure-Python loops, which remain the reference implementation.
+"""
+
+from array import array
+from typing import Generator, List, Optional, Tuple
+import ctypes
+import os
+import time
+
+from .grid import DIAGONAL, STRAIGHT, GridGraph, search_result
+
+
+BFS, DIJKSTRA, A_STAR = 0, 1, 2
+
+_FOUND, _EXHAUSTED, _NO_MEMORY = 1, 2, -1
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+LIBRARY = os.path.join(_HERE, "_kernel.so")
+
+_lib = None
+_loaded = False
+
+
+def _load() -> Optional[ctypes.CDLL]:
+    """The kernel library, or None if it is missing or disabled."""
+    global _lib, _loaded
+    if _loaded:
+        return _lib
+    _loaded = True
+    if os.environ.get("SEARCH_KERNEL", "auto") == "python" or not os.path.exists(LIBRARY):
+        return None
+    try:
+        lib = ctypes.CDLL(LIBRARY)
+    except OSError:
+        return None
+    i64 = ctypes.c_int64
+    lib.kernel_new.restype = ctypes.c_void_p
+    lib.kernel_new.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                               ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int), ctypes.c_int,
+                               ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.kernel_start.restype = ctypes.c_int
+    lib.kernel_start.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+    lib.kernel_run.restype = ctypes.c_int
+    lib.kernel_run.argtypes = [ctypes.c_void_p, ctypes.c_void_p, i64, ctypes.POINTER(i64)]
+    lib.kernel_field.restype = ctypes.c_int
+    lib.kernel_field.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+    lib.kernel_stats.restype = None
+    lib.kernel_stats.argtypes = [ctypes.c_void_p, ctypes.POINTER(i64)]
+    lib.kernel_free.restype = None
+    lib.kernel_free.argtypes = [ctypes.c_void_p]
+    _lib = lib
+    return _lib
+
+
+def available() -> bool:
+    """Whether searches will run on the compiled kernel."""
+    return _load() is not None
+
+
+def _address(buffer) -> Optional[int]:
+    """Address of a writable buffer (bytearray or array), None for None."""
+    if buffer is None:
+        return None
+    return ctypes.addressof((ctypes.c_char * len(memoryview(buffer).cast("B"))).from_buffer(buffer))
+
+
+class Kernel:
+    """One kernel search state for a graph, reusable for any number of
+    searches on it (see _kernel.c); call close() when done.
+
+    Attributes:
+        graph: The graph searched
+        parent: Parent pointers of the latest search, valid along its path
+    """
+
+    def __init__(self, kind: int, graph: GridGraph):
+        self.graph = graph
+        self.parent = graph.new_parents()
+        scaled = bool(graph.diagonals)
+        if kind == BFS:
+            ring = 0
+        elif kind == DIJKSTRA:
+            ring = graph.max_step_cost() + 1
+        else:
+            ring = graph.max_step_cost() + (DIAGONAL if scaled else 1) + 1
+        diagonals = (ctypes.c_int * 12)(*[value for step in graph.diagonals for value in step])
+        self._lib = _load()
+        # Walls never change during a search, but ctypes can only take the
+        # address of a writable buffer; GridGraph buffers are bytearrays
+        self._state = self._lib.kernel_new(
+            kind, _address(graph.blocked), _address(graph.cost), _address(self.parent),
+            graph.size, graph.width, diagonals, len(graph.diagonals), graph.corner_limit,
+            STRAIGHT if scaled else 1, DIAGONAL if scaled else 1, ring)
+        if not self._state:
+            raise MemoryError("Search kernel could not allocate its queues")
+        self._written = ctypes.c_int64()
+
+    def start(self, source: int, target: int) -> None:
+        """Begin a new search, abandoning any unfinished one."""
+        if self._lib.kernel_start(self._state, source, target) == _NO_MEMORY:
+            raise MemoryError("Search kernel ran out of memory")
+
+    def run(self, visited: Optional[int] = None, limit: int = 0) -> Tuple[Optional[bool], int]:
+        """Expand up to limit cells (0: until the search ends).
+
+        Args:
+            visited: Address of an int32 buffer for the expanded cells
+                (see _address), or None not to record them
+            limit: Expansions before pausing
+
+        Returns:
+            (found, written): found is None if the search paused, else
+            whether it reached its target; written is the number of cells
+            expanded by this call
+        """
+        status = self._lib.kernel_run(self._state, visited, limit, ctypes.byref(self._written))
+        if status == _NO_MEMORY:
+            raise MemoryError("Search kernel ran out of memory")
+        return (None if status not in (_FOUND, _EXHAUSTED) else status == _FOUND), self._written.value
+
+    def field(self, source: int, reverse: bool = False) -> array:
+        """Distance from source (to source if reverse) of every cell, -1
+        where unreachable, as distances.distance_field computes it. Needs a
+        DIJKSTRA kernel."""
+        distance = array("q", bytes(8 * self.graph.size))
+        if self._lib.kernel_field(self._state, source, int(reverse), _address(distance)) == _NO_MEMORY:
+            raise MemoryError("Search kernel ran out of memory")
+        return distance
+
+    def stats(self) -> Tuple[int, int, int, int]:
+        """nodes_expanded, peak_frontier, queue_pushes, stale_pops of the latest search."""
+        stats = (ctypes.c_int64 * 4)()
+        self._lib.kernel_stats(self._state, stats)
+        return tuple(stats)
+
+    def close(self) -> None:
+        if self._state:
+            self._lib.kernel_free(self._state)
+            self._state = None
+
+
+def search_steps(kind: int, graph: GridGraph, source: int, target: int, batch_size: int,
+                 record: bool, grid_ns: int) -> Generator[List[Tuple[int, int]], None, dict]:
+    """Run one search on the kernel with the contract of the *_steps generators.
+
+    Args:
+        kind: BFS, DIJKSTRA or A_STAR
+        graph: The graph to search
+        source, target: Flat indices of start and end
+        batch_size: Yield the visit order in lists of this many cells; 0
+            never yields
+        record: Record the visit order
+        grid_ns: Time spent building graph, for the profile
+    """
+    kernel = Kernel(kind, graph)
+    # Each cell is expanded at most once, so graph.size bounds a whole run
+    chunk = array("i", bytes(4 * (batch_size or graph.size))) if record else None
+    chunk_address = _address(chunk)
+    visited_order = array("i")
+    start_ns = time.perf_counter_ns()
+    try:
+        kernel.start(source, target)
+        while True:
+            found, written = kernel.run(chunk_address, batch_size)
+            if found is not None:
+                break
+            paused = time.perf_counter_ns()
+            yield graph.cells(chunk[:written] if record else visited_order)
+            start_ns += time.perf_counter_ns() - paused
+        stop_ns = time.perf_counter_ns()
+        if record:
+            visited_order = chunk[:written]
+        nodes_expanded, peak_frontier, queue_pushes, stale_pops = kernel.stats()
+    finally:
+        kernel.close()
+
+    profile = {"grid_ns": grid_ns, "peak_frontier": peak_frontier, "native": True}
+    if kind != BFS:
+        profile.update(queue_pushes=queue_pushes, stale_pops=stale_pops)
+    path = graph.path_to(kernel.parent, target) if found else None
+    return search_result(graph, start_ns, stop_ns, nodes_expanded, visited_order, path, **profile)
@@ -0,0 +1,112 @@
+"""Hand a GridGraph to other processes through shared memory.
+
+Pickling a graph copies its buffers into every worker. share() instead
+copies them once into a multiprocessing.shared_memory segment and returns
+a small picklable SharedGraph describing it; attach() in another process
+maps the same segment and wraps it in a GridGraph without copying.
+
+The segment holds blocked followed, for terrain, by cost and then,
+optionally, the int32 labels of a ComponentIndex so workers need not
+relabel the grid. The process that called share() owns it and must
+close() and unlink() it once every user is done; attached processes only
+close() their mapping, after dropping the graphs built on it.
+"""
+
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .components import ComponentIndex
+from .grid import CORNER_CUTTING, GridGraph
+
+
+class SharedGraph(NamedTuple):
+    """Everything needed to attach to a shared graph.
+
+    connectivity, corner_cutting and flat_cells describe the view of the
+    grid to search (see GridGraph.with_connectivity and index_view); one
+    segment serves every view. components is the component count of the
+    labels stored after the buffers, or -1 if there are none.
+    """
+    name: str
+    rows: int
+    cols: int
+    weighted: bool
+    max_cost: int
+    digest: str
+    connectivity: int
+    corner_cutting: str
+    flat_cells: bool = False
+    components: int = -1
+
+
+def share(graph: GridGraph, components: Optional[ComponentIndex] = None
+          ) -> Tuple[shared_memory.SharedMemory, SharedGraph]:
+    """Copy graph's buffers (and components' labels) into a new shared memory segment.
+
+    Returns:
+        (segment, spec): the caller owns segment; spec pickles to a few
+        dozen bytes and is what attach() takes
+    """
+    size = graph.size
+    weighted = graph.cost is not None
+    labels_at = _labels_offset(size, weighted)
+    length = labels_at + 4 * size if components is not None else labels_at
+    segment = shared_memory.SharedMemory(create=True, size=length)
+    segment.buf[:size] = graph.blocked
+    if weighted:
+        segment.buf[size:2 * size] = graph.cost
+    if components is not None:
+        segment.buf[labels_at:length] = components.labels.astype(np.int32, copy=False).tobytes()
+    spec = SharedGraph(segment.name, graph.rows, graph.cols, weighted, graph.max_cost, graph.digest(),
+                       4, "never", components=components.count if components is not None else -1)
+    return segment, describe(spec, graph)
+
+
+def describe(spec: SharedGraph, graph: GridGraph) -> SharedGraph:
+    """spec, set to the movement rules and cell format of graph, a view of the same grid."""
+    cutting = next(name for name, limit in CORNER_CUTTING.items() if limit == graph.corner_limit)
+    return spec._replace(connectivity=8 if graph.diagonals else 4, corner_cutting=cutting,
+                         flat_cells=graph.flat_cells)
+
+
+def attach(spec: SharedGraph) -> Tuple[shared_memory.SharedMemory, GridGraph]:
+    """Map a shared graph into this process.
+
+    Returns:
+        (segment, graph): graph reads the segment's memory directly, so
+        segment must stay open for as long as graph is used
+    """
+    segment = shared_memory.SharedMemory(name=spec.name)
+    size = (spec.rows + 2) * (spec.cols + 2)
+    cost = segment.buf[size:2 * size] if spec.weighted else None
+    graph = GridGraph(spec.rows, spec.cols, segment.buf[:size], cost, max_cost=spec.max_cost)
+    graph._digest = spec.digest
+    return segment, view(graph, spec)
+
+
+def view(graph: GridGraph, spec: SharedGraph) -> GridGraph:
+    """graph with the movement rules and cell format spec asks for."""
+    if spec.connectivity == 8 or graph.diagonals:
+        graph = graph.with_connectivity(spec.connectivity, spec.corner_cutting)
+    if spec.flat_cells:
+        graph = graph.index_view()
+    return graph
+
+
+def attach_components(segment: shared_memory.SharedMemory, spec: SharedGraph) -> Optional[ComponentIndex]:
+    """The component labels stored in an attached segment, without copying,
+    or None if share() was not given any."""
+    if spec.components < 0:
+        return None
+    size = (spec.rows + 2) * (spec.cols + 2)
+    labels = np.frombuffer(segment.buf, dtype=np.int32, count=size,
+                           offset=_labels_offset(size, spec.weighted))
+    return ComponentIndex(labels, spec.components)
+
+
+def _labels_offset(size: int, weighted: bool) -> int:
+    # Keep the int32 labels 4-byte aligned
+    end = 2 * size if weighted else size
+    return -(-end // 4) * 4
@@ -0,0 +1,307 @@
+"""Throughput mode: many (start, end) queries on one grid.
+
+Calling a_star.a_star once per pair rebuilds the GridGraph and allocates
+fresh per-cell arrays every time, which on a large grid costs more than a
+short search. GridSolver does that work once per grid instead:
+
+- the grid is packed into a GridGraph and its components are labelled
+  (components.py), so an unreachable pair is answered with two lookups;
+- per-cell search state (parents, costs, seen and closed flags) is
+  allocated once and never cleared: every query gets a new generation
+  number, and a cell's entries only count if stamped with the current one.
+
+Queries run on one reused compiled-kernel state when the kernel is built
+(native.py), else on the loops below, which follow bfs.py, dijkstra.py and
+a_star.py and find the same paths. Each query returns a compact
+QueryResult rather than a full result dict.
+
+solve_pairs() can also split the pairs over worker processes, which
+attach to the grid and its component labels in shared memory (shared.py)
+instead of each receiving a pickled copy and relabelling it.
+"""
+
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappop, heappush
+from itertools import repeat
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+import multiprocessing
+
+from . import native, shared
+from .components import ComponentIndex
+from .grid import DIAGONAL, STRAIGHT, GridGraph, as_graph
+
+
+ALGORITHMS = {"bfs": native.BFS, "dijkstra": native.DIJKSTRA, "a_star": native.A_STAR}
+
+Cell = Tuple[int, int]
+
+
+class QueryResult(NamedTuple):
+    """Outcome of one query.
+
+    Attributes:
+        found: Whether end is reachable from start
+        cost: Path cost as in GridGraph.path_cost, 0 if not found
+        length: Cells on the path, start and end included; 0 if not found
+        nodes_expanded: Cells the search expanded; 0 for pairs the
+            component labels show to be unreachable
+        path: (row, col) cells of the path, only if asked for
+    """
+    found: bool
+    cost: Union[int, float]
+    length: int
+    nodes_expanded: int
+    path: Optional[List[Cell]] = None
+
+
+class GridSolver:
+    """Answers shortest-path queries on one grid, reusing its search state.
+
+    Use it as a context manager, or call close(), to free the kernel state.
+
+    Attributes:
+        graph: The grid being searched
+        algorithm: "bfs", "dijkstra" or "a_star"
+        components: Component labels of graph
+    """
+
+    def __init__(self, grid: Union[GridGraph, List[List[int]]], algorithm: str = "a_star",
+                 components: Optional[ComponentIndex] = None):
+        """
+        Args:
+            grid: 2D list of cell values or a GridGraph
+            algorithm: "bfs", "dijkstra" or "a_star"
+            components: Labels of grid if already built, else built here
+
+        Raises:
+            ValueError: For an unknown algorithm
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"algorithm must be one of {', '.join(ALGORITHMS)}")
+        self.graph = graph = as_graph(grid)
+        self.algorithm = algorithm
+        self.components = components if components is not None else ComponentIndex.build(graph)
+        self._kernel = native.Kernel(ALGORITHMS[algorithm], graph) if native.available() else None
+        if self._kernel is None:
+            self._parent = graph.new_parents()
+            self._seen = array("I", bytes(4 * graph.size))
+            self._closed = array("I", bytes(4 * graph.size))
+            self._g = array("q", bytes(8 * graph.size))
+            self._generation = 0
+            self._costs = graph.step_costs()
+
+    def __enter__(self) -> "GridSolver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._kernel is not None:
+            self._kernel.close()
+
+    def solve(self, start: Cell, end: Cell, path: bool = False) -> QueryResult:
+        """Answer one query; with path set, also return the path's cells."""
+        graph = self.graph
+        source = graph.index(*start)
+        target = graph.index(*end)
+        # Like the other searches, a start on a wall is still searched from
+        if source != target and not graph.blocked[source] and not self.components.connected(source, target):
+            return QueryResult(False, 0, 0, 0, None)
+
+        if self._kernel is not None:
+            self._kernel.start(source, target)
+            found, _ = self._kernel.run()
+            nodes_expanded = self._kernel.stats()[0]
+            parent = self._kernel.parent
+        else:
+            found, nodes_expanded = self._search(source, target)
+            parent = self._parent
+        if not found:
+            return QueryResult(False, 0, 0, nodes_expanded, None)
+        route = graph.path_to(parent, target)
+        return QueryResult(True, graph.path_cost(route), len(route), nodes_expanded,
+                           graph.cells(route) if path else None)
+
+    def solve_many(self, pairs: Sequence[Tuple[Cell, Cell]], paths: bool = False) -> List[QueryResult]:
+        """Answer each (start, end) pair in turn."""
+        return [self.solve(start, end, paths) for start, end in pairs]
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        if self._generation == 1 << 32:
+            # Wrapped around: old stamps could now look current
+            self._seen = array("I", bytes(4 * self.graph.size))
+            self._closed = array("I", bytes(4 * self.graph.size))
+            self._generation = 1
+        return self._generation
+
+    def _search(self, source: int, target: int) -> Tuple[bool, int]:
+        """Run one query on the Python loops; returns (found, nodes_expanded)."""
+        graph = self.graph
+        blocked = graph.blocked
+        offsets = graph.offsets
+        diagonals = graph.diagonals
+        corner_limit = graph.corner_limit
+        parent = self._parent
+        seen = self._seen
+        generation = self._next_generation()
+        seen[source] = generation
+        parent[source] = source
+        nodes_expanded = 0
+
+        if self.algorithm == "bfs":
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                nodes_expanded += 1
+                if current == target:
+                    return True, nodes_expanded
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not blocked[neighbor] and seen[neighbor] != generation:
+                        seen[neighbor] = generation
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+                for offset, side, other_side in diagonals:
+                    neighbor = current + offset
+                    if (not blocked[neighbor] and seen[neighbor] != generation
+                            and blocked[current + side] + blocked[current + other_side] <= corner_limit):
+                        seen[neighbor] = generation
+                        parent[neighbor] = current
+                        queue.append(neighbor)
+            return False, nodes_expanded
+
+        cost, diagonal_cost = self._costs
+        closed = self._closed
+        g_score = self._g
+        heuristic = _zero
+        ring = graph.max_step_cost() + 1
+        if self.algorithm == "a_star":
+            width = graph.width
+            end_row, end_col = divmod(target, width)
+            ring += DIAGONAL if diagonals else 1
+            if diagonals:
+                def heuristic(index: int) -> int:
+                    r, c = divmod(index, width)
+                    dr, dc = abs(r - end_row), abs(c - end_col)
+                    if dr < dc:
+                        dr, dc = dc, dr
+                    return STRAIGHT * dr + (DIAGONAL - STRAIGHT) * dc
+            else:
+                def heuristic(index: int) -> int:
+                    r, c = divmod(index, width)
+                    return abs(r - end_row) + abs(c - end_col)
+
+        # Bucket queue over f-scores, as in dijkstra.py and a_star.py
+        f = heuristic(source)
+        buckets = [[] for _ in range(ring)]
+        buckets[f % ring].append(source)
+        pending = []  # f-scores of the non-empty buckets ahead, lowest first
+        queued = 1
+        g_score[source] = 0
+        while queued:
+            bucket = buckets[f % ring]
+            if not bucket:
+                f = heappop(pending)
+                continue
+            current = bucket.pop()
+            queued -= 1
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            nodes_expanded += 1
+            if current == target:
+                return True, nodes_expanded
+            current_g = g_score[current]
+            for offset in offsets:
+                neighbor = current + offset
+                if blocked[neighbor] or closed[neighbor] == generation:
+                    continue
+                tentative_g = current_g + cost[neighbor]
+                if seen[neighbor] != generation or tentative_g < g_score[neighbor]:
+                    seen[neighbor] = generation
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    f_score = tentative_g + heuristic(neighbor)
+                    bucket = buckets[f_score % ring]
+                    if not bucket:
+                        heappush(pending, f_score)
+                    bucket.append(neighbor)
+                    queued += 1
+            for offset, side, other_side in diagonals:
+                neighbor = current + offset
+                if (blocked[neighbor] or closed[neighbor] == generation
+                        or blocked[current + side] + blocked[current + other_side] > corner_limit):
+                    continue
+                tentative_g = current_g + diagonal_cost[neighbor]
+                if seen[neighbor] != generation or tentative_g < g_score[neighbor]:
+                    seen[neighbor] = generation
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    f_score = tentative_g + heuristic(neighbor)
+                    bucket = buckets[f_score % ring]
+                    if not bucket:
+                        heappush(pending, f_score)
+                    bucket.append(neighbor)
+                    queued += 1
+        return False, nodes_expanded
+
+
+def _zero(index: int) -> int:
+    return 0
+
+
+# Set in each solve_pairs() worker by _init_shard
+_shard = None
+
+
+def _init_shard(spec: shared.SharedGraph, algorithm: str) -> None:
+    global _shard
+    segment, graph = shared.attach(spec)
+    # Keep the segment mapped for as long as the worker lives
+    _shard = (segment, GridSolver(graph, algorithm, shared.attach_components(segment, spec)))
+
+
+def _solve_shard(pairs: Sequence[Tuple[Cell, Cell]], paths: bool) -> List[QueryResult]:
+    return _shard[1].solve_many(pairs, paths)
+
+
+def solve_pairs(grid: Union[GridGraph, List[List[int]]], pairs: Sequence[Tuple[Cell, Cell]],
+                algorithm: str = "a_star", paths: bool = False, processes: int = 0) -> List[QueryResult]:
+    """Answer every (start, end) pair on one grid.
+
+    Args:
+        grid: 2D list of cell values or a GridGraph
+        pairs: ((row, col), (row, col)) start/end pairs
+        algorithm: "bfs", "dijkstra" or "a_star"
+        paths: Also return each path's cells
+        processes: Split the pairs over this many worker processes, which
+            share the grid through shared memory; 0 or 1 answers them here
+
+    Returns:
+        One QueryResult per pair, in order
+    """
+    graph = as_graph(grid)
+    if processes <= 1 or len(pairs) < 2:
+        with GridSolver(graph, algorithm) as solver:
+            return solver.solve_many(pairs, paths)
+
+    segment, spec = shared.share(graph, ComponentIndex.build(graph))
+    try:
+        # A few chunks per process, so one slow chunk does not hold the rest up
+        chunk = -(-len(pairs) // (processes * 4))
+        chunks = [pairs[i:i + chunk] for i in range(0, len(pairs), chunk)]
+        # spawn, as in workers.py: callers may be running threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=_init_shard, initargs=(spec, algorithm)) as pool:
+            results: List[QueryResult] = []
+            for part in pool.map(_solve_shard, chunks, repeat(paths)):
+                results.extend(part)
+        return results
+    finally:
+        segment.close()
+        segment.unlink()
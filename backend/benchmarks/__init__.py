@@ -0,0 +1,4 @@
+"""Benchmark suite for backend/algorithms and the /solve endpoint.
+
+Run from backend/ with ``python -m benchmarks.run --help``.
+"""
@@ -0,0 +1,94 @@
+"""Seeded grid generators for the benchmark suite.
+
+Every generator is deterministic for a given size and seed, returns a
+square size x size grid in the same List[List[int]] form the API accepts
+(0 = open, 1 = wall). Scenarios search from the top-left corner to the
+bottom-right one, except spiral, which ends in the centre. Random walls,
+mazes and rooms come from the same generators as POST /grids/generate
+(backend/generators.py).
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import generators
+
+
+Grid = List[List[int]]
+
+
+@dataclass
+class Scenario:
+    """A benchmark input: a grid plus the endpoints to search between."""
+    name: str
+    size: int
+    grid: Grid
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+
+
+def open_field(size: int, seed: int = 0) -> Grid:
+    """No walls at all - the worst case for blind searches."""
+    return [[0] * size for _ in range(size)]
+
+
+def random_walls(size: int, seed: int = 0, density: float = 0.3) -> Grid:
+    """Each cell is a wall with probability density."""
+    return generators.random_walls(size, size, seed, density).tolist()
+
+
+def perfect_maze(size: int, seed: int = 0) -> Grid:
+    """A perfect maze (exactly one route between any two cells) carved by a
+    recursive backtracker.
+
+    When size is even the last row/column has no cells of its own, so it is
+    left open to keep the bottom-right corner connected.
+    """
+    return generators.backtracker(size, size, seed).tolist()
+
+
+def spiral(size: int, seed: int = 0) -> Grid:
+    """Nested square walls with alternating gaps, forming one corridor that
+    winds from the outer edge in to the centre cell (the spiral scenario's
+    end)."""
+    grid = [[0] * size for _ in range(size)]
+    for ring, offset in enumerate(range(1, size // 2, 2)):
+        low, high = offset, size - 1 - offset
+        if high - low < 2:
+            break
+        for i in range(low, high + 1):
+            grid[low][i] = grid[high][i] = grid[i][low] = grid[i][high] = 1
+        # Alternate the gap between the top-left and bottom-right side
+        if ring % 2 == 0:
+            grid[low][low + 1] = 0
+        else:
+            grid[high][high - 1] = 0
+    grid[0][0] = grid[size // 2][size // 2] = 0
+    return grid
+
+
+def unreachable(size: int, seed: int = 0) -> Grid:
+    """Random walls with the end corner sealed off - every search has to
+    exhaust the start's whole region before giving up."""
+    grid = random_walls(size, seed, density=0.2)
+    if size > 1:
+        grid[size - 1][size - 2] = grid[size - 2][size - 1] = 1
+    return grid
+
+
+GENERATORS: Dict[str, Callable[..., Grid]] = {
+    "open": open_field,
+    "random-10": lambda size, seed=0: random_walls(size, seed, 0.1),
+    "random-30": lambda size, seed=0: random_walls(size, seed, 0.3),
+    "maze": perfect_maze,
+    "rooms": lambda size, seed=0: generators.rooms(size, size, seed).tolist(),
+    "spiral": spiral,
+    "unreachable": unreachable,
+}
+
+
+def make_scenario(name: str, size: int, seed: int = 0) -> Scenario:
+    """Build the named scenario at the given size."""
+    grid = GENERATORS[name](size, seed)
+    end = (size // 2, size // 2) if name == "spiral" else (size - 1, size - 1)
+    return Scenario(name, size, grid, (0, 0), end)
@@ -0,0 +1,256 @@
+"""Benchmark harness for backend/algorithms and POST /solve.
+
+Runs every algorithm (and optionally the API) over the seeded scenarios in
+grids.py at each requested size, and records per-case latency percentiles,
+throughput (nodes expanded per second) and peak traced memory. Results are
+written as JSON so a later run can be compared against a saved baseline.
+
+Usage, from backend/:
+
+    python -m benchmarks.run --sizes 10 100 500 --output bench.json
+    python -m benchmarks.run --sizes 10 100 500 --baseline bench.json
+    python -m benchmarks.run --sizes 500 --stats-only --api
+
+HPA* and ALT build per-grid data (the abstraction, the landmarks) on their
+first query and reuse it; their cases also report build_ms, measured on a
+first run with that cache cleared, while the latency figures are for the
+queries that follow.
+
+With --stats-only every case also runs without recording the visit order
+(record=False, or stats_only for the API) as a separate "<target> stats"
+case, to show what the visualization data costs.
+
+With --baseline, any case whose p50 latency grew by more than --tolerance
+(default 25%) is reported and the exit status is 1.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from algorithms import a_star, alt, bfs, bi_bfs, bidirectional, dfs, dijkstra, hpa_star, jps
+from benchmarks.grids import GENERATORS, Scenario, make_scenario
+
+
+ALGORITHMS: Dict[str, Callable] = {
+    "BFS": bfs.bfs,
+    "DFS": dfs.dfs,
+    "Dijkstra": dijkstra.dijkstra,
+    "A*": a_star.a_star,
+    "Bidirectional BFS": bi_bfs.bidirectional_bfs,
+    "Jump Point Search": jps.jps,
+    "HPA*": hpa_star.hpa_star,
+    "Bidirectional Dijkstra": bidirectional.bidirectional_dijkstra,
+    "Bidirectional A*": bidirectional.bidirectional_a_star,
+    "ALT": alt.alt,
+}
+
+# Per-grid caches of the algorithms that have one, and the profile key
+# holding the time it took to fill for a query
+PRECOMPUTED: Dict[str, Tuple[Dict, str]] = {
+    "HPA*": (hpa_star._cache, "abstraction_ns"),
+    "ALT": (alt._cache, "landmarks_ns"),
+}
+
+DEFAULT_SIZES = [10, 100, 500]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples."""
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[max(0, min(len(ordered) - 1, rank))]
+
+
+def _measure(call: Callable[[], Tuple[int, int]], repeat: int, trace_memory: bool) -> Dict:
+    """Time call() repeat times, then once more under tracemalloc.
+
+    call returns (nodes_expanded, path_length) for the throughput figure.
+    The traced run is kept separate because tracemalloc itself slows
+    allocation-heavy code down severalfold.
+    """
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        nodes_expanded, path_length = call()
+        samples.append(time.perf_counter() - began)
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    p50 = percentile(samples, 50)
+    return {
+        "repeat": repeat,
+        "p50_ms": p50 * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": sum(samples) / len(samples) * 1000,
+        "nodes_expanded": nodes_expanded,
+        "path_length": path_length,
+        "throughput": nodes_expanded / p50 if p50 > 0 else None,
+        "peak_kib": peak / 1024 if peak is not None else None,
+    }
+
+
+def bench_algorithm(name: str, scenario: Scenario, repeat: int, trace_memory: bool,
+                    stats_only: bool = False) -> Dict:
+    """Benchmark one algorithm function on one scenario."""
+    fn = ALGORITHMS[name]
+    options = {"record": False} if stats_only else {}
+
+    def call():
+        result = fn(scenario.grid, scenario.start, scenario.end, **options)
+        return result["nodes_expanded"], len(result["path"])
+
+    build_ms = None
+    if name in PRECOMPUTED:
+        cache, key = PRECOMPUTED[name]
+        cache.clear()
+        cold = fn(scenario.grid, scenario.start, scenario.end, **options)
+        build_ms = cold["profile"][key] / 1e6
+
+    target = f"{name} stats" if stats_only else name
+    return {"target": target, "scenario": scenario.name, "size": scenario.size,
+            **_measure(call, repeat, trace_memory), "build_ms": build_ms}
+
+
+def bench_api(name: str, scenario: Scenario, repeat: int, trace_memory: bool,
+              stats_only: bool = False) -> Dict:
+    """Benchmark POST /solve end to end (validation, search, serialization)."""
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)
+    payload = {
+        "algorithm": name,
+        "rows": scenario.size,
+        "cols": scenario.size,
+        "start": {"row": scenario.start[0], "col": scenario.start[1]},
+        "end": {"row": scenario.end[0], "col": scenario.end[1]},
+        "grid": scenario.grid,
+        "stats_only": stats_only,
+    }
+
+    def call():
+        # Measure the work, not the result cache
+        main.result_cache.clear()
+        response = client.post("/solve", json=payload)
+        response.raise_for_status()
+        stats = response.json()["stats"]
+        return stats["nodesExpanded"], stats["pathLength"]
+
+    target = f"api:{name} stats" if stats_only else f"api:{name}"
+    return {"target": target, "scenario": scenario.name, "size": scenario.size,
+            **_measure(call, repeat, trace_memory)}
+
+
+def run(sizes: List[int], scenarios: List[str], algorithms: List[str], repeat: int,
+        api: bool = False, trace_memory: bool = True, seed: int = 0,
+        stats_only: bool = False, log: Optional[Callable[[str], None]] = None) -> Dict:
+    """Run the whole matrix and return the JSON-ready report."""
+    results = []
+    for size in sizes:
+        for scenario_name in scenarios:
+            scenario = make_scenario(scenario_name, size, seed)
+            for name in algorithms:
+                modes = [False, True] if stats_only else [False]
+                cases = [bench_algorithm(name, scenario, repeat, trace_memory, mode) for mode in modes]
+                if api:
+                    cases.extend(bench_api(name, scenario, repeat, trace_memory, mode) for mode in modes)
+                for case in cases:
+                    results.append(case)
+                    if log:
+                        peak = f"  peak {case['peak_kib']:10.0f} KiB" if case["peak_kib"] is not None else ""
+                        log(f"{case['target']:>28} {scenario_name:>12} {size:>5}  "
+                            f"p50 {case['p50_ms']:10.2f} ms  p99 {case['p99_ms']:10.2f} ms{peak}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Cases whose p50 latency regressed by more than tolerance (a fraction).
+
+    Cases missing from either report are ignored.
+    """
+    def key(case):
+        return (case["target"], case["scenario"], case["size"])
+
+    previous = {key(case): case for case in baseline["results"]}
+    regressions = []
+    for case in current["results"]:
+        before = previous.get(key(case))
+        if before is None or before["p50_ms"] <= 0:
+            continue
+        change = case["p50_ms"] / before["p50_ms"] - 1
+        if change > tolerance:
+            regressions.append({
+                "target": case["target"],
+                "scenario": case["scenario"],
+                "size": case["size"],
+                "baseline_p50_ms": before["p50_ms"],
+                "p50_ms": case["p50_ms"],
+                "change": change,
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="grid side lengths (10 to 2000)")
+    parser.add_argument("--scenarios", nargs="+", default=list(GENERATORS),
+                        choices=list(GENERATORS))
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS),
+                        choices=list(ALGORITHMS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--api", action="store_true", help="also benchmark POST /solve")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--stats-only", action="store_true",
+                        help="also run every case without recording the visit order")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p50 slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.scenarios, args.algorithms, args.repeat,
+                 api=args.api, trace_memory=not args.no_memory, seed=args.seed,
+                 stats_only=args.stats_only,
+                 log=lambda line: print(line, file=sys.stderr))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['target']} {r['scenario']} {r['size']}: "
+                  f"{r['baseline_p50_ms']:.2f} -> {r['p50_ms']:.2f} ms ({r['change']:+.0%})")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Bounded in-memory LRU cache used to serve repeated /solve requests.
+
+Users re-run the same maze with the same endpoints and algorithm while
+tweaking the animation, so solve results are cached keyed by a hash of the
+grid contents plus start, end and algorithm. The cache is bounded three
+ways - entry count, approximate bytes, and a per-entry TTL - and keeps
+hit/miss/eviction counters for the /cache/stats endpoint.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with count, size and TTL bounds.
+
+    Args:
+        max_entries: Maximum number of entries kept
+        max_bytes: Maximum total of the sizes passed to put()
+        ttl: Seconds an entry stays valid after it is stored; 0 disables expiry
+        clock: Monotonic time source, injectable for tests
+        on_evict: Called with (key, value) for every entry that is evicted,
+            expires, is discarded or is cleared - not when put() replaces
+            it - e.g. to free resources tied to the value
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: float = 600.0, clock: Callable[[], float] = time.monotonic,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry[2] <= self._clock():
+                self._evict(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> None:
+        """Store value under key, evicting least-recently-used entries to fit.
+
+        A value larger than max_bytes on its own is not cached at all.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, self._clock() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> Any:
+        """Drop key and return its value; the caller holds the lock."""
+        value, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        return value
+
+    def _evict(self, key: Hashable) -> None:
+        """Evict key, counting it; the caller holds the lock."""
+        value = self._remove(key)
+        self.evictions += 1
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+    def discard(self, key: Hashable) -> bool:
+        """Drop key if present; returns whether it was."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            value = self._remove(key)
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+            return True
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            entries = self._entries
+            self._entries = OrderedDict()
+            self._bytes = 0
+            if self._on_evict is not None:
+                for key, (value, _, _) in entries.items():
+                    self._on_evict(key, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+            }
+
+
+# Rough per-cell cost of a (row, col) tuple in a list: pointer + tuple + ints
+_BYTES_PER_CELL = 120
+# ... and of an int in a list, for encoded visit orders (see visits.py)
+_BYTES_PER_INT = 36
+
+
+def response_size(response: Dict) -> int:
+    """Approximate memory held by a /solve response dict."""
+    visited = response["visited"]
+    if isinstance(visited, dict):
+        data = visited["data"]
+        visited_bytes = len(data) if isinstance(data, str) else _BYTES_PER_INT * len(data)
+    else:
+        visited_bytes = _list_size(visited)
+    return 1024 + _list_size(response["path"]) + visited_bytes
+
+
+def _list_size(cells: Any) -> int:
+    # NumPy arrays of cell indices (/solve/binary) know their size
+    nbytes = getattr(cells, "nbytes", None)
+    return nbytes if nbytes is not None else _BYTES_PER_CELL * len(cells)
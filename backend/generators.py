@@ -0,0 +1,200 @@
+"""Seeded grid generators for POST /grids/generate and the benchmark suite.
+
+Every generator takes (rows, cols, seed) plus its own options and returns
+a rows x cols uint8 NumPy array (0 = open, 1 = wall), deterministic for the
+same arguments. The top-left and bottom-right cells are always open and,
+except for random walls, connected to each other.
+
+    random       each cell a wall with probability density
+    backtracker  perfect maze (one route between any two cells) carved by
+                 a randomized depth-first search - long winding corridors
+    prim         perfect maze grown by randomized Prim - many short dead ends
+    kruskal      perfect maze joined by randomized Kruskal - like prim but
+                 without a bias towards the start
+    rooms        rectangular rooms joined in placement order by L-shaped
+                 corridors, the first and last room also to the corners
+
+Mazes put their cells on the even rows and columns and knock out the wall
+between two cells to join them. Walking the maze is inherently sequential,
+but the grid itself is written in a few vectorized assignments; an even
+last row or column has no cells of its own and is left open.
+"""
+
+from typing import Callable, Dict, List, Tuple
+import random
+
+import numpy as np
+
+from algorithms import GridGraph
+
+
+Passages = Tuple[List[int], List[int]]
+
+
+def random_walls(rows: int, cols: int, seed: int = 0, density: float = 0.3) -> np.ndarray:
+    """Each cell is a wall with probability density."""
+    rng = np.random.default_rng(seed)
+    cells = (rng.random((rows, cols)) < density).astype(np.uint8)
+    cells[0, 0] = cells[-1, -1] = 0
+    return cells
+
+
+def _maze(rows: int, cols: int, passages: Passages) -> np.ndarray:
+    """Grid of a maze on (rows + 1) // 2 x (cols + 1) // 2 cells whose
+    passages join cell a[i] to cell b[i] (flat cell numbers)."""
+    width = (cols + 1) // 2
+    a = np.asarray(passages[0], dtype=np.int64)
+    b = np.asarray(passages[1], dtype=np.int64)
+    cells = np.ones((rows, cols), dtype=np.uint8)
+    cells[::2, ::2] = 0
+    # The wall between two neighbouring cells sits at the sum of their
+    # cell coordinates: (2r + 2r') / 2 = r + r'
+    cells[a // width + b // width, a % width + b % width] = 0
+    if rows % 2 == 0:
+        cells[-1, :] = 0
+    if cols % 2 == 0:
+        cells[:, -1] = 0
+    return cells
+
+
+def _neighbours(cell: int, height: int, width: int) -> List[int]:
+    """Cells beside cell, in the order right, down, left, up."""
+    row, col = divmod(cell, width)
+    found = []
+    if col + 1 < width:
+        found.append(cell + 1)
+    if row + 1 < height:
+        found.append(cell + width)
+    if col > 0:
+        found.append(cell - 1)
+    if row > 0:
+        found.append(cell - width)
+    return found
+
+
+def backtracker(rows: int, cols: int, seed: int = 0) -> np.ndarray:
+    """Perfect maze carved by an iterative recursive backtracker."""
+    rng = random.Random(seed)
+    height, width = (rows + 1) // 2, (cols + 1) // 2
+    seen = bytearray(height * width)
+    seen[0] = 1
+    stack = [0]
+    passages: Passages = ([], [])
+    while stack:
+        cell = stack[-1]
+        options = [n for n in _neighbours(cell, height, width) if not seen[n]]
+        if not options:
+            stack.pop()
+            continue
+        nxt = rng.choice(options)
+        seen[nxt] = 1
+        passages[0].append(cell)
+        passages[1].append(nxt)
+        stack.append(nxt)
+    return _maze(rows, cols, passages)
+
+
+def prim(rows: int, cols: int, seed: int = 0) -> np.ndarray:
+    """Perfect maze grown by randomized Prim: repeatedly join a random
+    frontier cell to a random cell already in the maze."""
+    rng = random.Random(seed)
+    height, width = (rows + 1) // 2, (cols + 1) // 2
+    # 0 = untouched, 1 = on the frontier, 2 = in the maze
+    state = bytearray(height * width)
+    state[0] = 2
+    frontier = _neighbours(0, height, width)
+    for cell in frontier:
+        state[cell] = 1
+    passages: Passages = ([], [])
+    while frontier:
+        i = rng.randrange(len(frontier))
+        cell = frontier[i]
+        frontier[i] = frontier[-1]
+        frontier.pop()
+        around = _neighbours(cell, height, width)
+        passages[0].append(rng.choice([n for n in around if state[n] == 2]))
+        passages[1].append(cell)
+        state[cell] = 2
+        for n in around:
+            if not state[n]:
+                state[n] = 1
+                frontier.append(n)
+    return _maze(rows, cols, passages)
+
+
+def kruskal(rows: int, cols: int, seed: int = 0) -> np.ndarray:
+    """Perfect maze from randomized Kruskal: open the walls between cells in
+    a random order, skipping any that would close a loop."""
+    rng = np.random.default_rng(seed)
+    height, width = (rows + 1) // 2, (cols + 1) // 2
+    ids = np.arange(height * width).reshape(height, width)
+    a = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    b = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    order = rng.permutation(len(a))
+    a, b = a[order].tolist(), b[order].tolist()
+
+    parent = list(range(height * width))
+
+    def find(cell: int) -> int:
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    passages: Passages = ([], [])
+    for x, y in zip(a, b):
+        root_x, root_y = find(x), find(y)
+        if root_x != root_y:
+            parent[root_x] = root_y
+            passages[0].append(x)
+            passages[1].append(y)
+    return _maze(rows, cols, passages)
+
+
+def rooms(rows: int, cols: int, seed: int = 0) -> np.ndarray:
+    """Rooms and corridors: up to one room per ~200 cells, placed at random
+    without touching, each joined to the one placed before it."""
+    rng = np.random.default_rng(seed)
+    cells = np.ones((rows, cols), dtype=np.uint8)
+    largest = max(3, min(12, min(rows, cols) // 4))
+    wanted = max(1, rows * cols // 200)
+    centres = [(0, 0)]
+    for _ in range(wanted * 4):
+        if len(centres) > wanted:
+            break
+        height, width = rng.integers(3, largest + 1, size=2)
+        if height > rows - 2 or width > cols - 2:
+            continue
+        top = int(rng.integers(1, rows - height))
+        left = int(rng.integers(1, cols - width))
+        # Keep a wall between rooms
+        if cells[top - 1:top + height + 1, left - 1:left + width + 1].all():
+            cells[top:top + height, left:left + width] = 0
+            centres.append((top + height // 2, left + width // 2))
+    centres.append((rows - 1, cols - 1))
+    for (r1, c1), (r2, c2) in zip(centres, centres[1:]):
+        cells[r1, min(c1, c2):max(c1, c2) + 1] = 0
+        cells[min(r1, r2):max(r1, r2) + 1, c2] = 0
+    return cells
+
+
+GENERATORS: Dict[str, Callable[..., np.ndarray]] = {
+    "random": random_walls,
+    "backtracker": backtracker,
+    "prim": prim,
+    "kruskal": kruskal,
+    "rooms": rooms,
+}
+
+
+def to_graph(cells: np.ndarray) -> GridGraph:
+    """Pack a generated grid into a GridGraph without going through lists."""
+    rows, cols = cells.shape
+    padded = np.pad(cells.astype(np.uint8), 1, constant_values=1)
+    return GridGraph(rows, cols, bytearray(padded.tobytes()))
+
+
+def from_graph(graph: GridGraph) -> np.ndarray:
+    """The walls of a GridGraph as a rows x cols array, the inverse of to_graph."""
+    padded = np.frombuffer(graph.blocked, dtype=np.uint8).reshape(graph.rows + 2, graph.width)
+    return padded[1:-1, 1:-1].copy()
@@ -1,18 +1,56 @@
 """FastAPI backend for graph search visualization.
 
 This module provides a REST API endpoint for running pathfinding algorithms
-on a grid-based graph and returning visualization data.
+on a grid-based graph and returning visualization data, plus a compact
+binary variant of the same endpoint (see wire.py), a streaming variant
+that sends visited nodes while the search is still running, and planning
+sessions that replan incrementally as cells are edited. /solve and
+/solve/binary run their searches on the worker process pool (see
+workers.py) under time and expansion budgets, refuse work with 429/503
+when it is full, and cancel a search whose client disconnects. Request and
+search metrics are exported for Prometheus at GET /metrics (see metrics.py).
+Large grids reach the workers through shared memory (see shm.py).
 """
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Literal, List, Dict
+from typing import Any, Callable, Iterator, Literal, List, Dict, Optional, Tuple
+from hashlib import blake2b
+import asyncio
+import concurrent.futures
+import json
+import os
+import threading
+import time
+import uuid
 
-from algorithms import bfs, dfs, dijkstra, a_star, bi_bfs
+import generators
+import metrics
+import shm
+import visits
+import wire
+import workers
+from cache import LRUCache, response_size
+from algorithms import GridGraph, bfs, dfs, dijkstra, a_star, bi_bfs, jps, hpa_star, bidirectional, alt
+from algorithms.components import ComponentIndex, links_corners
+from algorithms.distances import many_to_many_steps
+from algorithms.lpa_star import LPAStar
 
 
-app = FastAPI(title="Graph Search Visualizer API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop the search worker processes when the app shuts down, then
+    free the shared grids they were reading."""
+    yield
+    workers.shutdown_pool()
+    shared_grids.close()
+
+
+app = FastAPI(title="Graph Search Visualizer API", version="1.0.0", lifespan=lifespan)
 
 
 # Enable CORS for frontend
@@ -31,6 +69,19 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    """Stamp when each request arrived and record its count and latency."""
+    received_ns = time.perf_counter_ns()
+    request.state.received_ns = received_ns
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    request_counter.inc(route=path, method=request.method, status=str(response.status_code))
+    request_seconds.observe((time.perf_counter_ns() - received_ns) / 1e9, route=path)
+    return response
+
+
 # Map algorithm names to their implementation functions
 algorithm_map = {
     "BFS": bfs.bfs,
@@ -38,96 +89,1295 @@ algorithm_map = {
     "Dijkstra": dijkstra.dijkstra,
     "A*": a_star.a_star,
     "Bidirectional BFS": bi_bfs.bidirectional_bfs,
+    "Jump Point Search": jps.jps,
+    "HPA*": hpa_star.hpa_star,
+    "Bidirectional Dijkstra": bidirectional.bidirectional_dijkstra,
+    "Bidirectional A*": bidirectional.bidirectional_a_star,
+    "ALT": alt.alt,
+}
+
+# Finished /solve responses, keyed by (grid digest, start, end, algorithm, mode)
+result_cache = LRUCache(
+    max_entries=int(os.environ.get("SOLVE_CACHE_ENTRIES", "128")),
+    max_bytes=int(os.environ.get("SOLVE_CACHE_BYTES", str(256 * 1024 * 1024))),
+    ttl=float(os.environ.get("SOLVE_CACHE_TTL", "600")),
+)
+
+# Connected-component labels keyed by grid digest, used to answer
+# unreachable pairs without running a search
+component_cache = LRUCache(
+    max_entries=int(os.environ.get("COMPONENT_CACHE_ENTRIES", "32")),
+    max_bytes=int(os.environ.get("COMPONENT_CACHE_BYTES", str(256 * 1024 * 1024))),
+    ttl=float(os.environ.get("SOLVE_CACHE_TTL", "600")),
+)
+
+# Shared memory copies of large grids for the worker processes, keyed by digest
+shared_grids = shm.SharedGridRegistry(
+    max_entries=int(os.environ.get("SHARED_GRID_ENTRIES", "16")),
+    max_bytes=int(os.environ.get("SHARED_GRID_BYTES", str(1024 * 1024 * 1024))),
+    min_cells=int(os.environ.get("SHARED_GRID_MIN_CELLS", str(1 << 18))),
+)
+
+# Uploaded grids: grid id -> GridGraph. A grid leaving the store takes its
+# shared copy with it
+grid_store = LRUCache(
+    max_entries=int(os.environ.get("GRID_STORE_ENTRIES", "256")),
+    max_bytes=int(os.environ.get("GRID_STORE_BYTES", str(512 * 1024 * 1024))),
+    ttl=float(os.environ.get("GRID_STORE_TTL", "3600")),
+    on_evict=lambda grid_id, graph: shared_grids.discard(graph.digest()),
+)
+
+# Planning sessions: session id -> (LPAStar planner, lock serialising its updates)
+session_store = LRUCache(
+    max_entries=int(os.environ.get("SESSION_LIMIT", "64")),
+    max_bytes=int(os.environ.get("SESSION_BYTES", str(512 * 1024 * 1024))),
+    ttl=float(os.environ.get("SESSION_TTL", "1800")),
+)
+
+# Generator versions of the same algorithms, used by /solve/stream
+stream_map = {
+    "BFS": bfs.bfs_steps,
+    "DFS": dfs.dfs_steps,
+    "Dijkstra": dijkstra.dijkstra_steps,
+    "A*": a_star.a_star_steps,
+    "Bidirectional BFS": bi_bfs.bidirectional_bfs_steps,
+    "Jump Point Search": jps.jps_steps,
+    "HPA*": hpa_star.hpa_star_steps,
+    "Bidirectional Dijkstra": bidirectional.bidirectional_dijkstra_steps,
+    "Bidirectional A*": bidirectional.bidirectional_a_star_steps,
+    "ALT": alt.alt_steps,
 }
 
+# Algorithms that support the NumPy level-synchronous frontier mode
+VECTORIZED_ALGORITHMS = {"BFS", "Bidirectional BFS"}
+
+# Algorithms that support 8-connected movement (Jump Point Search through its
+# A* fallback)
+DIAGONAL_ALGORITHMS = {"BFS", "DFS", "Dijkstra", "A*", "Bidirectional BFS", "Jump Point Search",
+                       "Bidirectional Dijkstra", "Bidirectional A*", "ALT"}
+
+# Upper bound on algorithms x endpoint pairs in one /solve/batch request
+MAX_BATCH_JOBS = 64
+
+# Upper bound on sources x targets in one /distances request
+MAX_DISTANCE_PAIRS = 10_000
+
+# Upper bound on rows x cols of a grid made by POST /grids/generate
+MAX_GENERATED_CELLS = int(os.environ.get("MAX_GENERATED_CELLS", str(4096 * 4096)))
+
+# Upper bound on rows x cols of a grid sent to POST /solve/binary
+MAX_BINARY_CELLS = int(os.environ.get("MAX_BINARY_CELLS", str(wire.MAX_CELLS)))
+
+# Server-side search budgets for /solve and /solve/binary; 0 is unlimited.
+# A request may ask for less, never more.
+SEARCH_TIME_LIMIT = float(os.environ.get("SEARCH_TIME_LIMIT", "30"))
+SEARCH_EXPANSION_LIMIT = int(os.environ.get("SEARCH_EXPANSION_LIMIT", "0"))
+
+# Seconds between checks for a disconnected client while its search runs
+DISCONNECT_POLL = 0.1
+
+# Prometheus metrics, served by GET /metrics
+registry = metrics.Registry()
+request_counter = registry.counter(
+    "graph_search_http_requests_total", "HTTP requests handled", ("route", "method", "status"))
+request_seconds = registry.histogram(
+    "graph_search_http_request_duration_seconds", "Time from request arrival to response", ("route",))
+phase_seconds = registry.histogram(
+    "graph_search_phase_duration_seconds", "Time spent in each /solve phase", ("algorithm", "phase"))
+search_counter = registry.counter(
+    "graph_search_searches_total", "Searches run (result cache misses)", ("algorithm",))
+nodes_expanded_counter = registry.counter(
+    "graph_search_nodes_expanded_total", "Nodes expanded by searches", ("algorithm",))
+queue_pushes_counter = registry.counter(
+    "graph_search_queue_pushes_total", "Priority queue pushes (Dijkstra, A*)", ("algorithm",))
+stale_pops_counter = registry.counter(
+    "graph_search_stale_pops_total", "Outdated priority queue entries popped (Dijkstra, A*)", ("algorithm",))
+unreachable_counter = registry.counter(
+    "graph_search_unreachable_total", "Queries answered unreachable from the component index", ("algorithm",))
+peak_frontier_histogram = registry.histogram(
+    "graph_search_peak_frontier", "Largest frontier held during a search", ("algorithm",),
+    buckets=(10, 100, 1000, 10_000, 100_000, 1_000_000))
+rejected_counter = registry.counter(
+    "graph_search_rejected_total", "Searches refused by admission control", ("status",))
+cancelled_counter = registry.counter(
+    "graph_search_cancelled_total", "Searches cancelled because the client disconnected", ("algorithm",))
+budget_exceeded_counter = registry.counter(
+    "graph_search_budget_exceeded_total", "Searches stopped by their time or expansion budget", ("algorithm",))
+registry.gauge("graph_search_in_flight", "Admitted searches not yet finished", workers.in_flight)
+for _stat, _kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                     ("entries", "gauge"), ("bytes", "gauge")):
+    registry.gauge(
+        f"graph_search_cache_{_stat}" + ("_total" if _kind == "counter" else ""),
+        f"Result cache {_stat}",
+        lambda stat=_stat: result_cache.stats()[stat],
+        kind=_kind,
+    )
+registry.gauge("graph_search_shared_grids", "Grids held in shared memory for the workers",
+               lambda: shared_grids.stats()["entries"])
+registry.gauge("graph_search_shared_grid_bytes", "Bytes of grids held in shared memory",
+               lambda: shared_grids.stats()["bytes"])
+
+AlgorithmName = Literal["BFS", "DFS", "Dijkstra", "A*", "Bidirectional BFS", "Jump Point Search", "HPA*",
+                        "Bidirectional Dijkstra", "Bidirectional A*", "ALT"]
+
+
+class CellChange(BaseModel):
+    """One cell edit, for planning sessions and grid_id patches."""
+    row: int = Field(description="Row of the cell")
+    col: int = Field(description="Column of the cell")
+    value: int = Field(ge=0, le=255, description="New cell value: 0=open, 1=wall, 2-255=step cost")
+
 
 class GridRequest(BaseModel):
-    """Request model for pathfinding algorithm execution."""
-    algorithm: Literal["BFS", "DFS", "Dijkstra", "A*", "Bidirectional BFS"] = Field(
+    """Request model for pathfinding algorithm execution.
+
+    The grid is either sent inline (rows, cols, grid) or referenced by the
+    grid_id of an upload to POST /grids, optionally with patches.
+    """
+    algorithm: AlgorithmName = Field(
         description="Algorithm to use for pathfinding"
     )
+    rows: Optional[int] = Field(default=None, gt=0, description="Number of rows in the grid")
+    cols: Optional[int] = Field(default=None, gt=0, description="Number of columns in the grid")
+    start: Dict[str, int] = Field(description="Starting position {row, col}")
+    end: Dict[str, int] = Field(description="Ending position {row, col}")
+    grid: Optional[List[List[int]]] = Field(
+        default=None,
+        description="Grid representation where 0=open, 1=wall, 2-255=open with that step cost"
+    )
+    grid_id: Optional[str] = Field(
+        default=None, description="Id of a grid uploaded to POST /grids, instead of rows/cols/grid"
+    )
+    patches: List[CellChange] = Field(
+        default_factory=list, description="Cell edits applied to the stored grid (grid_id only)"
+    )
+    vectorized: bool = Field(
+        default=False,
+        description="Expand whole BFS frontiers per step with NumPy (BFS and Bidirectional BFS only)"
+    )
+    connectivity: Literal[4, 8] = Field(
+        default=4,
+        description="4 for orthogonal steps only, 8 to add diagonal steps costing sqrt(2) times the cell cost"
+    )
+    corner_cutting: Literal["never", "single", "always"] = Field(
+        default="never",
+        description="When a diagonal step may pass walls on the cells it cuts across: never, "
+                    "beside a single wall, or always (even between two)"
+    )
+    profile: bool = Field(
+        default=False,
+        description="Add a profile block with per-phase timings and search counters"
+    )
+    profile_memory: bool = Field(
+        default=False,
+        description="Also trace peak memory of the search (bypasses the result cache, slows the search)"
+    )
+    include_region: bool = Field(
+        default=False,
+        description="If end is unreachable, return start's whole region (row-major) as visited"
+    )
+    visited_format: Literal["cells", "delta", "rle", "steps", "none"] = Field(
+        default="cells",
+        description="Encoding of visited (see visits.py); none skips it entirely"
+    )
+    visited_stride: int = Field(default=1, ge=1, description="Keep every n-th visited cell")
+    visited_limit: Optional[int] = Field(
+        default=None, gt=0, description="Raise the stride so at most this many visited cells are kept"
+    )
+    stats_only: bool = Field(
+        default=False,
+        description="Return only stats: path and visited are left empty and the visit order is never recorded"
+    )
+    max_seconds: Optional[float] = Field(
+        default=None, gt=0, description="Search time budget, capped by SEARCH_TIME_LIMIT"
+    )
+    max_expansions: Optional[int] = Field(
+        default=None, gt=0, description="Expansion budget, capped by SEARCH_EXPANSION_LIMIT"
+    )
+
+
+class SessionRequest(BaseModel):
+    """Request model for creating a planning session."""
     rows: int = Field(gt=0, description="Number of rows in the grid")
     cols: int = Field(gt=0, description="Number of columns in the grid")
     start: Dict[str, int] = Field(description="Starting position {row, col}")
     end: Dict[str, int] = Field(description="Ending position {row, col}")
     grid: List[List[int]] = Field(
-        description="Grid representation where 0=open, 1=wall"
+        description="Grid representation where 0=open, 1=wall, 2-255=open with that step cost"
     )
 
 
-@app.post("/solve")
-def solve_graph(request: GridRequest) -> Dict:
-    """Solve a pathfinding problem using the specified algorithm.
-    
-    Args:
-        request: GridRequest containing algorithm, grid, and start/end positions
-        
-    Returns:
-        Dictionary containing:
-        - stats: Performance metrics (solved, time, nodesExpanded, pathLength)
-        - path: List of (row, col) tuples representing the solution path
-        - visited: List of (row, col) tuples representing visited nodes in order
-        
+class SessionUpdate(BaseModel):
+    """Request model for editing the grid of a planning session."""
+    changes: List[CellChange] = Field(min_length=1, description="Cell edits to apply")
+
+
+class EndpointPair(BaseModel):
+    """One (start, end) query in a batch request."""
+    start: Dict[str, int] = Field(description="Starting position {row, col}")
+    end: Dict[str, int] = Field(description="Ending position {row, col}")
+
+
+class DistanceRequest(BaseModel):
+    """Request model for many-to-many distance queries.
+
+    As with GridRequest, the grid is sent inline or referenced by grid_id.
+    """
+    rows: Optional[int] = Field(default=None, gt=0, description="Number of rows in the grid")
+    cols: Optional[int] = Field(default=None, gt=0, description="Number of columns in the grid")
+    grid: Optional[List[List[int]]] = Field(
+        default=None,
+        description="Grid representation where 0=open, 1=wall, 2-255=open with that step cost"
+    )
+    grid_id: Optional[str] = Field(
+        default=None, description="Id of a grid uploaded to POST /grids, instead of rows/cols/grid"
+    )
+    patches: List[CellChange] = Field(
+        default_factory=list, description="Cell edits applied to the stored grid (grid_id only)"
+    )
+    sources: List[Dict[str, int]] = Field(min_length=1, description="Positions {row, col} to measure from")
+    targets: List[Dict[str, int]] = Field(min_length=1, description="Positions {row, col} to measure to")
+    include_paths: bool = Field(
+        default=False, description="Also return the path of every reachable pair (larger response)"
+    )
+
+
+class GridUpload(BaseModel):
+    """Request model for storing a grid with POST /grids."""
+    rows: int = Field(gt=0, description="Number of rows in the grid")
+    cols: int = Field(gt=0, description="Number of columns in the grid")
+    grid: List[List[int]] = Field(
+        description="Grid representation where 0=open, 1=wall, 2-255=open with that step cost"
+    )
+
+
+class GenerateRequest(BaseModel):
+    """Request model for building a seeded grid with POST /grids/generate."""
+    generator: Literal["random", "backtracker", "prim", "kruskal", "rooms"] = Field(
+        description="Generator to use (see generators.py)"
+    )
+    rows: int = Field(gt=0, description="Number of rows in the grid")
+    cols: int = Field(gt=0, description="Number of columns in the grid")
+    seed: int = Field(default=0, description="Random seed; the same seed gives the same grid")
+    density: float = Field(
+        default=0.3, ge=0, le=1, description="Chance of a wall per cell (random only)"
+    )
+    include_grid: bool = Field(
+        default=False, description="Also return the grid itself, e.g. to draw it"
+    )
+
+
+class BatchRequest(BaseModel):
+    """Request model for running several algorithms and/or endpoint pairs on one grid.
+
+    As with GridRequest, the grid is sent inline or referenced by grid_id.
+    """
+    algorithms: List[AlgorithmName] = Field(
+        min_length=1, description="Algorithms to run on the grid"
+    )
+    rows: Optional[int] = Field(default=None, gt=0, description="Number of rows in the grid")
+    cols: Optional[int] = Field(default=None, gt=0, description="Number of columns in the grid")
+    grid: Optional[List[List[int]]] = Field(
+        default=None,
+        description="Grid representation where 0=open, 1=wall, 2-255=open with that step cost"
+    )
+    grid_id: Optional[str] = Field(
+        default=None, description="Id of a grid uploaded to POST /grids, instead of rows/cols/grid"
+    )
+    patches: List[CellChange] = Field(
+        default_factory=list, description="Cell edits applied to the stored grid (grid_id only)"
+    )
+    start: Optional[Dict[str, int]] = Field(
+        default=None, description="Starting position {row, col}, used when pairs is empty"
+    )
+    end: Optional[Dict[str, int]] = Field(
+        default=None, description="Ending position {row, col}, used when pairs is empty"
+    )
+    pairs: List[EndpointPair] = Field(
+        default_factory=list, description="(start, end) pairs to run every algorithm on"
+    )
+    vectorized: bool = Field(
+        default=False,
+        description="Use the NumPy frontier mode for the algorithms that support it"
+    )
+
+
+def _build_graph(rows: int, cols: int, grid: List[List[int]]) -> GridGraph:
+    """Check grid dimensions against rows/cols and pack it into a GridGraph.
+
     Raises:
-        HTTPException: If the algorithm execution fails or input is invalid
+        HTTPException: 400 if the dimensions do not match or a cell value
+            is outside 0-255
     """
     # Validate grid dimensions match request
-    if len(request.grid) != request.rows or any(
-        len(row) != request.cols for row in request.grid
-    ):
+    if len(grid) != rows or any(len(row) != cols for row in grid):
         raise HTTPException(
             status_code=400,
             detail="Grid dimensions do not match specified rows and cols"
         )
-    
-    # Extract and validate start/end positions
     try:
-        start = (request.start["row"], request.start["col"])
-        end = (request.end["row"], request.end["col"])
+        return GridGraph.from_rows(grid)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _request_graph(request) -> GridGraph:
+    """The graph a GridRequest or BatchRequest refers to: its inline grid,
+    or a stored grid with its patches applied.
+
+    A stored grid was validated on upload, so only the patches are checked.
+
+    Raises:
+        HTTPException: 400 if the grid or a patch is invalid, 404 if
+            grid_id is unknown or expired
+    """
+    if request.grid_id is None:
+        if request.grid is None or request.rows is None or request.cols is None:
+            raise HTTPException(status_code=400, detail="Provide either rows, cols and grid, or grid_id")
+        if request.patches:
+            raise HTTPException(status_code=400, detail="patches require grid_id")
+        return _build_graph(request.rows, request.cols, request.grid)
+
+    graph = grid_store.get(request.grid_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired grid_id")
+    if not request.patches:
+        return graph
+    for patch in request.patches:
+        if not (0 <= patch.row < graph.rows and 0 <= patch.col < graph.cols):
+            raise HTTPException(status_code=400, detail=f"Patch cell ({patch.row}, {patch.col}) out of bounds")
+    return graph.patched([(patch.row, patch.col, patch.value) for patch in request.patches])
+
+
+def _position(position: Dict[str, int]) -> Tuple[int, int]:
+    """Extract (row, col) from a {row, col} dict.
+
+    Raises:
+        HTTPException: 400 if a field is missing
+    """
+    try:
+        return (position["row"], position["col"])
     except KeyError as e:
         raise HTTPException(
             status_code=400,
             detail=f"Missing required position field: {e}"
         )
-    
+
+
+def _validate_endpoints(graph: GridGraph, start: Tuple[int, int], end: Tuple[int, int]) -> None:
+    """Reject start/end positions that are out of bounds or on a wall.
+
+    Raises:
+        HTTPException: 400 if either position is invalid
+    """
     # Validate positions are within grid bounds
-    if not (0 <= start[0] < request.rows and 0 <= start[1] < request.cols):
+    if not (0 <= start[0] < graph.rows and 0 <= start[1] < graph.cols):
         raise HTTPException(status_code=400, detail="Start position out of bounds")
-    if not (0 <= end[0] < request.rows and 0 <= end[1] < request.cols):
+    if not (0 <= end[0] < graph.rows and 0 <= end[1] < graph.cols):
         raise HTTPException(status_code=400, detail="End position out of bounds")
-    
+
     # Validate start and end are not walls
-    if request.grid[start[0]][start[1]] == 1:
+    if not graph.is_open(*start):
         raise HTTPException(status_code=400, detail="Start position is a wall")
-    if request.grid[end[0]][end[1]] == 1:
+    if not graph.is_open(*end):
         raise HTTPException(status_code=400, detail="End position is a wall")
-    
-    # Execute the selected algorithm
-    try:
-        result = algorithm_map[request.algorithm](
-            request.grid,
-            start,
-            end
-        )
-    except KeyError:
+
+
+def _components(graph: GridGraph, digest: str) -> Tuple[ComponentIndex, int]:
+    """The component index of graph, and the nanoseconds spent building it
+    (0 when it came from component_cache).
+
+    A grid patched from a stored one gets the stored grid's index (cached
+    like any other) updated for the changed cells rather than a full
+    relabelling (see ComponentIndex.patched).
+    """
+    # Only corner-squeezing diagonal movement changes the components
+    corners = links_corners(graph)
+    key = (digest, "corners") if corners else digest
+    components = component_cache.get(key)
+    if components is not None:
+        return components, 0
+    began = time.perf_counter_ns()
+    if graph.patched_from is not None:
+        base, cells = graph.patched_from
+        if corners:
+            base = base.with_connectivity(8, "always")
+        components = _components(base, base.digest())[0].patched(graph, cells)
+    else:
+        components = ComponentIndex.build(graph)
+    elapsed = time.perf_counter_ns() - began
+    component_cache.put(key, components, components.nbytes)
+    return components, elapsed
+
+
+def _unreachable_response(algorithm: str, graph: GridGraph, components: ComponentIndex,
+                          start: Tuple[int, int], include_region: bool,
+                          visited_mode: Optional[Tuple] = None) -> Dict:
+    """The /solve response for an end outside start's component, without searching.
+
+    visited is empty, or with include_region every cell of start's component
+    in row-major order - the cells a search would have flooded - encoded
+    as visited_mode asks (see _visited_mode).
+    """
+    unreachable_counter.inc(algorithm=algorithm)
+    if not include_region:
+        visited = visits.encode(graph, [], *visited_mode) if visited_mode else []
+    elif visited_mode:
+        visited = visits.encode(graph, components.region(graph.index(*start)), *visited_mode)
+    else:
+        visited = graph.cells(components.region(graph.index(*start)))
+    return {
+        "stats": {
+            "solved": False,
+            "time": 0,
+            "nodesExpanded": 0,
+            "pathLength": 0,
+            "pathCost": 0,
+        },
+        "path": [],
+        "visited": visited,
+    }
+
+
+def _check_connectivity(algorithm: str, graph: GridGraph) -> None:
+    """Raise a 400 if graph has diagonal movement algorithm cannot use."""
+    if graph.diagonals and algorithm not in DIAGONAL_ALGORITHMS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unknown algorithm: {request.algorithm}"
+            detail=f"8-connected movement is not available for {algorithm}"
         )
+
+
+def _visited_mode(request: GridRequest) -> Optional[Tuple[str, int, Optional[int]]]:
+    """(format, stride, limit) for visits.encode, or None for the plain
+    [[row, col], ...] list. stats_only implies "none"."""
+    if request.stats_only:
+        return ("none", 1, None)
+    if request.visited_format == "cells" and request.visited_stride == 1 and not request.visited_limit:
+        return None
+    return (request.visited_format, request.visited_stride, request.visited_limit)
+
+
+def _budget(requested, limit):
+    """The tighter of a requested budget and the server limit (0 = unlimited)."""
+    if not requested:
+        return limit
+    return min(requested, limit) if limit else requested
+
+
+def _client(http_request: Request) -> str:
+    """Key a request's searches are admitted under (see workers.submit)."""
+    return http_request.client.host if http_request.client else "unknown"
+
+
+async def _submit(graph: GridGraph,
+                  submit: Callable[[Any], Tuple[concurrent.futures.Future, int]]
+                  ) -> Tuple[concurrent.futures.Future, int]:
+    """Pin graph in shared memory (see shm.py) and queue work on it.
+
+    Args:
+        graph: The grid the work runs on
+        submit: Called with the handle of graph to send to the worker;
+            workers.submit or workers.submit_task with every other argument
+            bound
+
+    Returns:
+        submit's future and slot; graph is unpinned once the future is done
+
+    Raises:
+        HTTPException: 429/503 if admission control refuses the work
+    """
+    handle = await run_in_threadpool(shared_grids.acquire, graph)
+    try:
+        future, slot = submit(handle)
+    except workers.Rejected as e:
+        shared_grids.release(handle)
+        rejected_counter.inc(status=str(e.status_code))
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": "1"})
+    future.add_done_callback(lambda _: shared_grids.release(handle))
+    return future, slot
+
+
+async def _await_job(http_request: Request, future: concurrent.futures.Future, slot: int,
+                     algorithm: str) -> Optional[Any]:
+    """Wait for work queued by _submit, cancelling it if the client disconnects.
+
+    Returns:
+        The worker's result; None if the work was cancelled
+
+    Raises:
+        HTTPException: 500 if the work itself failed
+    """
+    job = asyncio.wrap_future(future)
+    while not (await asyncio.wait({job}, timeout=DISCONNECT_POLL))[0]:
+        if await http_request.is_disconnected():
+            workers.cancel(slot, future)
+            job.cancel()  # drops it from the queue if it has not started
+            cancelled_counter.inc(algorithm=algorithm)
+            return None
+    try:
+        return job.result()
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Algorithm execution failed: {str(e)}"
         )
-    
+
+
+async def _run_search(http_request: Request, algorithm: str, graph: GridGraph,
+                      start: Tuple[int, int], end: Tuple[int, int], vectorized: bool = False,
+                      trace_memory: bool = False, include_region: bool = False,
+                      max_seconds: Optional[float] = None,
+                      max_expansions: Optional[int] = None,
+                      visited_mode: Optional[Tuple] = None,
+                      stats_only: bool = False,
+                      cell_indices: bool = False) -> Optional[Tuple[Dict, Dict]]:
+    """Run an algorithm on a validated grid and shape the /solve response.
+
+    Pairs in different connected components are answered from the grid's
+    component index without searching. Repeats of the same grid, endpoints,
+    algorithm and mode are answered from result_cache without calling into
+    algorithm_map. Anything else runs on the worker pool (see
+    workers.submit), admitted under the client's address.
+
+    Args:
+        http_request: The incoming request, watched for a disconnect
+        trace_memory: Run the search under tracemalloc (skipping the cache
+            lookup) and add peak_memory_bytes to the profile
+        include_region: See _unreachable_response
+        max_seconds, max_expansions: Requested budgets (see _budget). A
+            search that runs out is answered solved=False with what it
+            visited and budgetExceeded set, and is not cached.
+        visited_mode: See _visited_mode. The search then runs on
+            graph.index_view(), so the visit order comes back as flat
+            indices and never becomes (row, col) tuples unless asked for.
+            With "none" the algorithm does not record the visit order at all.
+        stats_only: Also leave path empty (visited_mode should be "none");
+            stats.pathLength still counts it.
+        cell_indices: Instead of visited_mode, run on graph.index_view() and
+            return path and visited as NumPy arrays of row * cols + col, for
+            /solve/binary to pack as they are.
+
+    Returns:
+        The response dict and the algorithm's profile dict (see
+        search_result), with cached set to whether the response came from
+        result_cache, components_ns to the time spent building the
+        component index and unreachable to whether the search was skipped.
+        None if the client disconnected and the search was cancelled.
+
+    Raises:
+        HTTPException: 400 for an unknown algorithm or unsupported mode,
+            429/503 if admission control refuses the search, 500 if the
+            algorithm itself fails
+    """
+    if vectorized and algorithm not in VECTORIZED_ALGORITHMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Vectorized mode is not available for {algorithm}"
+        )
+    if algorithm not in algorithm_map:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown algorithm: {algorithm}"
+        )
+    _check_connectivity(algorithm, graph)
+    options = {"vectorized": True} if vectorized else {}
+    if visited_mode and visited_mode[0] == "none":
+        options["record"] = False
+
+    # Hashing and labelling are O(rows * cols), so keep them off the event loop
+    digest = await run_in_threadpool(graph.digest)
+    components, components_ns = await run_in_threadpool(_components, graph, digest)
+    if not components.connected(graph.index(*start), graph.index(*end)):
+        response = _unreachable_response(algorithm, graph, components, start, include_region,
+                                         visited_mode)
+        return response, {"components_ns": components_ns, "cached": False, "unreachable": True}
+    checked = {"components_ns": components_ns, "unreachable": False}
+
+    cache_key = (digest, start, end, algorithm, vectorized)
+    if visited_mode:
+        cache_key += visited_mode
+    if stats_only:
+        cache_key += ("stats",)
+    if graph.diagonals:
+        cache_key += (8, graph.corner_limit)
+    if cell_indices:
+        cache_key += ("indices",)
+    cached = None if trace_memory else result_cache.get(cache_key)
+    if cached is not None:
+        response, profile = cached
+        return response, {**profile, **checked, "cached": True}
+
+    flat = visited_mode or cell_indices
+    future, slot = await _submit(graph.index_view() if flat else graph, lambda handle: workers.submit(
+        _client(http_request), algorithm_map[algorithm], stream_map[algorithm], handle, start, end, options,
+        _budget(max_seconds, SEARCH_TIME_LIMIT), _budget(max_expansions, SEARCH_EXPANSION_LIMIT),
+        trace_memory,
+    ))
+    result = await _await_job(http_request, future, slot, algorithm)
+    if result is None:
+        return None
+
+    if cell_indices:
+        result["path"] = visits.cell_indices(graph, result["path"])
+        result["visited"] = visits.cell_indices(graph, result["visited"])
+    elif visited_mode:
+        if not stats_only:
+            result["path"] = graph.cells(result["path"])
+        visited = result.pop("visited")
+    response = _format_result(result)
+    if visited_mode:
+        response["visited"] = visits.encode(graph, visited, *visited_mode)
+    if stats_only:
+        response["path"] = []
+    profile = result.get("profile", {})
+    _record_search(algorithm, result)
+    if result.get("budget_exceeded"):
+        budget_exceeded_counter.inc(algorithm=algorithm)
+        response["budgetExceeded"] = True
+    else:
+        cache_profile = {k: v for k, v in profile.items() if k != "peak_memory_bytes"}
+        result_cache.put(cache_key, (response, cache_profile), response_size(response))
+    return response, {**profile, **checked, "cached": False}
+
+
+def _record_search(algorithm: str, result: Dict) -> None:
+    """Add a finished (not cached) search to the metrics."""
+    profile = result.get("profile", {})
+    search_counter.inc(algorithm=algorithm)
+    nodes_expanded_counter.inc(result.get("nodes_expanded", 0), algorithm=algorithm)
+    if "queue_pushes" in profile:
+        queue_pushes_counter.inc(profile["queue_pushes"], algorithm=algorithm)
+        stale_pops_counter.inc(profile["stale_pops"], algorithm=algorithm)
+    if "peak_frontier" in profile:
+        peak_frontier_histogram.observe(profile["peak_frontier"], algorithm=algorithm)
+
+
+def _format_result(result: Dict) -> Dict:
+    """Shape an algorithm result dict into the /solve response."""
     return {
         "stats": {
             "solved": result.get("found", False),
             "time": result.get("time_taken", 0),
             "nodesExpanded": result.get("nodes_expanded", 0),
             "pathLength": len(result.get("path", [])),
+            "pathCost": result.get("path_cost", 0),
         },
         "path": result.get("path", []),
         "visited": result.get("visited", []),
     }
 
+
+def _json_body(content: Dict) -> bytes:
+    """Encode content exactly as FastAPI's default JSONResponse would."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _parse_request(request: GridRequest,
+                   timings: Optional[Dict[str, int]] = None) -> Tuple[GridGraph, Tuple[int, int], Tuple[int, int]]:
+    """Validate a GridRequest and convert it to a graph plus start/end cells.
+
+    Args:
+        timings: If given, grid_ns is set to the time spent packing the grid
+            (or looking it up and applying patches)
+
+    Raises:
+        HTTPException: 400 if the grid or positions are invalid, 404 for an
+            unknown grid_id
+    """
+    began = time.perf_counter_ns()
+    graph = _request_graph(request)
+    if request.connectivity == 8:
+        graph = graph.with_connectivity(8, request.corner_cutting)
+    if timings is not None:
+        timings["grid_ns"] = time.perf_counter_ns() - began
+    start = _position(request.start)
+    end = _position(request.end)
+    _validate_endpoints(graph, start, end)
+    return graph, start, end
+
+
+@app.post("/solve", response_class=Response, responses={200: {"content": {"application/json": {}}}})
+async def solve_graph(request: GridRequest, http_request: Request) -> Response:
+    """Solve a pathfinding problem using the specified algorithm.
+    
+    Args:
+        request: GridRequest containing algorithm, grid, and start/end positions
+        
+    Returns:
+        Dictionary containing:
+        - stats: Performance metrics (solved, time, nodesExpanded, pathLength,
+          pathCost - the summed terrain cost, which BFS, DFS and
+          Bidirectional BFS ignore when choosing a path; with
+          request.connectivity 8 diagonal steps count sqrt(2) times and it
+          is a float)
+        - path: List of (row, col) tuples representing the solution path
+        - visited: List of (row, col) tuples representing visited nodes in order.
+          If end is not in start's connected component no search is run and
+          this is empty, or start's whole component with request.include_region.
+          request.visited_format / visited_stride / visited_limit switch it to
+          a compact encoding or a subsample (see visits.py)
+        - With request.stats_only, path and visited are both empty and only
+          stats are meaningful; the search skips recording its visit order
+        - budgetExceeded: Only present (true) if the search ran out of its
+          time or expansion budget; stats.solved is then false and visited
+          holds what was expanded so far
+        - profile: Only if request.profile is set - nanoseconds spent in each
+          phase (parseNs, gridNs, componentsNs, searchNs, pathNs,
+          serializeNs), unreachable, the search
+          counters (peakFrontier, and queuePushes/stalePops for Dijkstra,
+          A* and their bidirectional versions), peakMemoryBytes if request.profile_memory is set, and cached.
+          kernel is "native" if the search ran on the compiled kernel
+          (algorithms/native.py), else "python".
+          HPA* adds abstractionNs (building its cluster abstraction, 0 when
+          it was reused) and abstractNodes; ALT adds landmarksNs (choosing
+          its landmarks and measuring their distances, 0 when they were
+          reused) and landmarks.
+          On a cache hit the search figures are those of the original run.
+        
+    Raises:
+        HTTPException: If the algorithm execution fails or input is invalid,
+            or 429/503 (with Retry-After) if the search is not admitted
+    """
+    entered_ns = time.perf_counter_ns()
+    timings: Dict[str, int] = {}
+    graph, start, end = await run_in_threadpool(_parse_request, request, timings)
+    # Body parsing and model validation happen before the handler is called
+    parse_ns = (entered_ns - getattr(http_request.state, "received_ns", entered_ns)
+                + time.perf_counter_ns() - entered_ns - timings["grid_ns"])
+    outcome = await _run_search(http_request, request.algorithm, graph, start, end,
+                                request.vectorized, trace_memory=request.profile_memory,
+                                include_region=request.include_region,
+                                max_seconds=request.max_seconds,
+                                max_expansions=request.max_expansions,
+                                visited_mode=_visited_mode(request),
+                                stats_only=request.stats_only)
+    if outcome is None:
+        # The client is gone; 499 is nginx's "client closed request"
+        return Response(status_code=499)
+    response, profile = outcome
+
+    began = time.perf_counter_ns()
+    body = await run_in_threadpool(_json_body, response)
+    serialize_ns = time.perf_counter_ns() - began
+
+    phases = {"parse": parse_ns, "grid": timings["grid_ns"], "serialize": serialize_ns}
+    if profile["components_ns"]:
+        phases["components"] = profile["components_ns"]
+    if not (profile["cached"] or profile["unreachable"]):
+        phases.update(search=profile.get("search_ns", 0), path=profile.get("path_ns", 0))
+        if profile.get("abstraction_ns"):
+            phases["abstraction"] = profile["abstraction_ns"]
+        if profile.get("landmarks_ns"):
+            phases["landmarks"] = profile["landmarks_ns"]
+    for phase, ns in phases.items():
+        phase_seconds.observe(ns / 1e9, algorithm=request.algorithm, phase=phase)
+
+    if request.profile or request.profile_memory:
+        block = {
+            "parseNs": parse_ns,
+            "gridNs": timings["grid_ns"],
+            "searchNs": profile.get("search_ns", 0),
+            "pathNs": profile.get("path_ns", 0),
+            "serializeNs": serialize_ns,
+            "componentsNs": profile["components_ns"],
+            "peakFrontier": profile.get("peak_frontier", 0),
+            "cached": profile["cached"],
+            "unreachable": profile["unreachable"],
+            "kernel": "native" if profile.get("native") else "python",
+        }
+        if "queue_pushes" in profile:
+            block.update(queuePushes=profile["queue_pushes"], stalePops=profile["stale_pops"])
+        if "peak_memory_bytes" in profile:
+            block["peakMemoryBytes"] = profile["peak_memory_bytes"]
+        if "abstraction_ns" in profile:
+            block.update(abstractionNs=profile["abstraction_ns"], abstractNodes=profile["abstract_nodes"])
+        if "landmarks_ns" in profile:
+            block.update(landmarksNs=profile["landmarks_ns"], landmarks=profile["landmarks"])
+        # Splice the block in rather than encode the whole response again
+        body = body[:-1] + b',"profile":' + _json_body(block) + b"}"
+    return Response(content=body, media_type="application/json")
+
+
+@app.post(
+    "/solve/binary",
+    response_class=Response,
+    responses={200: {"content": {wire.RESPONSE_MEDIA_TYPE: {}}}},
+)
+async def solve_graph_binary(request: Request) -> Response:
+    """Binary counterpart of /solve - see wire.py for the request/response layout.
+
+    The grid arrives as a packed bitset or run-length payload and is decoded
+    straight into a GridGraph; path and visited are returned as flat
+    little-endian int32 cell indices.
+
+    Searches run like /solve's, under the server's budgets.
+
+    Raises:
+        HTTPException: 400 if the payload is malformed or input is invalid,
+            429/503 if the search is not admitted
+    """
+    try:
+        parsed = wire.decode_request(await request.body(), MAX_BINARY_CELLS)
+    except wire.WireFormatError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed binary request: {e}")
+
+    graph = parsed["graph"]
+    _validate_endpoints(graph, parsed["start"], parsed["end"])
+    outcome = await _run_search(request, parsed["algorithm"], graph, parsed["start"],
+                                parsed["end"], parsed["vectorized"], cell_indices=True)
+    if outcome is None:
+        return Response(status_code=499)
+    response, _ = outcome
+    return Response(
+        content=wire.encode_response(response, graph.cols),
+        media_type=wire.RESPONSE_MEDIA_TYPE,
+    )
+
+
+def _stream_response(response: Dict, batch_size: int) -> Iterator[bytes]:
+    """Yield NDJSON lines for an already finished response: its visited
+    list in batches, then the rest."""
+    visited = response.pop("visited")
+    for i in range(0, len(visited), batch_size):
+        yield (json.dumps({"visited": visited[i:i + batch_size]}) + "\n").encode()
+    yield (json.dumps(response) + "\n").encode()
+
+
+def _stream_search(algorithm: str, graph: GridGraph, start: Tuple[int, int],
+                   end: Tuple[int, int], vectorized: bool, batch_size: int,
+                   include_region: bool = False) -> Iterator[bytes]:
+    """Yield NDJSON lines for /solve/stream: visited batches, then the result."""
+    components, _ = _components(graph, graph.digest())
+    if not components.connected(graph.index(*start), graph.index(*end)):
+        yield from _stream_response(
+            _unreachable_response(algorithm, graph, components, start, include_region), batch_size
+        )
+        return
+
+    if vectorized:
+        # The vectorized mode finishes in a handful of array steps, so there
+        # is nothing to interleave - run it, then stream its visit order.
+        response = _format_result(algorithm_map[algorithm](graph, start, end, vectorized=True))
+        yield from _stream_response(response, batch_size)
+        return
+
+    steps = stream_map[algorithm](graph, start, end, batch_size=batch_size)
+    try:
+        while True:
+            yield (json.dumps({"visited": next(steps)}) + "\n").encode()
+    except StopIteration as done:
+        response = _format_result(done.value)
+    except Exception as e:
+        # Headers are already sent, so the failure has to go in-band
+        yield (json.dumps({"error": f"Algorithm execution failed: {str(e)}"}) + "\n").encode()
+        return
+
+    visited = response.pop("visited")
+    if visited:
+        yield (json.dumps({"visited": visited}) + "\n").encode()
+    yield (json.dumps(response) + "\n").encode()
+
+
+@app.post("/solve/stream")
+def solve_graph_stream(
+    request: GridRequest,
+    batch_size: int = Query(default=512, gt=0, le=65536, description="Visited cells per streamed line"),
+) -> StreamingResponse:
+    """Solve like /solve, streaming visited cells while the search runs.
+
+    The response is newline-delimited JSON. Each line but the last is
+    {"visited": [[row, col], ...]} holding the next batch of expanded cells;
+    the last line is {"stats": {...}, "path": [...]} as in /solve. Input
+    errors are still reported as a 400 before anything is streamed.
+
+    Raises:
+        HTTPException: If the input is invalid
+    """
+    graph, start, end = _parse_request(request)
+    if request.vectorized and request.algorithm not in VECTORIZED_ALGORITHMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Vectorized mode is not available for {request.algorithm}"
+        )
+    _check_connectivity(request.algorithm, graph)
+    return StreamingResponse(
+        _stream_search(request.algorithm, graph, start, end, request.vectorized, batch_size,
+                       request.include_region),
+        media_type="application/x-ndjson",
+    )
+
+
+def _session_size(planner: LPAStar) -> int:
+    """Approximate memory held by a planning session (g and rhs arrays, grid)."""
+    return 20 * planner.graph.size
+
+
+def _session_response(session_id: str, result: Dict) -> Dict:
+    response = _format_result(result)
+    response["sessionId"] = session_id
+    return response
+
+
+@app.post("/sessions", status_code=201)
+def create_session(request: SessionRequest) -> Dict:
+    """Start a planning session on a grid and return its first plan.
+
+    The session keeps LPA* search state (see algorithms/lpa_star.py) so
+    later edits through PATCH /sessions/{id} only redo the affected part of
+    the search. Sessions expire after SESSION_TTL seconds without use, and
+    the least recently used are dropped beyond SESSION_LIMIT.
+
+    Returns:
+        Dictionary containing sessionId plus the /solve response fields
+        (stats, path, visited)
+
+    Raises:
+        HTTPException: 400 if the grid or positions are invalid
+    """
+    graph = _build_graph(request.rows, request.cols, request.grid)
+    start = _position(request.start)
+    end = _position(request.end)
+    _validate_endpoints(graph, start, end)
+
+    planner = LPAStar(graph, start, end)
+    result = planner.compute()
+    session_id = uuid.uuid4().hex
+    session_store.put(session_id, (planner, threading.Lock()), _session_size(planner))
+    return _session_response(session_id, result)
+
+
+@app.patch("/sessions/{session_id}")
+def update_session(session_id: str, request: SessionUpdate) -> Dict:
+    """Apply cell edits to a session's grid and return the updated plan.
+
+    nodesExpanded and visited only cover the cells the update re-expanded.
+
+    Raises:
+        HTTPException: 404 if the session does not exist or has expired,
+            400 if an edit is out of bounds or walls off start or end
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    planner, lock = session
+    graph = planner.graph
+    changes = []
+    for change in request.changes:
+        if not (0 <= change.row < graph.rows and 0 <= change.col < graph.cols):
+            raise HTTPException(status_code=400, detail=f"Cell ({change.row}, {change.col}) out of bounds")
+        index = graph.index(change.row, change.col)
+        if change.value == 1 and index in (planner.source, planner.target):
+            raise HTTPException(status_code=400, detail="Cannot place a wall on the start or end cell")
+        changes.append((change.row, change.col, change.value))
+
+    with lock:
+        result = planner.update(changes)
+    # Re-storing refreshes the session's expiry
+    session_store.put(session_id, session, _session_size(planner))
+    return _session_response(session_id, result)
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str) -> Response:
+    """End a planning session.
+
+    Raises:
+        HTTPException: 404 if the session does not exist or has expired
+    """
+    if not session_store.discard(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return Response(status_code=204)
+
+
+@app.post("/distances")
+async def distances(request: DistanceRequest, http_request: Request) -> Dict:
+    """Cheapest distances (and optionally paths) from every source to every target.
+
+    One distance field per source - or per target, when there are fewer
+    targets - answers all of its pairs (see algorithms/distances.py),
+    instead of one search per pair. Pairs in different connected components
+    are answered without searching. The searches run on the worker process
+    pool like /solve's (see workers.submit_task): admitted under the
+    client's address, cancelled if the client disconnects, and under the
+    server's budgets, checked after each distance field. Work that runs out
+    answers the pairs measured so far, with budgetExceeded set.
+
+    Returns:
+        Dictionary containing:
+        - distances: sources x targets matrix of path costs, null where unreachable
+        - paths: sources x targets matrix of [row, col] paths, null where
+          unreachable (only with include_paths)
+        - stats: searches (distance fields grown), nodesExpanded and time
+
+    Raises:
+        HTTPException: 400 if the input is invalid or asks for too many
+            pairs, 404 for an unknown grid_id, 429/503 if the work is not
+            admitted, 500 if the search fails
+    """
+    # Before building the grid, which costs time in its size
+    if len(request.sources) * len(request.targets) > MAX_DISTANCE_PAIRS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request exceeds {MAX_DISTANCE_PAIRS} source/target pairs"
+        )
+    graph = await run_in_threadpool(_request_graph, request)
+    sources = [_position(p) for p in request.sources]
+    targets = [_position(p) for p in request.targets]
+    for start in sources:
+        _validate_endpoints(graph, start, targets[0])
+    for end in targets:
+        _validate_endpoints(graph, sources[0], end)
+
+    digest = await run_in_threadpool(graph.digest)
+    components, _ = await run_in_threadpool(_components, graph, digest)
+    target_cells = [graph.index(*end) for end in targets]
+    connected = [[components.connected(graph.index(*start), end) for end in target_cells]
+                 for start in sources]
+
+    future, slot = await _submit(graph, lambda handle: workers.submit_task(
+        _client(http_request), many_to_many_steps, handle,
+        (sources, targets, request.include_paths, connected),
+        SEARCH_TIME_LIMIT, SEARCH_EXPANSION_LIMIT,
+    ))
+    result = await _await_job(http_request, future, slot, "Distances")
+    if result is None:
+        return Response(status_code=499)
+    search_counter.inc(result["searches"], algorithm="Distances")
+    nodes_expanded_counter.inc(result["nodes_expanded"], algorithm="Distances")
+
+    response = {
+        "distances": result["distances"],
+        "stats": {
+            "searches": result["searches"],
+            "nodesExpanded": result["nodes_expanded"],
+            "time": result["time_taken"],
+        },
+    }
+    if request.include_paths:
+        response["paths"] = result["paths"]
+    if result.get("budget_exceeded"):
+        budget_exceeded_counter.inc(algorithm="Distances")
+        response["budgetExceeded"] = True
+    return response
+
+
+def _grid_info(grid_id: str, graph: GridGraph) -> Dict:
+    return {"gridId": grid_id, "digest": graph.digest(), "rows": graph.rows, "cols": graph.cols}
+
+
+@app.post("/grids", status_code=201)
+def upload_grid(request: GridUpload) -> Dict:
+    """Store a grid so later requests can refer to it by gridId.
+
+    /solve, /solve/stream and /solve/batch accept grid_id (plus optional
+    patches) in place of rows/cols/grid, which skips re-sending and
+    re-validating the whole grid. Stored grids are kept for GRID_STORE_TTL
+    seconds after upload, least recently used first out beyond
+    GRID_STORE_ENTRIES / GRID_STORE_BYTES.
+
+    Returns:
+        Dictionary containing gridId, digest (content hash), rows and cols
+
+    Raises:
+        HTTPException: 400 if the grid is invalid
+    """
+    graph = _build_graph(request.rows, request.cols, request.grid)
+    grid_id = uuid.uuid4().hex
+    grid_store.put(grid_id, graph, len(graph.blocked) + len(graph.cost or b""))
+    return _grid_info(grid_id, graph)
+
+
+@app.post("/grids/generate")
+def generate_grid(request: GenerateRequest) -> Dict:
+    """Build a seeded grid on the server and store it like an upload.
+
+    The grid id is derived from (generator, rows, cols, seed, density), so
+    asking for the same grid again returns the same id and, while it is
+    still in the grid store, skips building it. The grid can then be
+    solved by grid_id without ever being sent over the wire.
+
+    Returns:
+        Dictionary containing gridId, digest, rows, cols, generator, seed,
+        cached (whether the grid was already stored) and, with
+        request.include_grid, grid
+
+    Raises:
+        HTTPException: 400 if rows x cols exceeds MAX_GENERATED_CELLS
+    """
+    if request.rows * request.cols > MAX_GENERATED_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Generated grids are limited to {MAX_GENERATED_CELLS} cells"
+        )
+    options = {"density": request.density} if request.generator == "random" else {}
+    key = (request.generator, request.rows, request.cols, request.seed, sorted(options.items()))
+    grid_id = blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    graph = grid_store.get(grid_id)
+    cached = graph is not None
+    cells = None
+    if graph is None:
+        cells = generators.GENERATORS[request.generator](request.rows, request.cols, request.seed, **options)
+        graph = generators.to_graph(cells)
+        grid_store.put(grid_id, graph, len(graph.blocked))
+
+    response = _grid_info(grid_id, graph)
+    response.update(generator=request.generator, seed=request.seed, cached=cached)
+    if request.include_grid:
+        if cells is None:
+            cells = generators.from_graph(graph)
+        response["grid"] = cells.tolist()
+    return response
+
+
+@app.get("/grids/{grid_id}")
+def get_grid(grid_id: str) -> Dict:
+    """gridId, digest, rows and cols of a stored grid.
+
+    Raises:
+        HTTPException: 404 if the grid is unknown or expired
+    """
+    graph = grid_store.get(grid_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired grid_id")
+    return _grid_info(grid_id, graph)
+
+
+@app.delete("/grids/{grid_id}", status_code=204)
+def delete_grid(grid_id: str) -> Response:
+    """Remove a stored grid.
+
+    Raises:
+        HTTPException: 404 if the grid is unknown or expired
+    """
+    if not grid_store.discard(grid_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired grid_id")
+    return Response(status_code=204)
+
+
+@app.get("/metrics", response_class=Response, responses={200: {"content": {metrics.CONTENT_TYPE: {}}}})
+def metrics_endpoint() -> Response:
+    """Request, search and cache metrics in the Prometheus text format."""
+    return Response(content=registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+def cache_stats() -> Dict:
+    """Hit/miss/eviction counters and occupancy of the /solve result cache."""
+    return result_cache.stats()
+
+
+@app.post("/solve/batch")
+async def solve_graph_batch(request: BatchRequest, http_request: Request) -> Dict:
+    """Run several algorithms and/or (start, end) pairs on one grid.
+
+    The grid is uploaded and validated once. Every algorithm runs on every
+    pair; unreachable pairs (see _run_search) and cached results are
+    answered directly. The rest run on the worker process pool like /solve's
+    searches (see workers.submit): admitted under the client's address,
+    under the server's budgets, and cancelled if the client disconnects.
+    At most SEARCH_CLIENT_LIMIT of them are queued at a time, the next one
+    as each finishes, so a batch alone is never refused with a 429.
+
+    Returns:
+        Dictionary with results: one entry per (pair, algorithm), in request
+        order, each holding algorithm, start, end, and the /solve
+        response fields (stats, path, visited, budgetExceeded)
+
+    Raises:
+        HTTPException: 400 if the input is invalid or the batch is too large,
+            429/503 if a search is not admitted, 500 if an algorithm fails
+    """
+    graph = await run_in_threadpool(_request_graph, request)
+    if request.pairs:
+        pairs = [(_position(p.start), _position(p.end)) for p in request.pairs]
+    elif request.start is not None and request.end is not None:
+        pairs = [(_position(request.start), _position(request.end))]
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either pairs or both start and end"
+        )
+    if len(pairs) * len(request.algorithms) > MAX_BATCH_JOBS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds {MAX_BATCH_JOBS} algorithm/pair combinations"
+        )
+    for start, end in pairs:
+        _validate_endpoints(graph, start, end)
+
+    # Hashing and labelling are O(rows * cols), so keep them off the event loop
+    digest = await run_in_threadpool(graph.digest)
+    components, _ = await run_in_threadpool(_components, graph, digest)
+    jobs = []
+    for start, end in pairs:
+        for algorithm in request.algorithms:
+            vectorized = request.vectorized and algorithm in VECTORIZED_ALGORITHMS
+            jobs.append((algorithm, start, end, vectorized,
+                         (digest, start, end, algorithm, vectorized)))
+
+    queued = []
+    responses: Dict[tuple, Dict] = {}
+    for algorithm, start, end, vectorized, cache_key in jobs:
+        if cache_key in responses or cache_key in queued:
+            continue
+        if not components.connected(graph.index(*start), graph.index(*end)):
+            responses[cache_key] = _unreachable_response(algorithm, graph, components, start, False)
+            continue
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            responses[cache_key] = cached[0]
+            continue
+        queued.append(cache_key)
+
+    client = _client(http_request)
+    running: Dict[asyncio.Future, Tuple[tuple, int, concurrent.futures.Future]] = {}
+    try:
+        while queued or running:
+            while queued and len(running) < workers.client_limit():
+                cache_key = queued.pop(0)
+                _, start, end, algorithm, vectorized = cache_key
+                options = {"vectorized": True} if vectorized else {}
+                future, slot = await _submit(graph, lambda handle: workers.submit(
+                    client, algorithm_map[algorithm], stream_map[algorithm], handle, start, end,
+                    options, SEARCH_TIME_LIMIT, SEARCH_EXPANSION_LIMIT,
+                ))
+                running[asyncio.wrap_future(future)] = (cache_key, slot, future)
+            done, _ = await asyncio.wait(running, timeout=DISCONNECT_POLL,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done and await http_request.is_disconnected():
+                for cache_key, _, _ in running.values():
+                    cancelled_counter.inc(algorithm=cache_key[3])
+                return Response(status_code=499)
+            for search in done:
+                cache_key, _, _ = running.pop(search)
+                try:
+                    result = search.result()
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Algorithm execution failed: {str(e)}"
+                    )
+                response = _format_result(result)
+                _record_search(cache_key[3], result)
+                if result.get("budget_exceeded"):
+                    budget_exceeded_counter.inc(algorithm=cache_key[3])
+                    response["budgetExceeded"] = True
+                else:
+                    result_cache.put(cache_key, (response, result.get("profile", {})),
+                                     response_size(response))
+                responses[cache_key] = response
+    finally:
+        # Left over only when giving up early: stop the rest, queued or running
+        for search, (_, slot, future) in running.items():
+            workers.cancel(slot, future)
+            search.cancel()
+
+    return {
+        "results": [
+            {"algorithm": algorithm, "start": start, "end": end, **responses[cache_key]}
+            for algorithm, start, end, _, cache_key in jobs
+        ]
+    }
@@ -0,0 +1,163 @@
+"""Shared memory copies of grids for the search worker processes.
+
+Every search sent to the worker pool (workers.py) used to carry its grid
+pickled along with it, so a multi-million-cell grid was copied through a
+pipe and rebuilt in the worker for every search - often costing more than
+the search. SharedGridRegistry instead copies each large grid once into a
+shared memory segment (algorithms/shared.py) and hands out a SharedGraph
+of a few dozen bytes, which workers resolve to a zero-copy GridGraph (see
+workers.resolve). Grids below SHARED_GRID_MIN_CELLS are still pickled:
+for them a segment costs more than it saves.
+
+Segments are keyed by the grid's content hash, so every request for the
+same grid - inline or by grid_id, in any connectivity - shares one. A
+segment is pinned from acquire() until the matching release(), i.e. while
+a search may still attach to it; the registry is LRU-bounded by count and
+bytes and only unlinks unpinned segments to stay within them. discard()
+drops one grid's segment (the grid store calls it when a grid is evicted
+or deleted) and close() drops them all at shutdown. A pinned segment that
+is dropped is unlinked when its last pin is released.
+"""
+
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Dict, List, Union
+import threading
+
+from algorithms import GridGraph
+from algorithms.shared import SharedGraph, describe, share
+
+
+class _Segment:
+    __slots__ = ("memory", "spec", "pins")
+
+    def __init__(self, memory: shared_memory.SharedMemory, spec: SharedGraph):
+        self.memory = memory
+        self.spec = spec
+        self.pins = 0
+
+
+class SharedGridRegistry:
+    """Shared memory segments of grids, keyed by content hash.
+
+    Args:
+        max_entries: Maximum number of segments kept
+        max_bytes: Maximum total segment size
+        min_cells: Grids with fewer padded cells are not shared
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 1024 * 1024 * 1024, min_cells: int = 1 << 18):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_cells = min_cells
+        self._segments: "OrderedDict[str, _Segment]" = OrderedDict()
+        # Segments dropped while pinned, by name, until their last release()
+        self._dropped: Dict[str, _Segment] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.shares = 0
+        self.reuses = 0
+        self.unlinks = 0
+
+    def acquire(self, graph: GridGraph) -> Union[GridGraph, SharedGraph]:
+        """A handle on graph to send to a worker, pinned until release().
+
+        Returns:
+            A SharedGraph describing graph's segment (made on first use), or
+            graph itself if it is too small to be worth sharing
+        """
+        if graph.size < self.min_cells:
+            return graph
+        digest = graph.digest()
+        with self._lock:
+            segment = self._segments.get(digest)
+            if segment is not None:
+                self._segments.move_to_end(digest)
+                self.reuses += 1
+            else:
+                memory, spec = share(graph)
+                segment = _Segment(memory, spec)
+                self._segments[digest] = segment
+                self._bytes += memory.size
+                self.shares += 1
+            segment.pins += 1
+            self._trim()
+            return describe(segment.spec, graph)
+
+    def release(self, handle: Union[GridGraph, SharedGraph]) -> None:
+        """Unpin a handle from acquire() once the work using it is done."""
+        if not isinstance(handle, SharedGraph):
+            return
+        with self._lock:
+            segment = self._segments.get(handle.digest)
+            if segment is None or segment.spec.name != handle.name:
+                segment = self._dropped.get(handle.name)
+            if segment is None:
+                return
+            segment.pins -= 1
+            if segment.pins:
+                return
+            if self._dropped.pop(handle.name, None) is not None:
+                self._unlink(segment)
+            else:
+                self._trim()
+
+    def discard(self, digest: str) -> bool:
+        """Drop the segment of the grid with this digest, if there is one."""
+        with self._lock:
+            segment = self._segments.pop(digest, None)
+            if segment is None:
+                return False
+            self._bytes -= segment.memory.size
+            self._drop(segment)
+            return True
+
+    def close(self) -> None:
+        """Drop every segment, pinned or not - for shutdown, once the
+        workers are gone."""
+        with self._lock:
+            segments: List[_Segment] = list(self._segments.values()) + list(self._dropped.values())
+            self._segments.clear()
+            self._dropped.clear()
+            self._bytes = 0
+            for segment in segments:
+                self._unlink(segment)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters and current occupancy."""
+        with self._lock:
+            return {
+                "shares": self.shares,
+                "reuses": self.reuses,
+                "unlinks": self.unlinks,
+                "entries": len(self._segments),
+                "bytes": self._bytes,
+                "pinned": sum(1 for s in self._segments.values() if s.pins) + len(self._dropped),
+            }
+
+    def _trim(self) -> None:
+        """Unlink least-recently-used unpinned segments until within the
+        bounds; the caller holds the lock."""
+        for digest in list(self._segments):
+            if len(self._segments) <= self.max_entries and self._bytes <= self.max_bytes:
+                return
+            segment = self._segments[digest]
+            if not segment.pins:
+                del self._segments[digest]
+                self._bytes -= segment.memory.size
+                self._unlink(segment)
+
+    def _drop(self, segment: _Segment) -> None:
+        """Unlink a segment taken out of _segments now, or once unpinned."""
+        if segment.pins:
+            self._dropped[segment.spec.name] = segment
+        else:
+            self._unlink(segment)
+
+    def _unlink(self, segment: _Segment) -> None:
+        segment.memory.close()
+        try:
+            segment.memory.unlink()
+        except FileNotFoundError:
+            pass
+        self.unlinks += 1
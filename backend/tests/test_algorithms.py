@@ -1,8 +1,8 @@
-"""Tests for the five pathfinding algorithms in backend/algorithms/.
+"""Tests for the pathfinding algorithms in backend/algorithms/.
 
-All five expose the same signature:
+All of them expose the same signature:
     (grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> dict
-returning {found, time_taken, nodes_expanded, path, visited}.
+returning {found, time_taken, nodes_expanded, path, visited, profile}.
 
 `time_taken` is never asserted on (it's a wall-clock measurement) and
 `nodes_expanded` is never compared *across* algorithms (each counts
@@ -11,10 +11,17 @@ from two frontiers). We only assert nodes_expanded > 0 when a path is found.
 """
 
 from typing import Callable, Dict, List, Tuple
+import heapq
+import math
+import random
+import time
 
+import numpy as np
 import pytest
 
-from algorithms import a_star, bfs, bi_bfs, dfs, dijkstra
+import generators
+from algorithms import GridGraph, a_star, alt, bfs, bi_bfs, bidirectional, dfs, dijkstra, hpa_star, jps
+from algorithms.grid import STRAIGHT
 
 ALGORITHMS: Dict[str, Callable] = {
     "bfs": bfs.bfs,
@@ -22,11 +29,20 @@ ALGORITHMS: Dict[str, Callable] = {
     "dijkstra": dijkstra.dijkstra,
     "a_star": a_star.a_star,
     "bi_bfs": bi_bfs.bidirectional_bfs,
+    "jps": jps.jps,
+    "hpa_star": hpa_star.hpa_star,
+    "bi_dijkstra": bidirectional.bidirectional_dijkstra,
+    "bi_a_star": bidirectional.bidirectional_a_star,
+    "alt": alt.alt,
 }
 
-# bfs, dijkstra, a_star, bi_bfs all guarantee shortest path on a uniform-cost
-# grid; dfs explicitly does not.
-SHORTEST_PATH_ALGORITHMS = {"bfs", "dijkstra", "a_star", "bi_bfs"}
+# bfs, dijkstra, a_star, bi_bfs, jps, bi_dijkstra, bi_a_star, alt all guarantee
+# shortest path on a uniform-cost grid; dfs and hpa_star (near-optimal) do not.
+SHORTEST_PATH_ALGORITHMS = {"bfs", "dijkstra", "a_star", "bi_bfs", "jps", "bi_dijkstra", "bi_a_star", "alt"}
+
+# The searches that pick the cheapest path over terrain costs
+WEIGHTED_ALGORITHMS = [dijkstra.dijkstra, a_star.a_star,
+                       bidirectional.bidirectional_dijkstra, bidirectional.bidirectional_a_star, alt.alt]
 
 
 def assert_contiguous_valid_path(
@@ -41,7 +57,7 @@ def assert_contiguous_valid_path(
     assert path[-1] == end
     for (r1, c1), (r2, c2) in zip(path, path[1:]):
         assert abs(r1 - r2) + abs(c1 - c2) == 1, f"non-adjacent step {(r1, c1)} -> {(r2, c2)}"
-        assert grid[r2][c2] == 0, f"path crosses wall at {(r2, c2)}"
+        assert grid[r2][c2] != 1, f"path crosses wall at {(r2, c2)}"
 
 
 @pytest.mark.parametrize("name", ALGORITHMS)
@@ -166,3 +182,357 @@ def test_dfs_finds_a_valid_but_not_necessarily_shortest_path():
 
     assert result["found"] is True
     assert_contiguous_valid_path(result["path"], grid, start, end)
+
+
+VECTORIZED = {
+    "bfs": bfs.bfs,
+    "bi_bfs": bi_bfs.bidirectional_bfs,
+}
+
+
+@pytest.mark.parametrize("name", VECTORIZED)
+def test_vectorized_mode_matches_scalar_path_length(name):
+    """The NumPy level-synchronous mode visits cells in a different order
+    (level by level) but must return a path of the same, shortest length."""
+    grid = [
+        [0, 1, 0, 0, 0],
+        [0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0],
+        [0, 0, 0, 1, 0],
+    ]
+    start, end = (0, 0), (3, 4)
+    fn = VECTORIZED[name]
+    scalar = fn(grid, start, end)
+    result = fn(grid, start, end, vectorized=True)
+
+    assert result["found"] is True
+    assert result["visited"][0] == start
+    assert len(result["path"]) == len(scalar["path"]) == 14
+    assert_contiguous_valid_path(result["path"], grid, start, end)
+
+
+@pytest.mark.parametrize("name", VECTORIZED)
+def test_vectorized_mode_unreachable_end(name):
+    grid = [
+        [0, 0, 0],
+        [1, 1, 1],
+        [0, 0, 0],
+    ]
+    result = VECTORIZED[name](grid, (0, 0), (2, 2), vectorized=True)
+
+    assert result["found"] is False
+    assert result["path"] == []
+
+
+@pytest.mark.parametrize("name", ALGORITHMS)
+def test_unrecorded_run_keeps_stats_and_path(name):
+    grid = [
+        [0, 1, 0, 0, 0],
+        [0, 1, 0, 1, 0],
+        [0, 1, 0, 1, 0],
+        [0, 0, 0, 1, 0],
+    ]
+    fn = ALGORITHMS[name]
+    recorded = fn(grid, (0, 0), (3, 4))
+    result = fn(grid, (0, 0), (3, 4), record=False)
+
+    assert result["visited"] == []
+    assert result["path"] == recorded["path"]
+    assert result["nodes_expanded"] == recorded["nodes_expanded"]
+
+
+@pytest.mark.parametrize("name", VECTORIZED)
+def test_unrecorded_vectorized_run_keeps_stats_and_path(name):
+    grid = [[0] * 6 for _ in range(6)]
+    recorded = VECTORIZED[name](grid, (0, 0), (5, 5), vectorized=True)
+    result = VECTORIZED[name](grid, (0, 0), (5, 5), vectorized=True, record=False)
+
+    assert result["visited"] == []
+    assert result["path"] == recorded["path"]
+    assert result["nodes_expanded"] == recorded["nodes_expanded"]
+
+
+@pytest.mark.parametrize("name", ALGORITHMS)
+def test_profile_reports_phase_timings_and_peak_frontier(name):
+    grid = [
+        [0, 0, 0],
+        [1, 1, 0],
+        [0, 0, 0],
+    ]
+    profile = ALGORITHMS[name](grid, (0, 0), (2, 0))["profile"]
+
+    for key in ("grid_ns", "search_ns", "path_ns"):
+        assert isinstance(profile[key], int) and profile[key] >= 0
+    assert profile["peak_frontier"] >= 1
+
+
+@pytest.mark.parametrize("fn", WEIGHTED_ALGORITHMS)
+def test_priority_queue_counters(fn):
+    """Every push is either expanded or popped stale, except those still
+    queued when the goal is reached."""
+    grid = [[0] * 4 for _ in range(4)]
+    result = fn(grid, (0, 0), (3, 3))
+    profile = result["profile"]
+
+    assert profile["queue_pushes"] >= result["nodes_expanded"] + profile["stale_pops"]
+    assert profile["peak_frontier"] <= profile["queue_pushes"]
+
+
+WEIGHTED_GRID = [
+    [0, 9, 0],
+    [0, 9, 0],
+    [0, 0, 0],
+]
+
+
+@pytest.mark.parametrize("fn", WEIGHTED_ALGORITHMS)
+def test_weighted_terrain_is_routed_around(fn):
+    """Crossing the 9-cost column costs 11; the detour through row 2 costs 6."""
+    result = fn(WEIGHTED_GRID, (0, 0), (0, 2))
+
+    assert result["found"] is True
+    assert result["path_cost"] == 6
+    assert len(result["path"]) == 7
+    assert_contiguous_valid_path(result["path"], WEIGHTED_GRID, (0, 0), (0, 2))
+
+
+def test_unweighted_algorithms_ignore_terrain_cost():
+    result = bfs.bfs(WEIGHTED_GRID, (0, 0), (0, 2))
+
+    assert len(result["path"]) == 3
+    assert result["path_cost"] == 10
+
+
+@pytest.mark.parametrize("name", sorted(SHORTEST_PATH_ALGORITHMS))
+def test_eight_connected_paths_cut_diagonally(name):
+    grid = [[0] * 10 for _ in range(10)]
+    graph = GridGraph.from_rows(grid).with_connectivity(8)
+    result = ALGORITHMS[name](graph, (0, 0), (9, 9))
+
+    assert result["path"] == [(i, i) for i in range(10)]
+    assert result["path_cost"] == pytest.approx(9 * math.sqrt(2), abs=1e-4)
+
+
+@pytest.mark.parametrize("name", sorted(set(ALGORITHMS) - {"hpa_star"}))
+@pytest.mark.parametrize("corner_cutting, path_length", [("never", 3), ("single", 2), ("always", 2)])
+def test_corner_cutting_past_one_wall(name, corner_cutting, path_length):
+    graph = GridGraph.from_rows([[0, 1], [0, 0]]).with_connectivity(8, corner_cutting)
+    result = ALGORITHMS[name](graph, (0, 0), (1, 1))
+
+    assert result["found"] is True
+    assert len(result["path"]) == path_length
+
+
+@pytest.mark.parametrize("name", sorted(set(ALGORITHMS) - {"hpa_star"}))
+@pytest.mark.parametrize("corner_cutting", ["never", "single", "always"])
+def test_corner_cutting_between_two_walls(name, corner_cutting):
+    graph = GridGraph.from_rows([[0, 1], [1, 0]]).with_connectivity(8, corner_cutting)
+    result = ALGORITHMS[name](graph, (0, 0), (1, 1))
+
+    assert result["found"] is (corner_cutting == "always")
+
+
+def octile_reference_cost(grid: List[List[int]], start: Tuple[int, int], end: Tuple[int, int]) -> float:
+    """Cheapest 8-connected cost with exact sqrt(2) diagonals, never cutting
+    past two walls (corner_cutting "single"), by a plain float Dijkstra."""
+    rows, cols = len(grid), len(grid[0])
+    best = {start: 0.0}
+    queue = [(0.0, start)]
+    while queue:
+        dist, (r, c) = heapq.heappop(queue)
+        if (r, c) == end:
+            return dist
+        if dist > best[(r, c)]:
+            continue
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                nr, nc = r + dr, c + dc
+                if (dr, dc) == (0, 0) or not (0 <= nr < rows and 0 <= nc < cols) or grid[nr][nc] == 1:
+                    continue
+                if dr and dc and grid[r][nc] == 1 and grid[nr][c] == 1:
+                    continue
+                step = max(grid[nr][nc], 1) * (math.sqrt(2) if dr and dc else 1)
+                if dist + step < best.get((nr, nc), math.inf):
+                    best[(nr, nc)] = dist + step
+                    heapq.heappush(queue, (dist + step, (nr, nc)))
+    return math.inf
+
+
+@pytest.mark.parametrize("fn", WEIGHTED_ALGORITHMS)
+def test_eight_connected_weighted_paths_are_cheapest(fn):
+    rng = random.Random(4)
+    for _ in range(20):
+        grid = [[rng.choice([0, 0, 0, 1, 3, 9]) for _ in range(12)] for _ in range(12)]
+        grid[0][0] = grid[11][11] = 0
+        graph = GridGraph.from_rows(grid).with_connectivity(8, "single")
+        result = fn(graph, (0, 0), (11, 11))
+
+        expected = octile_reference_cost(grid, (0, 0), (11, 11))
+        assert result["found"] is (expected < math.inf)
+        if result["found"]:
+            assert result["path_cost"] == pytest.approx(expected, rel=1e-4)
+
+
+@pytest.mark.parametrize("fn", WEIGHTED_ALGORITHMS)
+def test_eight_connected_weighted_corridor_jumps_empty_buckets(fn):
+    """Terrain 255 with diagonals makes a step cost up to 255 * DIAGONAL, so
+    the bucket ring is tens of thousands long while a corridor keeps a
+    single cell queued. Walking the empty buckets between one step and the
+    next took minutes here; jumping to the next queued distance does not."""
+    size = 121
+    grid = [[255] * size for _ in range(size)]
+    for r in range(1, size, 2):
+        grid[r] = [1] * size
+        grid[r][size - 1 if r % 4 == 1 else 0] = 255
+    end = (size - 1, size - 1)
+    graph = GridGraph.from_rows(grid).with_connectivity(8, "single")
+    began = time.perf_counter()
+    result = fn(graph, (0, 0), end)
+    elapsed = time.perf_counter() - began
+
+    assert result["found"] is True
+    assert result["path_cost"] == pytest.approx(octile_reference_cost(grid, (0, 0), end), rel=1e-4)
+    assert elapsed < 5
+
+
+@pytest.mark.parametrize("fn", WEIGHTED_ALGORITHMS)
+def test_costs_past_32_bits(fn):
+    """A row of cost-255 cells just long enough that the scaled cost of
+    crossing it no longer fits in 32 bits."""
+    cols = (2 ** 31) // (255 * STRAIGHT) + 2
+    graph = GridGraph.from_rows([[255] * cols]).with_connectivity(8)
+    result = fn(graph, (0, 0), (0, cols - 1))
+
+    assert (cols - 1) * 255 * STRAIGHT > 2 ** 31 - 1
+    assert result["found"] is True
+    assert result["path_cost"] == (cols - 1) * 255
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_eight_connected_bidirectional_bfs_is_shortest(vectorized):
+    rng = random.Random(9)
+    for _ in range(50):
+        grid = [[1 if rng.random() < 0.3 else 0 for _ in range(9)] for _ in range(9)]
+        grid[0][0] = grid[8][8] = 0
+        graph = GridGraph.from_rows(grid).with_connectivity(8, "always")
+        expected = bfs.bfs(graph, (0, 0), (8, 8))
+        result = bi_bfs.bidirectional_bfs(graph, (0, 0), (8, 8), vectorized=vectorized)
+
+        assert result["found"] is expected["found"]
+        assert len(result["path"]) == len(expected["path"])
+
+
+@pytest.mark.parametrize("fn", [bidirectional.bidirectional_dijkstra, bidirectional.bidirectional_a_star])
+def test_bidirectional_weighted_paths_match_dijkstra(fn):
+    """Random terrain catches a search that stops as soon as the two sides
+    first touch, which is not cheapest once steps cost different amounts."""
+    rng = random.Random(12)
+    for _ in range(100):
+        grid = [[rng.choice([0, 0, 0, 1, 2, 5, 9]) for _ in range(10)] for _ in range(10)]
+        start = (rng.randrange(10), rng.randrange(10))
+        end = (rng.randrange(10), rng.randrange(10))
+        grid[start[0]][start[1]] = 0
+        expected = dijkstra.dijkstra(grid, start, end)
+        result = fn(grid, start, end)
+
+        assert result["found"] is expected["found"]
+        if expected["found"]:
+            assert result["path_cost"] == expected["path_cost"]
+            assert_contiguous_valid_path(result["path"], grid, start, end)
+
+
+def test_bidirectional_dijkstra_expands_fewer_nodes_than_dijkstra():
+    """Two floods of radius d/2 cover about half the cells of one of radius d."""
+    grid = [[0] * 60 for _ in range(60)]
+    one_way = dijkstra.dijkstra(grid, (30, 0), (30, 59))
+    result = bidirectional.bidirectional_dijkstra(grid, (30, 0), (30, 59))
+
+    assert result["path_cost"] == one_way["path_cost"]
+    assert result["nodes_expanded"] < 0.75 * one_way["nodes_expanded"]
+
+
+def test_hpa_star_rejects_diagonal_movement():
+    graph = GridGraph.from_rows([[0, 0], [0, 0]]).with_connectivity(8)
+    with pytest.raises(ValueError):
+        hpa_star.hpa_star(graph, (0, 0), (1, 1))
+
+
+def test_jps_expands_far_fewer_nodes_on_an_open_grid():
+    grid = [[0] * 30 for _ in range(30)]
+    result = jps.jps(grid, (0, 0), (29, 29))
+
+    assert len(result["path"]) == 59
+    assert_contiguous_valid_path(result["path"], grid, (0, 0), (29, 29))
+    assert result["nodes_expanded"] < 10
+
+
+def test_jps_falls_back_to_a_star_on_weighted_terrain():
+    result = jps.jps(WEIGHTED_GRID, (0, 0), (0, 2))
+    assert result["path_cost"] == 6
+
+
+def test_hpa_star_paths_are_valid_and_near_shortest():
+    rng = random.Random(5)
+    for _ in range(40):
+        grid = [[1 if rng.random() < 0.3 else rng.choice([0, 0, 3]) for _ in range(17)] for _ in range(13)]
+        start, end = (rng.randrange(13), rng.randrange(17)), (rng.randrange(13), rng.randrange(17))
+        grid[start[0]][start[1]] = grid[end[0]][end[1]] = 0
+        result = hpa_star.hpa_star(grid, start, end, cluster_size=4)
+        exact = dijkstra.dijkstra(grid, start, end)
+
+        assert result["found"] == exact["found"]
+        if result["found"]:
+            assert_contiguous_valid_path(result["path"], grid, start, end)
+            assert exact["path_cost"] <= result["path_cost"] <= 2 * exact["path_cost"]
+
+
+def test_hpa_star_reuses_the_abstraction_of_a_grid():
+    grid = [[0] * 40 for _ in range(40)]
+    grid[20][5:35] = [1] * 30
+    first = hpa_star.hpa_star(grid, (0, 0), (39, 39), cluster_size=8)
+    second = hpa_star.hpa_star(grid, (39, 0), (0, 39), cluster_size=8)
+
+    assert first["profile"]["abstraction_ns"] > 0
+    assert second["profile"]["abstraction_ns"] == 0
+    assert first["path_cost"] == second["path_cost"] == 78
+
+
+def test_alt_expands_far_fewer_nodes_than_a_star_on_a_maze():
+    graph = generators.to_graph(generators.backtracker(61, 61, seed=4))
+    expected = a_star.a_star(graph, (0, 60), (60, 0))
+    result = alt.alt(graph, (0, 60), (60, 0))
+
+    assert result["path_cost"] == expected["path_cost"]
+    assert result["nodes_expanded"] * 2 < expected["nodes_expanded"]
+
+
+def test_alt_reuses_landmarks_per_grid():
+    alt._cache.clear()
+    grid = [[1 if c == 5 and r < 8 else 0 for c in range(10)] for r in range(10)]
+    first = alt.alt(grid, (0, 0), (0, 9), landmarks=3)
+    again = alt.alt(grid, (9, 9), (0, 0), landmarks=3)
+
+    assert first["profile"]["landmarks_ns"] > 0
+    assert again["profile"]["landmarks_ns"] == 0
+    assert first["profile"]["landmarks"] == again["profile"]["landmarks"] == 3
+    index, cached = alt.landmark_index(GridGraph.from_rows(grid), 3)
+    assert cached and index.forward.dtype == np.uint16 and index.backward is index.forward
+    # A different movement rule gets landmarks of its own
+    assert alt.landmark_index(GridGraph.from_rows(grid).with_connectivity(8), 3)[1] is False
+
+
+def test_alt_landmark_cache_is_bounded_by_bytes(monkeypatch):
+    alt._cache.clear()
+    grid = GridGraph.from_rows([[0] * 10 for _ in range(10)])
+    index, _ = alt.landmark_index(grid, 3)
+    monkeypatch.setattr(alt, "_CACHE_BYTES", 2 * index.nbytes)
+
+    for count in (1, 2, 3):
+        alt.landmark_index(grid, count)
+
+    assert sum(i.nbytes for i in alt._cache.values()) <= 2 * index.nbytes
+    assert alt.landmark_index(grid, 3)[1] is True  # most recent is kept
+    monkeypatch.setattr(alt, "_CACHE_BYTES", index.nbytes - 1)
+    alt._cache.clear()
+    alt.landmark_index(grid, 3)
+    assert not alt._cache  # too large to keep at all
@@ -1,7 +1,10 @@
 """Smoke test for the POST /solve endpoint (backend/main.py)."""
 
+import json
+
 from fastapi.testclient import TestClient
 
+from algorithms import native
 from main import app
 
 client = TestClient(app)
@@ -45,3 +48,195 @@ def test_solve_rejects_mismatched_grid_dimensions():
 
     assert response.status_code == 400
     assert "dimensions" in response.json()["detail"].lower()
+
+
+def test_solve_rejects_vectorized_mode_for_unsupported_algorithm():
+    payload = {
+        "algorithm": "DFS",
+        "rows": 2,
+        "cols": 2,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 1, "col": 1},
+        "grid": [[0, 0], [0, 0]],
+        "vectorized": True,
+    }
+    response = client.post("/solve", json=payload)
+
+    assert response.status_code == 400
+    assert "vectorized" in response.json()["detail"].lower()
+
+
+def test_solve_stream_matches_solve():
+    """Streamed visited batches concatenate to the /solve visit order, and
+    the final line carries the same stats and path."""
+    payload = {
+        "algorithm": "A*",
+        "rows": 4,
+        "cols": 4,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 3, "col": 3},
+        "grid": [
+            [0, 0, 0, 0],
+            [1, 1, 0, 1],
+            [0, 0, 0, 0],
+            [0, 1, 1, 0],
+        ],
+    }
+    expected = client.post("/solve", json=payload).json()
+    response = client.post("/solve/stream?batch_size=2", json=payload)
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    *batches, final = lines
+    assert all(len(batch["visited"]) <= 2 for batch in batches)
+    assert [cell for batch in batches for cell in batch["visited"]] == expected["visited"]
+    assert final["path"] == expected["path"]
+    assert final["stats"]["pathLength"] == expected["stats"]["pathLength"]
+    assert "visited" not in final
+
+
+def test_solve_batch_runs_every_algorithm_on_every_pair():
+    grid = [
+        [0, 1, 0],
+        [0, 1, 0],
+        [0, 0, 0],
+    ]
+    payload = {
+        "algorithms": ["BFS", "A*", "Bidirectional BFS"],
+        "rows": 3,
+        "cols": 3,
+        "grid": grid,
+        "pairs": [
+            {"start": {"row": 0, "col": 0}, "end": {"row": 0, "col": 2}},
+            {"start": {"row": 2, "col": 0}, "end": {"row": 2, "col": 2}},
+        ],
+    }
+    response = client.post("/solve/batch", json=payload)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["algorithm"], r["start"], r["end"]) for r in results] == [
+        (algorithm, start, end)
+        for start, end in [([0, 0], [0, 2]), ([2, 0], [2, 2])]
+        for algorithm in payload["algorithms"]
+    ]
+    assert [r["stats"]["pathLength"] for r in results] == [7, 7, 7, 3, 3, 3]
+
+
+def test_solve_batch_requires_endpoints():
+    payload = {
+        "algorithms": ["BFS"],
+        "rows": 1,
+        "cols": 2,
+        "grid": [[0, 0]],
+    }
+    response = client.post("/solve/batch", json=payload)
+
+    assert response.status_code == 400
+
+
+def test_solve_profile_block_is_opt_in():
+    payload = {
+        "algorithm": "A*",
+        "rows": 2,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 1, "col": 2},
+        "grid": [[0, 0, 0], [0, 1, 0]],
+    }
+    assert "profile" not in client.post("/solve", json=payload).json()
+
+    payload["profile"] = payload["profile_memory"] = True
+    body = client.post("/solve", json=payload).json()
+    profile = body["profile"]
+
+    assert body["stats"]["pathLength"] == 4
+    for key in ("parseNs", "gridNs", "searchNs", "pathNs", "serializeNs"):
+        assert profile[key] >= 0
+    assert profile["cached"] is False
+    assert profile["kernel"] == ("native" if native.available() else "python")
+    assert profile["queuePushes"] >= body["stats"]["nodesExpanded"]
+    assert profile["peakMemoryBytes"] > 0
+
+
+def test_solve_alt_reports_landmark_preprocessing():
+    grid = [[1 if c == 3 and r < 5 else 0 for c in range(7)] for r in range(6)]
+    payload = {
+        "algorithm": "ALT",
+        "rows": 6,
+        "cols": 7,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 0, "col": 6},
+        "grid": grid,
+        "profile": True,
+    }
+    body = client.post("/solve", json=payload).json()
+
+    assert body["stats"]["pathLength"] == 17
+    assert body["profile"]["landmarks"] > 0
+    assert body["profile"]["landmarksNs"] >= 0
+
+
+def test_solve_reports_path_cost_on_weighted_terrain():
+    payload = {
+        "algorithm": "Dijkstra",
+        "rows": 2,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 0, "col": 2},
+        "grid": [[0, 5, 0], [0, 0, 0]],
+    }
+    stats = client.post("/solve", json=payload).json()["stats"]
+    assert stats["pathCost"] == 4
+    assert stats["pathLength"] == 5
+
+    payload["grid"][1][1] = 300
+    response = client.post("/solve", json=payload)
+    assert response.status_code == 400
+
+
+def test_solve_stats_only_matches_full_stats():
+    payload = {
+        "algorithm": "A*",
+        "rows": 3,
+        "cols": 4,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 2, "col": 3},
+        "grid": [
+            [0, 1, 0, 0],
+            [0, 1, 0, 1],
+            [0, 0, 0, 0],
+        ],
+    }
+    full = client.post("/solve", json=payload).json()
+    body = client.post("/solve", json={**payload, "stats_only": True}).json()
+
+    assert body["path"] == [] and body["visited"] == []
+    for key in ("solved", "nodesExpanded", "pathLength", "pathCost"):
+        assert body["stats"][key] == full["stats"][key]
+
+
+def test_solve_eight_connected():
+    payload = {
+        "algorithm": "A*",
+        "rows": 3,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 2, "col": 2},
+        "grid": [
+            [0, 0, 0],
+            [0, 0, 0],
+            [0, 0, 0],
+        ],
+        "connectivity": 8,
+    }
+    body = client.post("/solve", json=payload).json()
+    assert body["path"] == [[0, 0], [1, 1], [2, 2]]
+    assert body["stats"]["pathCost"] == 2.8284
+
+    # Answered separately from the 4-connected search of the same grid
+    body = client.post("/solve", json={**payload, "connectivity": 4}).json()
+    assert body["stats"]["pathLength"] == 5
+
+    response = client.post("/solve", json={**payload, "algorithm": "HPA*"})
+    assert response.status_code == 400
@@ -0,0 +1,59 @@
+"""Tests for the benchmark generators and harness (backend/benchmarks/)."""
+
+import pytest
+
+from algorithms import bfs
+from benchmarks import run
+from benchmarks.grids import GENERATORS, make_scenario
+
+
+@pytest.mark.parametrize("name", GENERATORS)
+def test_generators_are_deterministic_per_seed(name):
+    assert make_scenario(name, 21, seed=7).grid == make_scenario(name, 21, seed=7).grid
+
+
+@pytest.mark.parametrize("name", ["open", "maze", "rooms", "spiral"])
+@pytest.mark.parametrize("size", [10, 11])
+def test_solvable_scenarios_are_solvable(name, size):
+    scenario = make_scenario(name, size, seed=3)
+    assert bfs.bfs(scenario.grid, scenario.start, scenario.end)["found"] is True
+
+
+def test_unreachable_scenario_is_unreachable():
+    scenario = make_scenario("unreachable", 20, seed=3)
+    assert bfs.bfs(scenario.grid, scenario.start, scenario.end)["found"] is False
+
+
+def test_percentile_is_nearest_rank():
+    samples = list(range(1, 101))
+    assert run.percentile(samples, 50) == 50
+    assert run.percentile(samples, 99) == 99
+    assert run.percentile([3.0], 99) == 3.0
+
+
+def test_report_round_trips_through_compare():
+    report = run.run([10], ["open"], ["BFS"], repeat=2, trace_memory=True)
+    (case,) = report["results"]
+    assert case["nodes_expanded"] > 0
+    assert case["peak_kib"] > 0
+    assert run.compare(report, report, tolerance=0.25) == []
+
+    slower = {"results": [dict(case, p50_ms=case["p50_ms"] * 2)]}
+    (regression,) = run.compare(slower, report, tolerance=0.25)
+    assert regression["change"] == pytest.approx(1.0)
+
+
+def test_stats_only_adds_an_unrecorded_case():
+    report = run.run([10], ["open"], ["BFS"], repeat=1, trace_memory=False, stats_only=True)
+    full, stats = report["results"]
+    assert (full["target"], stats["target"]) == ("BFS", "BFS stats")
+    assert stats["path_length"] == full["path_length"]
+
+
+def test_precomputing_algorithms_report_their_build_time():
+    report = run.run([20], ["maze"], ["HPA*", "ALT", "BFS"], repeat=1, trace_memory=False)
+    hpa, landmarks, plain = report["results"]
+    assert (hpa["target"], landmarks["target"]) == ("HPA*", "ALT")
+    assert hpa["build_ms"] > 0 and landmarks["build_ms"] > 0
+    assert plain["build_ms"] is None
+    assert hpa["path_length"] == plain["path_length"]
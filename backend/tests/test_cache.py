@@ -0,0 +1,109 @@
+"""Tests for the /solve result cache (backend/cache.py)."""
+
+from fastapi.testclient import TestClient
+
+import main
+from cache import LRUCache
+
+client = TestClient(main.app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_byte_bound_evicts_and_skips_oversized_values():
+    cache = LRUCache(max_bytes=100)
+    cache.put("a", 1, size=60)
+    cache.put("b", 2, size=60)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.put("huge", 3, size=101)
+    assert cache.get("huge") is None
+    assert cache.get("b") == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_repeat_solve_is_served_without_running_the_algorithm():
+    main.result_cache.clear()
+    searches = main.search_counter.value(algorithm="DFS")
+    payload = {
+        "algorithm": "DFS",
+        "rows": 2,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 1, "col": 2},
+        "grid": [[0, 0, 0], [0, 1, 0]],
+    }
+    before = client.get("/cache/stats").json()
+    first = client.post("/solve", json=payload).json()
+    second = client.post("/solve", json=payload).json()
+    after = client.get("/cache/stats").json()
+
+    assert first == second
+    assert main.search_counter.value(algorithm="DFS") - searches == 1
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+    # A different end cell is a different key
+    payload["end"] = {"row": 0, "col": 2}
+    client.post("/solve", json=payload)
+    assert main.search_counter.value(algorithm="DFS") - searches == 2
+
+
+def test_discard_removes_an_entry():
+    cache = LRUCache()
+    cache.put("a", 1, size=10)
+    assert cache.discard("a") is True
+    assert cache.discard("a") is False
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_on_evict_sees_evicted_and_discarded_entries_but_not_replacements():
+    dropped = []
+    cache = LRUCache(max_entries=2, on_evict=lambda key, value: dropped.append((key, value)))
+    cache.put("a", 1)
+    cache.put("a", 2)
+    cache.put("b", 3)
+    cache.put("c", 4)
+    cache.discard("b")
+    assert dropped == [("a", 2), ("b", 3)]
+
+
+def test_clear_hands_every_entry_to_on_evict():
+    dropped = []
+    cache = LRUCache(on_evict=lambda key, value: dropped.append((key, value)))
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=20)
+    cache.clear()
+    assert dropped == [("a", 1), ("b", 2)]
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
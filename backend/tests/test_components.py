@@ -0,0 +1,111 @@
+"""Tests for connected-component labelling (backend/algorithms/components.py)
+and the unreachable short cut in POST /solve."""
+
+import random
+
+from fastapi.testclient import TestClient
+
+import main
+from algorithms import GridGraph, bfs
+from algorithms.components import ComponentIndex
+
+client = TestClient(main.app)
+
+
+def test_components_follow_walls():
+    grid = [
+        [0, 0, 1, 0],
+        [1, 0, 1, 0],
+        [0, 1, 1, 0],
+        [0, 0, 1, 1],
+    ]
+    graph = GridGraph.from_rows(grid)
+    components = ComponentIndex.build(graph)
+
+    assert components.count == 3
+    assert components.connected(graph.index(0, 0), graph.index(1, 1))
+    assert components.connected(graph.index(0, 3), graph.index(2, 3))
+    assert not components.connected(graph.index(0, 0), graph.index(3, 0))
+    assert not components.connected(graph.index(0, 0), graph.index(0, 2))  # a wall
+    assert sorted(graph.cells(components.region(graph.index(2, 0)))) == [(2, 0), (3, 0), (3, 1)]
+
+
+def test_components_agree_with_bfs_on_random_grids():
+    rng = random.Random(0)
+    for _ in range(200):
+        rows, cols = rng.randint(1, 8), rng.randint(1, 8)
+        grid = [[1 if rng.random() < 0.4 else 0 for _ in range(cols)] for _ in range(rows)]
+        start = (rng.randrange(rows), rng.randrange(cols))
+        end = (rng.randrange(rows), rng.randrange(cols))
+        grid[start[0]][start[1]] = grid[end[0]][end[1]] = 0
+        graph = GridGraph.from_rows(grid)
+
+        connected = ComponentIndex.build(graph).connected(graph.index(*start), graph.index(*end))
+        assert connected == bfs.bfs(grid, start, end)["found"]
+
+        for corner_cutting in ("never", "always"):
+            moving = graph.with_connectivity(8, corner_cutting)
+            connected = ComponentIndex.build(moving).connected(moving.index(*start), moving.index(*end))
+            assert connected == bfs.bfs(moving, start, end)["found"]
+
+
+
+def _same_partition(a: ComponentIndex, b: ComponentIndex) -> bool:
+    """Whether a and b label the same cells as the same components (ids may differ)."""
+    if a.count != b.count or ((a.labels < 0) != (b.labels < 0)).any():
+        return False
+    pairs = {(x, y) for x, y in zip(a.labels.tolist(), b.labels.tolist()) if x >= 0}
+    return len(pairs) == len({x for x, _ in pairs}) == len({y for _, y in pairs}) == a.count
+
+
+def test_patched_index_matches_relabelling_the_patched_grid():
+    rng = random.Random(1)
+    for _ in range(400):
+        rows, cols = rng.randint(1, 8), rng.randint(1, 8)
+        density = rng.random()
+        graph = GridGraph.from_rows([[1 if rng.random() < density else 0 for _ in range(cols)]
+                                     for _ in range(rows)])
+        changes = [(rng.randrange(rows), rng.randrange(cols), rng.choice([0, 1, 5]))
+                   for _ in range(rng.randint(1, 4))]
+        patched = graph.patched(changes)
+        for connectivity, corner_cutting in ((4, "never"), (8, "always")):
+            base = graph.with_connectivity(connectivity, corner_cutting)
+            moving = patched.with_connectivity(connectivity, corner_cutting)
+            updated = ComponentIndex.build(base).patched(moving, moving.patched_from[1])
+            assert _same_partition(updated, ComponentIndex.build(moving))
+
+
+def test_patched_index_is_updated_in_place_of_relabelling(monkeypatch):
+    # Two halves split by a wall down column 3
+    graph = GridGraph.from_rows([[1 if c == 3 else 0 for c in range(7)] for _ in range(5)])
+    index = ComponentIndex.build(graph)
+    monkeypatch.setattr(ComponentIndex, "build", None)
+    # Terrain edits keep the components, and neither opening the wall nor
+    # closing a cell inside a half needs a rebuild
+    assert index.patched(graph.patched([(2, 2, 7)]), [graph.index(2, 2)]) is index
+    patched = graph.patched([(2, 3, 0), (2, 5, 1)])
+    updated = index.patched(patched, patched.patched_from[1])
+    assert updated.count == 1
+    assert updated.connected(graph.index(0, 0), graph.index(0, 6))
+    assert updated.labels[graph.index(2, 5)] == -1
+
+
+def test_unreachable_pair_is_answered_without_searching():
+    searches = main.search_counter.value(algorithm="BFS")
+    payload = {
+        "algorithm": "BFS",
+        "rows": 3,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 2, "col": 2},
+        "grid": [[0, 0, 0], [1, 1, 1], [0, 0, 0]],
+    }
+    body = client.post("/solve", json=payload).json()
+    assert body["stats"]["solved"] is False
+    assert body["stats"]["nodesExpanded"] == 0
+    assert body["visited"] == []
+
+    payload["include_region"] = True
+    body = client.post("/solve", json=payload).json()
+    assert body["visited"] == [[0, 0], [0, 1], [0, 2]]
+    assert main.search_counter.value(algorithm="BFS") == searches
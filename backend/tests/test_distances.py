@@ -0,0 +1,82 @@
+"""Tests for many-to-many distances (backend/algorithms/distances.py) and
+the /distances API."""
+
+import random
+
+from fastapi.testclient import TestClient
+
+import main
+from algorithms import dijkstra
+from algorithms.distances import many_to_many
+from main import app
+
+client = TestClient(app)
+
+
+def test_matches_one_search_per_pair_in_both_directions():
+    rng = random.Random(2)
+    grid = [[1 if rng.random() < 0.25 else rng.choice([0, 0, 5]) for _ in range(12)] for _ in range(12)]
+    cells = [(r, c) for r in range(12) for c in range(12) if grid[r][c] != 1]
+    # More targets than sources grows fields forwards, fewer grows them backwards
+    for sources, targets in ((cells[:2], cells[-5:]), (cells[:5], cells[-2:])):
+        result = many_to_many(grid, sources, targets, paths=True)
+        assert result["searches"] == 2
+        for i, start in enumerate(sources):
+            for j, end in enumerate(targets):
+                expected = dijkstra.dijkstra(grid, start, end)
+                if not expected["found"]:
+                    assert result["distances"][i][j] is None
+                    continue
+                path = result["paths"][i][j]
+                assert result["distances"][i][j] == expected["path_cost"]
+                assert path[0] == start and path[-1] == end
+                assert sum(max(grid[r][c], 1) for r, c in path[1:]) == expected["path_cost"]
+
+
+def test_distances_endpoint():
+    payload = {
+        "rows": 3,
+        "cols": 3,
+        "grid": [[0, 0, 0], [1, 1, 0], [0, 1, 0]],
+        "sources": [{"row": 0, "col": 0}],
+        "targets": [{"row": 2, "col": 2}, {"row": 0, "col": 0}, {"row": 2, "col": 0}],
+    }
+    body = client.post("/distances", json=payload).json()
+    assert body["distances"] == [[4, 0, None]]
+    assert body["stats"]["searches"] == 1
+    assert "paths" not in body
+
+    payload["include_paths"] = True
+    body = client.post("/distances", json=payload).json()
+    assert body["paths"][0][0] == [[0, 0], [0, 1], [0, 2], [1, 2], [2, 2]]
+    assert body["paths"][0][2] is None
+
+
+def test_distances_rejects_walls_and_oversized_requests():
+    payload = {
+        "rows": 2,
+        "cols": 2,
+        "grid": [[0, 1], [0, 0]],
+        "sources": [{"row": 0, "col": 0}],
+        "targets": [{"row": 0, "col": 1}],
+    }
+    assert client.post("/distances", json=payload).status_code == 400
+
+    payload["targets"] = [{"row": 1, "col": 1}] * 101
+    payload["sources"] = [{"row": 0, "col": 0}] * 100
+    assert client.post("/distances", json=payload).status_code == 400
+
+
+def test_distances_rejects_too_many_pairs_before_building_the_grid(monkeypatch):
+    built = []
+    monkeypatch.setattr(main, "_request_graph", built.append)
+    response = client.post("/distances", json={
+        "rows": 1,
+        "cols": 1,
+        "grid": [[0]],
+        "sources": [{"row": 0, "col": 0}] * 100,
+        "targets": [{"row": 0, "col": 0}] * 101,
+    })
+
+    assert response.status_code == 400
+    assert built == []
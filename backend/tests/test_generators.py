@@ -0,0 +1,51 @@
+"""Tests for the seeded grid generators (backend/generators.py)."""
+
+import numpy as np
+import pytest
+
+import generators
+from algorithms import bfs
+from algorithms.components import ComponentIndex
+
+MAZES = ["backtracker", "prim", "kruskal"]
+
+
+@pytest.mark.parametrize("name", generators.GENERATORS)
+def test_generators_are_deterministic_per_seed(name):
+    make = generators.GENERATORS[name]
+    assert np.array_equal(make(23, 17, 4), make(23, 17, 4))
+    assert make(23, 17, 4).shape == (23, 17)
+
+
+@pytest.mark.parametrize("name", MAZES + ["rooms"])
+@pytest.mark.parametrize("rows, cols", [(1, 1), (2, 7), (10, 10), (11, 11), (12, 31)])
+def test_corners_are_connected(name, rows, cols):
+    cells = generators.GENERATORS[name](rows, cols, 3)
+    result = bfs.bfs(generators.to_graph(cells), (0, 0), (rows - 1, cols - 1))
+    assert result["found"] is True
+
+
+@pytest.mark.parametrize("name", MAZES)
+def test_mazes_are_perfect(name):
+    """Every cell is reachable and there are no loops: the open cells form
+    a tree, so they have exactly one fewer passage than cells."""
+    cells = generators.GENERATORS[name](21, 31, 8)
+    graph = generators.to_graph(cells)
+    free = cells == 0
+    passages = int((free[:, :-1] & free[:, 1:]).sum() + (free[:-1, :] & free[1:, :]).sum())
+
+    assert passages == free.sum() - 1
+    assert len(ComponentIndex.build(graph).region(graph.index(0, 0))) == free.sum()
+
+
+def test_random_walls_follow_density():
+    cells = generators.random_walls(200, 200, seed=1, density=0.25)
+    assert abs(cells.mean() - 0.25) < 0.01
+    assert cells[0, 0] == cells[-1, -1] == 0
+
+
+def test_graph_round_trip():
+    cells = generators.rooms(30, 40, 2)
+    graph = generators.to_graph(cells)
+    assert (graph.rows, graph.cols) == (30, 40)
+    assert np.array_equal(generators.from_graph(graph), cells)
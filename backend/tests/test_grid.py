@@ -0,0 +1,79 @@
+"""Tests for the flat grid encoding in backend/algorithms/grid.py."""
+
+import pytest
+
+from algorithms import GridGraph, as_graph, bfs
+
+
+def test_index_and_cell_round_trip():
+    graph = GridGraph.from_rows([[0] * 4 for _ in range(3)])
+    for row in range(3):
+        for col in range(4):
+            assert graph.cell(graph.index(row, col)) == (row, col)
+
+
+def test_border_is_blocked_so_probes_need_no_bounds_check():
+    graph = GridGraph.from_rows([[0, 0], [0, 0]])
+    for row in range(2):
+        for col in range(2):
+            for offset in graph.offsets:
+                neighbor = graph.index(row, col) + offset
+                r, c = graph.cell(neighbor)
+                inside = 0 <= r < 2 and 0 <= c < 2
+                assert graph.blocked[neighbor] == (0 if inside else 1)
+
+
+def test_one_is_a_wall_and_larger_values_are_terrain():
+    graph = GridGraph.from_rows([[0, 1, 2]])
+    assert graph.is_open(0, 0)
+    assert not graph.is_open(0, 1)
+    assert graph.is_open(0, 2)
+    assert not graph.is_open(0, 3)
+    assert graph.max_cost == 2
+    assert graph.path_cost([graph.index(0, 2), graph.index(0, 0)]) == 1
+    assert GridGraph.from_rows([[0, 1]]).cost is None
+
+
+def test_terrain_changes_the_digest():
+    assert GridGraph.from_rows([[0, 0]]).digest() != GridGraph.from_rows([[0, 3]]).digest()
+
+
+@pytest.mark.parametrize("value", [-1, 256])
+def test_out_of_range_cells_are_rejected(value):
+    with pytest.raises(ValueError):
+        GridGraph.from_rows([[0, value]])
+
+
+def test_ragged_rows_are_rejected():
+    with pytest.raises(ValueError):
+        GridGraph.from_rows([[0, 0], [0]])
+
+
+def test_algorithms_accept_a_prebuilt_graph():
+    """A GridGraph can be built once and passed to any algorithm in place
+    of the 2D list, with identical results."""
+    grid = [
+        [0, 1, 0],
+        [0, 1, 0],
+        [0, 0, 0],
+    ]
+    graph = as_graph(grid)
+    assert as_graph(graph) is graph
+    from_list = bfs.bfs(grid, (0, 0), (0, 2))
+    from_graph = bfs.bfs(graph, (0, 0), (0, 2))
+    assert from_graph["path"] == from_list["path"]
+    assert from_graph["visited"] == from_list["visited"]
+
+
+def test_with_connectivity_shares_the_grid():
+    graph = GridGraph.from_rows([[0, 0], [0, 0]])
+    moving = graph.with_connectivity(8, "single")
+
+    assert moving.blocked is graph.blocked
+    assert moving.digest() == graph.digest()
+    assert len(moving.diagonals) == 4 and moving.corner_limit == 1
+    assert graph.diagonals == ()
+    with pytest.raises(ValueError):
+        graph.with_connectivity(6)
+    with pytest.raises(ValueError):
+        graph.with_connectivity(8, "sometimes")
@@ -0,0 +1,110 @@
+"""Tests for the /grids store and solving by grid_id with patches."""
+
+from fastapi.testclient import TestClient
+
+from algorithms.grid import GridGraph
+from main import app
+
+client = TestClient(app)
+
+GRID = [
+    [0, 0, 0],
+    [1, 1, 0],
+    [0, 0, 0],
+]
+
+
+def _upload(grid=GRID):
+    response = client.post("/grids", json={"rows": len(grid), "cols": len(grid[0]), "grid": grid})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _solve(**body):
+    payload = {"algorithm": "BFS", "start": {"row": 0, "col": 0}, "end": {"row": 2, "col": 0}}
+    payload.update(body)
+    return client.post("/solve", json=payload)
+
+
+def test_upload_reports_id_and_content_digest():
+    info = _upload()
+    assert info["digest"] == GridGraph.from_rows(GRID).digest()
+    assert (info["rows"], info["cols"]) == (3, 3)
+    assert client.get(f"/grids/{info['gridId']}").json() == info
+
+
+def test_solving_by_id_matches_solving_inline():
+    info = _upload()
+    by_id = _solve(grid_id=info["gridId"]).json()
+    inline = _solve(rows=3, cols=3, grid=GRID).json()
+    assert by_id["path"] == inline["path"]
+    assert by_id["stats"]["pathLength"] == 7
+
+
+def test_patches_apply_to_a_copy_of_the_stored_grid():
+    info = _upload()
+    opened = _solve(grid_id=info["gridId"], patches=[{"row": 1, "col": 0, "value": 0}]).json()
+    assert opened["stats"]["pathLength"] == 3
+    # The stored grid is untouched
+    assert _solve(grid_id=info["gridId"]).json()["stats"]["pathLength"] == 7
+    assert client.get(f"/grids/{info['gridId']}").json()["digest"] == info["digest"]
+
+
+def test_patched_digest_differs_from_the_base():
+    graph = GridGraph.from_rows(GRID)
+    patched = graph.patched([(1, 0, 0)])
+    assert patched.digest() != graph.digest()
+    assert patched.digest() == graph.patched([(1, 0, 0)]).digest()
+    assert not patched.blocked[patched.index(1, 0)]
+    assert graph.blocked[graph.index(1, 0)]
+
+
+def test_bad_references_are_rejected():
+    assert _solve(grid_id="missing").status_code == 404
+    assert _solve().status_code == 400
+    assert _solve(rows=3, cols=3, grid=GRID, patches=[{"row": 0, "col": 0, "value": 0}]).status_code == 400
+    info = _upload()
+    assert _solve(grid_id=info["gridId"], patches=[{"row": 3, "col": 0, "value": 0}]).status_code == 400
+
+
+def test_batch_accepts_grid_id():
+    info = _upload()
+    response = client.post("/solve/batch", json={
+        "algorithms": ["BFS", "A*"], "grid_id": info["gridId"],
+        "start": {"row": 0, "col": 0}, "end": {"row": 2, "col": 0},
+    })
+    assert response.status_code == 200
+
+
+def test_delete_removes_the_grid():
+    info = _upload()
+    assert client.delete(f"/grids/{info['gridId']}").status_code == 204
+    assert client.get(f"/grids/{info['gridId']}").status_code == 404
+    assert client.delete(f"/grids/{info['gridId']}").status_code == 404
+
+
+def test_generated_grids_are_stored_under_a_stable_id():
+    body = {"generator": "kruskal", "rows": 21, "cols": 31, "seed": 5}
+    first = client.post("/grids/generate", json=body).json()
+    second = client.post("/grids/generate", json={**body, "include_grid": True}).json()
+
+    assert first["cached"] is False and second["cached"] is True
+    assert second["gridId"] == first["gridId"]
+    assert GridGraph.from_rows(second["grid"]).digest() == first["digest"]
+    assert client.post("/grids/generate", json={**body, "seed": 6}).json()["gridId"] != first["gridId"]
+
+    solved = _solve(grid_id=first["gridId"], end={"row": 20, "col": 30}).json()
+    assert solved["stats"]["solved"] is True
+
+
+def test_generated_grid_size_is_limited():
+    body = {"generator": "random", "rows": 100_000, "cols": 100_000}
+    assert client.post("/grids/generate", json=body).status_code == 400
+
+
+def test_patches_that_split_the_grid_are_answered_as_unreachable():
+    info = _upload()
+    _solve(grid_id=info["gridId"])  # labels the stored grid
+    cut = _solve(grid_id=info["gridId"], patches=[{"row": 1, "col": 2, "value": 1}]).json()
+    assert cut["stats"]["solved"] is False
+    assert cut["stats"]["nodesExpanded"] == 0
@@ -0,0 +1,66 @@
+"""Tests for the Prometheus metrics registry (backend/metrics.py) and GET /metrics."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from metrics import Registry
+
+client = TestClient(main.app)
+
+
+def test_counter_and_histogram_render_in_text_format():
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs run", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job time", buckets=(0.1, 1.0))
+    counter.inc(kind="a")
+    counter.inc(2, kind='q"uote')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="a"} 1.0',
+        'jobs_total{kind="q\\"uote"} 2.0',
+        "# HELP job_seconds Job time",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="0.1"} 1.0',
+        'job_seconds_bucket{le="1.0"} 2.0',
+        'job_seconds_bucket{le="+Inf"} 3.0',
+        "job_seconds_sum 5.55",
+        "job_seconds_count 3.0",
+    ]
+
+
+def test_labels_must_match_declaration():
+    counter = Registry().counter("jobs_total", "Jobs run", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(other="a")
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind="a")
+
+
+def test_metrics_endpoint_counts_searches():
+    main.result_cache.clear()
+    before = main.search_counter.value(algorithm="Dijkstra")
+    payload = {
+        "algorithm": "Dijkstra",
+        "rows": 2,
+        "cols": 2,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 1, "col": 1},
+        "grid": [[0, 0], [0, 0]],
+    }
+    client.post("/solve", json=payload)
+    client.post("/solve", json=payload)  # cache hit, not a search
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert main.search_counter.value(algorithm="Dijkstra") == before + 1
+    text = response.text
+    assert 'graph_search_http_requests_total{route="/solve",method="POST",status="200"}' in text
+    assert 'graph_search_phase_duration_seconds_count{algorithm="Dijkstra",phase="serialize"}' in text
+    assert "# TYPE graph_search_cache_hits_total counter" in text
@@ -0,0 +1,120 @@
+"""Parity tests for the compiled search kernel (algorithms/native.py).
+
+The kernel mirrors the pure-Python loops step for step, so every field of
+the result but the timings must match. Skipped unless the kernel is built
+(python -m algorithms.build_kernel).
+"""
+
+import random
+
+import pytest
+
+from algorithms import GridGraph, a_star, bfs, dijkstra, native
+from algorithms.distances import distance_field
+from algorithms.grid import STRAIGHT, run_steps
+
+pytestmark = pytest.mark.skipif(not native.available(), reason="search kernel not built")
+
+SEARCHES = {
+    "bfs": (bfs.bfs, bfs.bfs_steps),
+    "dijkstra": (dijkstra.dijkstra, dijkstra.dijkstra_steps),
+    "a_star": (a_star.a_star, a_star.a_star_steps),
+}
+
+
+def _python(monkeypatch, fn, *args, **kwargs):
+    """Run fn on the pure-Python loop."""
+    with monkeypatch.context() as patch:
+        patch.setattr(native, "available", lambda: False)
+        return fn(*args, **kwargs)
+
+
+def _comparable(result):
+    profile = {key: value for key, value in result["profile"].items()
+               if not key.endswith("_ns") and key != "native"}
+    return {**result, "time_taken": None, "profile": profile}
+
+
+def _random_cases(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        rows, cols = rng.randint(1, 25), rng.randint(1, 25)
+        values = [0, 0, 0, 1] if i % 2 else [0, 0, 1, 2, 5, 9, 255]
+        grid = [[rng.choice(values) for _ in range(cols)] for _ in range(rows)]
+        graph = GridGraph.from_rows(grid)
+        if i % 3 == 0:
+            graph = graph.with_connectivity(8, rng.choice(["never", "single", "always"]))
+        start = (rng.randrange(rows), rng.randrange(cols))
+        end = (rng.randrange(rows), rng.randrange(cols))
+        yield graph, start, end
+
+
+@pytest.mark.parametrize("name", SEARCHES)
+def test_kernel_matches_python(monkeypatch, name):
+    fn = SEARCHES[name][0]
+    for graph, start, end in _random_cases(150, seed=len(name)):
+        result = fn(graph, start, end)
+
+        assert result["profile"]["native"] is True
+        assert _comparable(result) == _comparable(_python(monkeypatch, fn, graph, start, end))
+
+
+@pytest.mark.parametrize("name", SEARCHES)
+def test_kernel_batches_match_python(monkeypatch, name):
+    steps = SEARCHES[name][1]
+    grid = [[0] * 30 for _ in range(30)]
+
+    def batches():
+        search = steps(grid, (0, 0), (29, 29), batch_size=37)
+        yielded = []
+        try:
+            while True:
+                yielded.append(next(search))
+        except StopIteration as done:
+            return yielded, done.value
+
+    kernel_batches, kernel_result = batches()
+    python_batches, python_result = _python(monkeypatch, batches)
+    assert kernel_batches == python_batches
+    assert _comparable(kernel_result) == _comparable(python_result)
+
+
+@pytest.mark.parametrize("name", SEARCHES)
+def test_kernel_runs_unrecorded(monkeypatch, name):
+    fn = SEARCHES[name][0]
+    grid = [[0] * 40 for _ in range(40)]
+    result = fn(grid, (0, 0), (39, 39), record=False)
+
+    assert result["visited"] == []
+    assert _comparable(result) == _comparable(_python(monkeypatch, fn, grid, (0, 0), (39, 39), record=False))
+    assert run_steps(SEARCHES[name][1](grid, (0, 0), (39, 39), batch_size=100, record=False))["found"]
+
+
+def test_kernel_distance_fields_match_python():
+    rng = random.Random(8)
+    for i in range(60):
+        rows, cols = rng.randint(1, 12), rng.randint(1, 12)
+        graph = GridGraph.from_rows([[rng.choice([0, 0, 1, 3, 9]) for _ in range(cols)] for _ in range(rows)])
+        if i % 2:
+            graph = graph.with_connectivity(8, rng.choice(["never", "single", "always"]))
+        kernel = native.Kernel(native.DIJKSTRA, graph)
+        try:
+            for _ in range(3):
+                root = graph.index(rng.randrange(rows), rng.randrange(cols))
+                reverse = rng.random() < 0.5
+                assert kernel.field(root, reverse) == distance_field(graph, root, reverse=reverse)[0]
+        finally:
+            kernel.close()
+
+
+def test_kernel_distance_fields_past_32_bits():
+    cols = (2 ** 31) // (255 * STRAIGHT) + 2
+    graph = GridGraph.from_rows([[255] * cols]).with_connectivity(8)
+    kernel = native.Kernel(native.DIJKSTRA, graph)
+    try:
+        field = kernel.field(graph.index(0, 0))
+    finally:
+        kernel.close()
+
+    assert field[graph.index(0, cols - 1)] == (cols - 1) * 255 * STRAIGHT > 2 ** 31 - 1
+    assert field == distance_field(graph, graph.index(0, 0))[0]
@@ -0,0 +1,68 @@
+"""Tests for LPA* replanning (backend/algorithms/lpa_star.py) and the
+/sessions API."""
+
+import random
+
+from fastapi.testclient import TestClient
+
+from algorithms import dijkstra
+from algorithms.lpa_star import LPAStar
+from main import app
+
+client = TestClient(app)
+
+
+def test_replanning_matches_a_fresh_search_after_every_edit():
+    rng = random.Random(0)
+    grid = [[1 if rng.random() < 0.25 else 0 for _ in range(10)] for _ in range(10)]
+    start, end = (0, 0), (9, 9)
+    grid[0][0] = grid[9][9] = 0
+    planner = LPAStar(grid, start, end)
+    result = planner.compute()
+
+    for _ in range(20):
+        fresh = dijkstra.dijkstra(grid, start, end)
+        assert result["found"] == fresh["found"]
+        assert result["path_cost"] == fresh["path_cost"]
+
+        row, col = rng.randrange(10), rng.randrange(10)
+        if (row, col) in (start, end):
+            continue
+        value = rng.choice([0, 1, 4])
+        grid[row][col] = value
+        result = planner.update([(row, col, value)])
+
+
+def test_an_edit_off_the_path_expands_nothing():
+    grid = [[0] * 6 for _ in range(6)]
+    planner = LPAStar(grid, (0, 0), (0, 5))
+    first = planner.compute()
+    assert first["path_cost"] == 5
+
+    again = planner.update([(5, 0, 1)])
+    assert again["nodes_expanded"] == 0
+    assert again["path"] == first["path"]
+
+
+def test_session_lifecycle():
+    created = client.post("/sessions", json={
+        "rows": 3,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 0, "col": 2},
+        "grid": [[0, 0, 0], [0, 0, 0], [0, 0, 0]],
+    })
+    assert created.status_code == 201
+    session_id = created.json()["sessionId"]
+    assert created.json()["stats"]["pathLength"] == 3
+
+    url = f"/sessions/{session_id}"
+    updated = client.patch(url, json={"changes": [{"row": 0, "col": 1, "value": 1}]}).json()
+    assert updated["stats"]["pathLength"] == 5
+    assert [0, 1] not in updated["path"]
+
+    assert client.patch(url, json={"changes": [{"row": 0, "col": 2, "value": 1}]}).status_code == 400
+    assert client.patch(url, json={"changes": [{"row": 3, "col": 0, "value": 1}]}).status_code == 400
+
+    assert client.delete(url).status_code == 204
+    assert client.patch(url, json={"changes": [{"row": 1, "col": 1, "value": 1}]}).status_code == 404
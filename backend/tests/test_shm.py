@@ -0,0 +1,158 @@
+"""Tests for the shared memory grid registry (backend/shm.py) and its use
+by the worker processes."""
+
+from multiprocessing import shared_memory
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import workers
+from algorithms import GridGraph, a_star, components, shared
+from algorithms.shared import SharedGraph
+from shm import SharedGridRegistry
+
+client = TestClient(main.app)
+
+MAZE = [[1 if c % 4 == 2 and r != (c * 3) % 20 else 0 for c in range(30)] for r in range(20)]
+
+
+def _graph(seed: int) -> GridGraph:
+    return GridGraph.from_rows([[seed if (r, c) == (0, 5) else 0 for c in range(10)] for r in range(10)])
+
+
+def _exists(spec: SharedGraph) -> bool:
+    try:
+        shared_memory.SharedMemory(name=spec.name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_small_grids_are_passed_as_they_are():
+    registry = SharedGridRegistry(min_cells=10_000)
+    graph = GridGraph.from_rows(MAZE)
+    assert registry.acquire(graph) is graph
+    registry.release(graph)
+    assert registry.stats()["entries"] == 0
+
+
+def test_workers_resolve_a_shared_grid_to_the_same_graph():
+    registry = SharedGridRegistry(min_cells=0)
+    graph = GridGraph.from_rows(MAZE).with_connectivity(8, "single")
+    handle = registry.acquire(graph)
+    assert isinstance(handle, SharedGraph)
+    # Views of the same grid share its segment
+    plain = registry.acquire(GridGraph.from_rows(MAZE).index_view())
+    assert plain.name == handle.name and plain.connectivity == 4 and plain.flat_cells
+    assert registry.stats()["shares"] == 1 and registry.stats()["reuses"] == 1
+
+    resolved = workers.resolve(handle)
+    assert resolved.digest() == graph.digest()
+    expected = a_star.a_star(graph, (0, 0), (19, 29))
+    result = a_star.a_star(resolved, (0, 0), (19, 29))
+    assert (result["path"], result["nodes_expanded"]) == (expected["path"], expected["nodes_expanded"])
+    assert workers.resolve(plain).cells([graph.index(0, 0)]).tolist() == [graph.index(0, 0)]
+
+    registry.release(handle)
+    registry.release(plain)
+    del resolved
+    workers._attached.clear()
+    registry.close()
+
+
+def test_least_recently_used_unpinned_segments_are_unlinked():
+    registry = SharedGridRegistry(max_entries=1, min_cells=0)
+    first = registry.acquire(_graph(2))
+    second = registry.acquire(_graph(3))
+    # Both are pinned, so neither can go yet
+    assert _exists(first) and _exists(second)
+    registry.release(first)
+    assert not _exists(first) and _exists(second)
+    registry.release(second)
+    assert registry.stats()["entries"] == 1
+    registry.close()
+    assert not _exists(second)
+    assert registry.stats() == {"shares": 2, "reuses": 0, "unlinks": 2, "entries": 0, "bytes": 0, "pinned": 0}
+
+
+def test_discarding_a_pinned_segment_waits_for_its_release():
+    registry = SharedGridRegistry(min_cells=0)
+    graph = _graph(4)
+    handle = registry.acquire(graph)
+    assert registry.discard(graph.digest()) is True
+    assert _exists(handle) and registry.stats()["pinned"] == 1
+    registry.release(handle)
+    assert not _exists(handle)
+    assert registry.discard(graph.digest()) is False
+
+
+def test_component_labels_travel_with_the_grid():
+    graph = GridGraph.from_rows(MAZE)
+    index = components.ComponentIndex.build(graph)
+    segment, spec = shared.share(graph, index)
+    try:
+        owner, attached = shared.attach(spec)
+        labels = shared.attach_components(owner, spec)
+        assert labels.count == index.count
+        assert (labels.labels == index.labels).all()
+        del labels, attached
+        owner.close()
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def test_solve_and_distances_run_on_shared_grids(monkeypatch):
+    monkeypatch.setattr(main, "shared_grids", SharedGridRegistry(min_cells=0))
+    payload = {
+        "algorithm": "A*",
+        "rows": 20,
+        "cols": 30,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 19, "col": 29},
+        "grid": MAZE,
+    }
+    expected = a_star.a_star(MAZE, (0, 0), (19, 29))
+    body = client.post("/solve", json={**payload, "visited_format": "delta"}).json()
+    assert body["stats"]["nodesExpanded"] == expected["nodes_expanded"]
+    assert [tuple(cell) for cell in body["path"]] == expected["path"]
+
+    body = client.post("/distances", json={
+        "rows": 20, "cols": 30, "grid": MAZE,
+        "sources": [{"row": 0, "col": 0}], "targets": [{"row": 19, "col": 29}],
+    }).json()
+    assert body["distances"] == [[expected["path_cost"]]]
+
+    stats = main.shared_grids.stats()
+    assert (stats["shares"], stats["reuses"], stats["pinned"]) == (1, 1, 0)
+    main.shared_grids.close()
+
+
+def test_evicted_stored_grid_frees_its_shared_copy(monkeypatch):
+    monkeypatch.setattr(main, "shared_grids", SharedGridRegistry(min_cells=0))
+    grid_id = client.post("/grids", json={"rows": 20, "cols": 30, "grid": MAZE}).json()["gridId"]
+    graph = main.grid_store.get(grid_id)
+    handle = main.shared_grids.acquire(graph)
+    main.shared_grids.release(handle)
+    assert client.delete(f"/grids/{grid_id}").status_code == 204
+    assert not _exists(handle)
+
+
+@pytest.mark.parametrize("cells", [MAZE, [[v or (r + c) % 5 + 2 for c, v in enumerate(row)] for r, row in enumerate(MAZE)]],
+                         ids=["uniform", "terrain"])
+def test_every_algorithm_runs_on_an_attached_graph(cells):
+    graph = GridGraph.from_rows(cells)
+    segment, spec = shared.share(graph)
+    try:
+        owner, attached = shared.attach(spec)
+        for name, fn in main.algorithm_map.items():
+            expected = fn(graph, (0, 0), (19, 29))
+            result = fn(attached, (0, 0), (19, 29))
+            assert result["path"] == expected["path"], name
+            assert result["nodes_expanded"] == expected["nodes_expanded"], name
+        del attached
+        owner.close()
+    finally:
+        segment.close()
+        segment.unlink()
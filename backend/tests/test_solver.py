@@ -0,0 +1,95 @@
+"""Tests for the multi-query GridSolver and solve_pairs (algorithms/solver.py)."""
+
+import random
+
+import pytest
+
+from algorithms import GridGraph, a_star, bfs, dijkstra, native, shared
+from algorithms.solver import GridSolver, QueryResult, solve_pairs
+
+SEARCHES = {"bfs": bfs.bfs, "dijkstra": dijkstra.dijkstra, "a_star": a_star.a_star}
+
+
+@pytest.fixture(params=["kernel", "python"])
+def loops(request, monkeypatch):
+    """Run each test on the compiled kernel (if built) and on the Python loops."""
+    if request.param == "kernel" and not native.available():
+        pytest.skip("search kernel not built")
+    if request.param == "python":
+        monkeypatch.setattr(native, "available", lambda: False)
+    return request.param
+
+
+@pytest.mark.parametrize("name", SEARCHES)
+def test_queries_match_single_searches(loops, name):
+    rng = random.Random(6)
+    for i in range(40):
+        rows, cols = rng.randint(1, 15), rng.randint(1, 15)
+        grid = [[rng.choice([0, 0, 0, 1, 1, 4, 9]) for _ in range(cols)] for _ in range(rows)]
+        graph = GridGraph.from_rows(grid)
+        if i % 3 == 0:
+            graph = graph.with_connectivity(8, rng.choice(["never", "single", "always"]))
+        with GridSolver(graph, name) as solver:
+            for _ in range(8):
+                start = (rng.randrange(rows), rng.randrange(cols))
+                end = (rng.randrange(rows), rng.randrange(cols))
+                expected = SEARCHES[name](graph, start, end)
+                result = solver.solve(start, end, path=True)
+
+                assert result.found is expected["found"]
+                assert result.cost == expected["path_cost"]
+                if expected["found"]:
+                    assert result.path == expected["path"]
+                    assert result.length == len(expected["path"])
+                    assert result.nodes_expanded == expected["nodes_expanded"]
+
+
+def test_unreachable_pairs_skip_the_search(loops):
+    grid = [
+        [0, 1, 0],
+        [0, 1, 0],
+        [0, 1, 0],
+    ]
+    with GridSolver(grid) as solver:
+        assert solver.solve((0, 0), (2, 2)) == QueryResult(False, 0, 0, 0, None)
+        assert solver.solve((0, 0), (2, 0)).found is True
+
+
+def test_state_is_reused_across_generations(loops):
+    grid = [[0] * 20 for _ in range(20)]
+    with GridSolver(grid, "dijkstra") as solver:
+        if loops == "python":
+            # The next query wraps the generation counter around
+            solver._generation = (1 << 32) - 1
+        first = solver.solve((0, 0), (19, 19))
+        assert solver.solve((5, 5), (6, 6)).length == 3
+        assert solver.solve((0, 0), (19, 19)) == first
+        assert first.length == 39
+
+
+def test_solve_pairs_over_processes_matches_in_process():
+    rng = random.Random(2)
+    grid = [[1 if rng.random() < 0.25 else 0 for _ in range(30)] for _ in range(30)]
+    graph = GridGraph.from_rows(grid).with_connectivity(8, "single")
+    pairs = [((rng.randrange(30), rng.randrange(30)), (rng.randrange(30), rng.randrange(30)))
+             for _ in range(40)]
+
+    expected = solve_pairs(graph, pairs, "a_star", paths=True)
+    assert solve_pairs(graph, pairs, "a_star", paths=True, processes=2) == expected
+
+
+def test_shared_graph_round_trip():
+    graph = GridGraph.from_rows([[0, 5, 1], [0, 0, 0]]).with_connectivity(8, "always")
+    segment, spec = shared.share(graph)
+    try:
+        owner, attached = shared.attach(spec)
+        assert attached.digest() == graph.digest()
+        assert bytes(attached.blocked) == bytes(graph.blocked)
+        assert bytes(attached.cost) == bytes(graph.cost)
+        assert (attached.max_cost, attached.corner_limit) == (5, 2)
+        assert a_star.a_star(attached, (0, 0), (0, 1))["path"] == a_star.a_star(graph, (0, 0), (0, 1))["path"]
+        del attached
+        owner.close()
+    finally:
+        segment.close()
+        segment.unlink()
@@ -0,0 +1,95 @@
+"""Tests for the compact visited encodings (backend/visits.py) and their
+use by /solve."""
+
+import base64
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import visits
+from algorithms import GridGraph, bfs
+from main import app
+
+client = TestClient(app)
+
+GRID = [[0] * 6 for _ in range(5)]
+
+
+def _visited_indices():
+    graph = GridGraph.from_rows(GRID)
+    result = bfs.bfs(graph.index_view(), (0, 0), (4, 5))
+    return graph, result["visited"], [r * 6 + c for r, c in bfs.bfs(GRID, (0, 0), (4, 5))["visited"]]
+
+
+def test_index_view_returns_flat_indices():
+    graph, flat, cells = _visited_indices()
+    assert graph.cells(flat) == [divmod(cell, 6) for cell in cells]
+
+
+def test_delta_and_rle_round_trip():
+    graph, flat, cells = _visited_indices()
+    delta = visits.encode(graph, flat, "delta")
+    assert list(np.cumsum(delta["data"])) == cells
+    assert delta["count"] == len(cells)
+
+    rle = visits.encode(graph, flat, "rle")["data"]
+    decoded = [start + k for start, length in zip(rle[::2], rle[1::2]) for k in range(length)]
+    assert decoded == cells
+
+
+def test_steps_give_each_cell_its_expansion_number():
+    graph, flat, cells = _visited_indices()
+    encoded = visits.encode(graph, flat, "steps")
+    steps = np.frombuffer(base64.b64decode(encoded["data"]), dtype=encoded["dtype"])
+    assert len(steps) == 30
+    for step, cell in enumerate(cells, 1):
+        assert steps[cell] == step
+
+
+def test_limit_raises_the_stride():
+    graph, flat, cells = _visited_indices()
+    sampled = visits.encode(graph, flat, "cells", limit=7)
+    assert len(sampled) <= 7
+    assert sampled == [divmod(cell, 6) for cell in cells[::visits.stride_for(len(cells), 1, 7)]]
+
+
+def test_solve_with_encoded_visited():
+    payload = {
+        "algorithm": "BFS",
+        "rows": 5,
+        "cols": 6,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 4, "col": 5},
+        "grid": GRID,
+    }
+    plain = client.post("/solve", json=payload).json()
+
+    payload["visited_format"] = "delta"
+    encoded = client.post("/solve", json=payload).json()
+    assert encoded["path"] == plain["path"]
+    assert encoded["stats"]["nodesExpanded"] == plain["stats"]["nodesExpanded"]
+    assert [divmod(cell, 6) for cell in np.cumsum(encoded["visited"]["data"])] == \
+        [tuple(cell) for cell in plain["visited"]]
+
+    payload["visited_format"] = "none"
+    assert client.post("/solve", json=payload).json()["visited"] == []
+
+    payload.update(visited_format="cells", visited_stride=4)
+    assert client.post("/solve", json=payload).json()["visited"] == plain["visited"][::4]
+
+
+def test_encoded_visited_survives_batched_worker_runs():
+    # Large enough for the worker to collect the visit order over several batches
+    payload = {
+        "algorithm": "DFS",
+        "rows": 60,
+        "cols": 60,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 59, "col": 59},
+        "grid": [[0] * 60 for _ in range(60)],
+        "visited_format": "steps",
+    }
+    body = client.post("/solve", json=payload).json()
+    steps = np.frombuffer(base64.b64decode(body["visited"]["data"]), dtype=body["visited"]["dtype"])
+    assert body["visited"]["count"] == body["stats"]["nodesExpanded"] > 1024
+    assert sorted(steps[steps > 0]) == list(range(1, body["visited"]["count"] + 1))
@@ -0,0 +1,111 @@
+"""Tests for the binary /solve wire format (backend/wire.py)."""
+
+import struct
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import wire
+from main import app, algorithm_map
+
+client = TestClient(app)
+
+GRID = [
+    [0, 1, 0],
+    [0, 1, 0],
+    [0, 0, 0],
+]
+
+
+def test_every_algorithm_has_a_wire_code():
+    assert set(wire.ALGORITHMS) == set(algorithm_map)
+
+
+@pytest.mark.parametrize("encoding", [wire.ENCODING_BITSET, wire.ENCODING_RLE])
+def test_request_round_trip(encoding):
+    grid = [
+        [1, 1, 0, 0],
+        [0, 0, 0, 1],
+        [1, 0, 1, 1],
+    ]
+    body = wire.encode_request("A*", grid, (1, 0), (0, 3), encoding=encoding)
+    parsed = wire.decode_request(body)
+
+    assert parsed["algorithm"] == "A*"
+    assert (parsed["rows"], parsed["cols"]) == (3, 4)
+    assert parsed["start"] == (1, 0)
+    assert parsed["end"] == (0, 3)
+    graph = parsed["graph"]
+    for r, row in enumerate(grid):
+        for c, value in enumerate(row):
+            assert graph.is_open(r, c) == (value == 0)
+
+
+@pytest.mark.parametrize("encoding", [wire.ENCODING_BITSET, wire.ENCODING_RLE])
+def test_binary_solve_matches_json_solve(encoding):
+    body = wire.encode_request("BFS", GRID, (0, 0), (0, 2), encoding=encoding)
+    response = client.post(
+        "/solve/binary", content=body, headers={"Content-Type": wire.REQUEST_MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == wire.RESPONSE_MEDIA_TYPE
+
+    result = wire.decode_response(response.content)
+    expected = client.post("/solve", json={
+        "algorithm": "BFS",
+        "rows": 3,
+        "cols": 3,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 0, "col": 2},
+        "grid": GRID,
+    }).json()
+
+    assert result["stats"]["solved"] is True
+    assert result["stats"]["pathLength"] == expected["stats"]["pathLength"] == 7
+    assert result["path"].tolist() == [r * 3 + c for r, c in expected["path"]]
+    assert result["visited"].tolist() == [r * 3 + c for r, c in expected["visited"]]
+
+
+def test_binary_solve_rejects_truncated_payload():
+    body = wire.encode_request("BFS", GRID, (0, 0), (0, 2))
+    response = client.post("/solve/binary", content=body[:-1])
+
+    assert response.status_code == 400
+    assert "malformed" in response.json()["detail"].lower()
+
+
+def test_binary_solve_validates_endpoints():
+    body = wire.encode_request("BFS", GRID, (0, 1), (0, 2))
+    response = client.post("/solve/binary", content=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Start position is a wall"
+
+
+def test_binary_solve_rejects_oversized_grid_before_decoding():
+    # One run-length covering 3.6 billion cells - a few bytes on the wire
+    header = wire._REQUEST_HEADER.pack(b"GSRQ", wire.VERSION, wire.ENCODING_RLE, 0, 0,
+                                       60_000, 60_000, 0, 0, 0, 1)
+    response = client.post("/solve/binary", content=header + struct.pack("<I", 60_000 * 60_000))
+
+    assert response.status_code == 400
+    assert f"limited to {main.MAX_BINARY_CELLS} cells" in response.json()["detail"]
+
+
+def test_binary_solve_searches_on_flat_indices(monkeypatch):
+    submitted = []
+    submit = main.workers.submit
+
+    def record(client, fn, steps, graph, *args):
+        submitted.append(graph.flat_cells)
+        return submit(client, fn, steps, graph, *args)
+
+    monkeypatch.setattr(main.workers, "submit", record)
+    grid = [[0] * 5 for _ in range(4)]
+    body = wire.encode_request("A*", grid, (3, 0), (0, 4))
+    result = wire.decode_response(client.post("/solve/binary", content=body).content)
+
+    assert submitted == [True]
+    assert result["path"][[0, -1]].tolist() == [15, 4]
+    assert result["stats"]["pathLength"] == 8
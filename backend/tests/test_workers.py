@@ -0,0 +1,147 @@
+"""Tests for search budgets, admission control and cancellation
+(backend/workers.py) and their use by /solve, /solve/batch and /distances."""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import workers
+from algorithms import GridGraph, bfs
+from algorithms.distances import many_to_many_steps
+from main import app
+
+client = TestClient(app)
+
+OPEN = [[0] * 20 for _ in range(20)]
+
+
+def test_expansion_budget_stops_the_search():
+    payload = {
+        "algorithm": "BFS",
+        "rows": 20,
+        "cols": 20,
+        "start": {"row": 0, "col": 0},
+        "end": {"row": 19, "col": 19},
+        "grid": OPEN,
+        "max_expansions": 10,
+    }
+    body = client.post("/solve", json=payload).json()
+    assert body["budgetExceeded"] is True
+    assert body["stats"]["solved"] is False
+    assert body["stats"]["nodesExpanded"] == len(body["visited"]) == 10
+
+    # A budget-limited answer is not cached for later, larger budgets
+    del payload["max_expansions"]
+    body = client.post("/solve", json=payload).json()
+    assert "budgetExceeded" not in body
+    assert body["stats"]["solved"] is True
+
+
+def test_budgeted_run_matches_a_plain_run_within_budget():
+    graph = GridGraph.from_rows(OPEN)
+    plain = bfs.bfs(graph, (0, 0), (19, 19))
+    budgeted = workers._run_budgeted(0, bfs.bfs_steps, graph, (0, 0), (19, 19), 0, 10_000)
+    assert budgeted["path"] == plain["path"]
+    assert budgeted["visited"] == plain["visited"]
+
+
+def test_expansion_budget_applies_without_a_visit_order():
+    graph = GridGraph.from_rows(OPEN)
+    result = workers._run_budgeted(0, bfs.bfs_steps, graph, (0, 0), (19, 19), 0, 50,
+                                   {"record": False})
+    assert result["budget_exceeded"] is True
+    assert result["nodes_expanded"] == 50
+    assert result["visited"] == []
+
+
+def test_cancel_flag_stops_the_search(monkeypatch):
+    monkeypatch.setattr(workers, "_worker_flags", bytearray([0, 1]))
+    graph = GridGraph.from_rows(OPEN)
+    assert workers._run_budgeted(1, bfs.bfs_steps, graph, (0, 0), (19, 19), 0, 5) is None
+    assert workers._run_budgeted(0, bfs.bfs_steps, graph, (0, 0), (19, 19), 0, 0)["found"]
+
+
+def test_admission_limits_per_client_then_overall(monkeypatch):
+    workers.get_pool()
+    monkeypatch.setenv("SEARCH_CLIENT_LIMIT", "1")
+    slot = workers._admit("a")
+    try:
+        with pytest.raises(workers.Rejected) as rejected:
+            workers._admit("a")
+        assert rejected.value.status_code == 429
+
+        monkeypatch.setattr(workers, "_free_slots", [])
+        with pytest.raises(workers.Rejected) as rejected:
+            workers._admit("b")
+        assert rejected.value.status_code == 503
+    finally:
+        monkeypatch.undo()
+        workers._release(slot, "a")
+    assert workers.in_flight() == 0
+
+
+def test_cancel_after_the_search_let_go_of_its_slot_does_nothing():
+    """A disconnect noticed just as the search finished must not flag the
+    slot for whichever search takes it next."""
+    future, slot = workers.submit("a", bfs.bfs, bfs.bfs_steps, GridGraph.from_rows(OPEN),
+                                  (0, 0), (19, 19), {})
+    assert future.result()["found"]
+    deadline = time.monotonic() + 5
+    while workers.in_flight() and time.monotonic() < deadline:
+        time.sleep(0.01)  # the slot is released by a done callback
+    workers.cancel(slot, future)
+
+    assert workers._cancel_flags[slot] == 0
+    again, again_slot = workers.submit("a", bfs.bfs, bfs.bfs_steps, GridGraph.from_rows(OPEN),
+                                       (0, 0), (19, 19), {})
+    assert again_slot == slot  # freed slots are reused last in, first out
+    assert again.result()["found"]
+
+
+def test_batch_searches_run_under_the_server_budgets(monkeypatch):
+    monkeypatch.setattr(main, "SEARCH_EXPANSION_LIMIT", 10)
+    grid = [[0] * 25 for _ in range(25)]
+    payload = {"algorithms": ["BFS", "A*"], "rows": 25, "cols": 25, "grid": grid,
+               "start": {"row": 0, "col": 0}, "end": {"row": 24, "col": 24}}
+    results = client.post("/solve/batch", json=payload).json()["results"]
+    assert [r["budgetExceeded"] for r in results] == [True, True]
+    assert all(r["stats"]["nodesExpanded"] == 10 for r in results)
+
+    # Budget-limited answers are not cached
+    monkeypatch.setattr(main, "SEARCH_EXPANSION_LIMIT", 0)
+    results = client.post("/solve/batch", json=payload).json()["results"]
+    assert all(r["stats"]["solved"] and "budgetExceeded" not in r for r in results)
+
+
+def test_batch_searches_go_through_admission(monkeypatch):
+    workers.get_pool()
+    monkeypatch.setattr(workers, "_free_slots", [])
+    grid = [[0] * 26 for _ in range(26)]
+    response = client.post("/solve/batch", json={
+        "algorithms": ["BFS"], "rows": 26, "cols": 26, "grid": grid,
+        "start": {"row": 0, "col": 0}, "end": {"row": 25, "col": 25},
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_distances_stop_between_fields_once_over_budget(monkeypatch):
+    monkeypatch.setattr(main, "SEARCH_EXPANSION_LIMIT", 1)
+    body = client.post("/distances", json={
+        "rows": 20, "cols": 20, "grid": OPEN,
+        "sources": [{"row": 0, "col": 0}, {"row": 19, "col": 0}],
+        "targets": [{"row": 0, "col": 19}, {"row": 19, "col": 19}, {"row": 10, "col": 10}],
+    }).json()
+    assert body["budgetExceeded"] is True
+    assert body["stats"]["searches"] == 1
+    assert body["distances"] == [[19, 38, 20], [None, None, None]]
+
+
+def test_cancel_flag_stops_a_task(monkeypatch):
+    monkeypatch.setattr(workers, "_worker_flags", bytearray([0, 1]))
+    graph = GridGraph.from_rows(OPEN)
+    args = ([(0, 0), (19, 0)], [(0, 19), (19, 19), (10, 10)])
+    assert workers.run_task(1, many_to_many_steps, graph, args, 0, 0) is None
+    assert workers.run_task(0, many_to_many_steps, graph, args, 0, 0)["searches"] == 2
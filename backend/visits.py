@@ -0,0 +1,100 @@
+"""Compact encodings of a search's visit order for /solve responses.
+
+By default /solve returns visited as a JSON list of [row, col] pairs - one
+per expanded cell, so about a million of them for a flood of a 1000x1000
+grid, which costs more to build and serialize than the search itself and is
+far more than the frontend animates. A request can instead pick one of:
+
+    cells   [[row, col], ...], as before
+    delta   cell indices (row * cols + col) as a list whose first entry is
+            the first index and each later entry the difference from the
+            previous one - small numbers, as consecutive expansions are
+            usually close together
+    rle     runs of consecutive indices as a flat [start, length, start,
+            length, ...] list - compact for row-by-row floods
+    steps   for every cell of the grid, the step (1-based) at which it was
+            first expanded, 0 if never, as a base64 packed little-endian
+            array of the smallest unsigned type that fits ("dtype")
+    none    nothing; visited is an empty list
+
+Every format but steps can also be subsampled: with stride k only every
+k-th expansion is kept, and limit raises the stride as far as needed to
+keep at most that many. Anything but plain cells is returned as an object
+{"encoding", "count" (expansions before sampling), "stride", "data"}.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Union
+import base64
+
+import numpy as np
+
+from algorithms import GridGraph
+
+
+FORMATS = ("cells", "delta", "rle", "steps", "none")
+
+
+def stride_for(count: int, stride: int = 1, limit: Optional[int] = None) -> int:
+    """Sampling stride that keeps at most limit of count expansions."""
+    if limit:
+        stride = max(stride, -(-count // limit))
+    return stride
+
+
+def cell_indices(graph: GridGraph, indices: Union[array, np.ndarray]) -> np.ndarray:
+    """Flat GridGraph indices (padded, see grid.py) as int64 row * cols + col."""
+    if isinstance(indices, array):
+        indices = np.frombuffer(indices, dtype=np.int32) if len(indices) else np.empty(0, np.int32)
+    rows, cols = np.divmod(np.asarray(indices, dtype=np.int64), graph.width)
+    return (rows - 1) * graph.cols + cols - 1
+
+
+def encode(graph: GridGraph, visited: Union[array, np.ndarray], encoding: str,
+           stride: int = 1, limit: Optional[int] = None) -> Union[List, Dict]:
+    """Encode a visit order given as flat GridGraph indices.
+
+    Args:
+        graph: The graph the indices belong to
+        visited: Flat indices in order of expansion, e.g. the visited of a
+            search run on graph.index_view()
+        encoding: One of FORMATS
+        stride, limit: Subsampling (see the module docstring)
+    """
+    if encoding == "none":
+        return []
+    if isinstance(visited, array):
+        indices = np.frombuffer(visited, dtype=np.int32) if len(visited) else np.empty(0, np.int32)
+    else:
+        indices = np.asarray(visited)
+    count = len(indices)
+    if encoding == "steps":
+        stride = 1
+    else:
+        stride = stride_for(count, stride, limit)
+        indices = indices[::stride]
+    if encoding == "cells":
+        return graph.cells(indices)
+
+    cells = cell_indices(graph, indices)
+    encoded: Dict = {"encoding": encoding, "count": count, "stride": stride}
+    if encoding == "delta":
+        encoded["data"] = np.diff(cells, prepend=0).tolist()
+    elif encoding == "rle":
+        breaks = np.flatnonzero(np.diff(cells) != 1) + 1
+        starts = np.concatenate(([0], breaks))
+        lengths = np.diff(np.concatenate((starts, [len(cells)])))
+        encoded["data"] = np.column_stack((cells[starts], lengths)).ravel().tolist() if len(cells) else []
+    elif encoding == "steps":
+        dtype = np.uint8 if count < 1 << 8 else np.uint16 if count < 1 << 16 else np.uint32
+        steps = np.zeros(graph.rows * graph.cols, dtype=dtype)
+        # A cell can be expanded twice (e.g. once from each side of a
+        # bidirectional search); keep the first
+        unique, first = np.unique(cells, return_index=True)
+        steps[unique] = first + 1
+        encoded["dtype"] = np.dtype(dtype).name
+        encoded["data"] = base64.b64encode(steps.astype(np.dtype(dtype).newbyteorder("<")).tobytes()).decode()
+    else:
+        raise ValueError(f"Unknown visited encoding: {encoding}")
+    return encoded
+
@@ -0,0 +1,207 @@
+"""Compact binary wire format for POST /solve/binary.
+
+JSON grids cost megabytes of text and a million Pydantic int validations on
+a 1000x1000 grid. This format packs the grid into a bitset or run-length
+encoding and returns path and visited as flat little-endian int32 cell
+indices (row * cols + col).
+
+Request body (Content-Type: application/x-grid-request):
+
+    offset  type      field
+    0       4s        magic b"GSRQ"
+    4       u8        version (1)
+    5       u8        grid encoding: 0 = bitset, 1 = run-length
+    6       u8        algorithm code (index into ALGORITHMS)
+    7       u8        flags: bit 0 = vectorized
+    8       6 x u32   rows, cols, start row, start col, end row, end col
+    32      ...       grid payload
+
+    bitset      ceil(rows * cols / 8) bytes, row-major, least significant
+                bit first; a set bit is a wall
+    run-length  u32 run lengths alternating open, wall, open, ... starting
+                with an open run (which may be 0); runs sum to rows * cols
+
+Response body (Content-Type: application/x-grid-result):
+
+    offset  type      field
+    0       4s        magic b"GSRS"
+    4       u8        version (1)
+    5       u8        solved (0 or 1)
+    6       2x        padding
+    8       f64       time in seconds
+    16      3 x u32   nodes expanded, path length, visited length
+    28      i32[]     path cell indices, then visited cell indices
+
+All integers are little-endian.
+"""
+
+import struct
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from algorithms import GridGraph
+
+
+REQUEST_MEDIA_TYPE = "application/x-grid-request"
+RESPONSE_MEDIA_TYPE = "application/x-grid-result"
+
+VERSION = 1
+ENCODING_BITSET = 0
+ENCODING_RLE = 1
+FLAG_VECTORIZED = 0x01
+
+# Default upper bound on rows * cols of a decoded grid; the header is
+# checked against it before any payload is expanded
+MAX_CELLS = 4096 * 4096
+
+# Order is part of the format - append new algorithms, never reorder
+ALGORITHMS = ("BFS", "DFS", "Dijkstra", "A*", "Bidirectional BFS", "Jump Point Search", "HPA*",
+              "Bidirectional Dijkstra", "Bidirectional A*", "ALT")
+
+_REQUEST_HEADER = struct.Struct("<4sBBBB6I")
+_RESPONSE_HEADER = struct.Struct("<4sBB2xd3I")
+_REQUEST_MAGIC = b"GSRQ"
+_RESPONSE_MAGIC = b"GSRS"
+
+
+class WireFormatError(ValueError):
+    """Raised when a binary payload is malformed."""
+
+
+def _graph_from_walls(rows: int, cols: int, walls: np.ndarray) -> GridGraph:
+    """Build a GridGraph from a flat row-major uint8 wall array."""
+    padded = np.pad(walls.reshape(rows, cols), 1, constant_values=1)
+    return GridGraph(rows, cols, bytearray(padded.tobytes()))
+
+
+def decode_request(body: bytes, max_cells: int = MAX_CELLS) -> Dict:
+    """Parse a binary solve request.
+
+    Args:
+        body: The request body
+        max_cells: Largest rows * cols accepted
+
+    Returns:
+        Dictionary with algorithm, rows, cols, start, end (as (row, col)
+        tuples), vectorized and graph (a GridGraph built straight from the
+        payload, without ever materializing a 2D list)
+
+    Raises:
+        WireFormatError: If the header or payload is malformed, or the grid
+            has more than max_cells cells
+    """
+    if len(body) < _REQUEST_HEADER.size:
+        raise WireFormatError("Request is shorter than the header")
+    (magic, version, encoding, algorithm, flags,
+     rows, cols, start_row, start_col, end_row, end_col) = _REQUEST_HEADER.unpack_from(body)
+    if magic != _REQUEST_MAGIC:
+        raise WireFormatError("Bad magic number")
+    if version != VERSION:
+        raise WireFormatError(f"Unsupported version: {version}")
+    if algorithm >= len(ALGORITHMS):
+        raise WireFormatError(f"Unknown algorithm code: {algorithm}")
+    if rows == 0 or cols == 0:
+        raise WireFormatError("Grid must have at least one row and column")
+
+    cells = rows * cols
+    if cells > max_cells:
+        raise WireFormatError(f"Grid is limited to {max_cells} cells")
+    payload = memoryview(body)[_REQUEST_HEADER.size:]
+    if encoding == ENCODING_BITSET:
+        if len(payload) != (cells + 7) // 8:
+            raise WireFormatError("Bitset length does not match rows and cols")
+        bits = np.frombuffer(payload, dtype=np.uint8)
+        walls = np.unpackbits(bits, count=cells, bitorder="little")
+    elif encoding == ENCODING_RLE:
+        if len(payload) % 4:
+            raise WireFormatError("Run-length payload is not a whole number of u32 runs")
+        runs = np.frombuffer(payload, dtype="<u4").astype(np.int64)
+        if int(runs.sum()) != cells:
+            raise WireFormatError("Run lengths do not add up to rows * cols")
+        values = (np.arange(runs.size) & 1).astype(np.uint8)
+        walls = np.repeat(values, runs)
+    else:
+        raise WireFormatError(f"Unknown grid encoding: {encoding}")
+
+    return {
+        "algorithm": ALGORITHMS[algorithm],
+        "rows": rows,
+        "cols": cols,
+        "start": (start_row, start_col),
+        "end": (end_row, end_col),
+        "vectorized": bool(flags & FLAG_VECTORIZED),
+        "graph": _graph_from_walls(rows, cols, walls),
+    }
+
+
+def encode_request(algorithm: str, grid: Sequence[Sequence[int]],
+                   start: Tuple[int, int], end: Tuple[int, int],
+                   encoding: int = ENCODING_BITSET, vectorized: bool = False) -> bytes:
+    """Pack a solve request - the client-side counterpart of decode_request."""
+    walls = (np.asarray(grid) != 0).astype(np.uint8)
+    rows, cols = walls.shape
+    header = _REQUEST_HEADER.pack(
+        _REQUEST_MAGIC, VERSION, encoding, ALGORITHMS.index(algorithm),
+        FLAG_VECTORIZED if vectorized else 0,
+        rows, cols, start[0], start[1], end[0], end[1],
+    )
+    flat = walls.ravel()
+    if encoding == ENCODING_BITSET:
+        return header + np.packbits(flat, bitorder="little").tobytes()
+    if encoding == ENCODING_RLE:
+        # Run boundaries are where the value changes; a leading wall run
+        # needs an empty open run in front of it.
+        changes = np.flatnonzero(np.diff(flat)) + 1
+        bounds = np.concatenate(([0], changes, [flat.size]))
+        runs = np.diff(bounds)
+        if flat[0]:
+            runs = np.concatenate(([0], runs))
+        return header + runs.astype("<u4").tobytes()
+    raise ValueError(f"Unknown grid encoding: {encoding}")
+
+
+def _cell_indices(cells: Union[List[Tuple[int, int]], np.ndarray], cols: int) -> bytes:
+    """Flatten (row, col) tuples to little-endian int32 row * cols + col;
+    an array of such indices is only packed."""
+    if isinstance(cells, np.ndarray):
+        return cells.astype("<i4", copy=False).tobytes()
+    if not cells:
+        return b""
+    coords = np.asarray(cells, dtype=np.int64)
+    return (coords[:, 0] * cols + coords[:, 1]).astype("<i4").tobytes()
+
+
+def encode_response(response: Dict, cols: int) -> bytes:
+    """Pack a solve_graph-style response dict (stats, path, visited)."""
+    stats = response["stats"]
+    path, visited = response["path"], response["visited"]
+    header = _RESPONSE_HEADER.pack(
+        _RESPONSE_MAGIC, VERSION, 1 if stats["solved"] else 0, stats["time"],
+        stats["nodesExpanded"], len(path), len(visited),
+    )
+    return header + _cell_indices(path, cols) + _cell_indices(visited, cols)
+
+
+def decode_response(body: bytes) -> Dict:
+    """Unpack a binary solve response into stats plus path/visited index arrays."""
+    if len(body) < _RESPONSE_HEADER.size:
+        raise WireFormatError("Response is shorter than the header")
+    magic, version, solved, elapsed, nodes_expanded, path_length, visited_length = (
+        _RESPONSE_HEADER.unpack_from(body)
+    )
+    if magic != _RESPONSE_MAGIC:
+        raise WireFormatError("Bad magic number")
+    indices = np.frombuffer(body, dtype="<i4", offset=_RESPONSE_HEADER.size)
+    if indices.size != path_length + visited_length:
+        raise WireFormatError("Index arrays do not match the header lengths")
+    return {
+        "stats": {
+            "solved": bool(solved),
+            "time": elapsed,
+            "nodesExpanded": nodes_expanded,
+            "pathLength": path_length,
+        },
+        "path": indices[:path_length],
+        "visited": indices[path_length:],
+    }
@@ -0,0 +1,360 @@
+"""Process pool that runs searches outside the API process.
+
+Searches are CPU-bound pure Python, so running several at once on threads
+just contends for the GIL. The pool here is created lazily on first use,
+sized by the SEARCH_WORKERS environment variable (default: CPU count, at
+most 4), and shut down with the app.
+
+Grids are sent to workers as GridGraph objects, whose packed bytearray
+pickles far smaller than the List[List[int]] it came from, or - for large
+grids - as a SharedGraph naming a shared memory copy (see shm.py). Worker
+entry points take either and call resolve(), which maps a shared grid once
+per worker and keeps the last few mapped.
+
+Single searches go through submit(), which adds admission control and
+cancellation on top of the pool. Every admitted search holds a slot: there
+are pool_size() + SEARCH_QUEUE_LIMIT (default 32) of them, and one client
+may hold at most SEARCH_CLIENT_LIMIT (default 4). Each slot has a flag in
+an array shared with the workers; cancel() sets it and the search stops at
+its next check, every CHECK_INTERVAL expansions. The same checks enforce
+the search's time and expansion budgets. Other work on a grid (e.g.
+many-to-many distances) goes through submit_task(), which takes slots
+the same way and checks wherever the work pauses.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+
+from algorithms import GridGraph, shared
+from algorithms.shared import SharedGraph
+
+
+# Expansions between a running search's cancellation and budget checks
+CHECK_INTERVAL = 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Admission state, kept in the API process
+_cancel_flags = None  # multiprocessing RawArray of one byte per slot
+_free_slots: List[int] = []
+_client_slots: Dict[str, int] = {}
+_slot_jobs: Dict[int, Future] = {}  # slot -> future of the work holding it
+_slots_lock = threading.Lock()
+
+# Set in each worker process by _init_worker
+_worker_flags = None
+
+# Shared grids mapped by this worker: segment name -> (segment, GridGraph)
+_attached: "OrderedDict[str, tuple]" = OrderedDict()
+# Segments a worker keeps mapped. One the API process has since unlinked
+# lives on until it is unmapped here, so keep this small
+ATTACHED_LIMIT = 4
+
+
+class Rejected(Exception):
+    """A search was refused by admission control.
+
+    Attributes:
+        status_code: HTTP status to answer with - 429 when the client has
+            too many searches in flight, 503 when the server as a whole is
+            full or the pool is down
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def pool_size() -> int:
+    """Number of worker processes to start."""
+    configured = os.environ.get("SEARCH_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return min(4, os.cpu_count() or 1)
+
+
+def queue_limit() -> int:
+    """Number of admitted searches allowed to wait for a free worker."""
+    return max(0, int(os.environ.get("SEARCH_QUEUE_LIMIT", "32")))
+
+
+def client_limit() -> int:
+    """Number of searches one client may have admitted at once."""
+    return max(1, int(os.environ.get("SEARCH_CLIENT_LIMIT", "4")))
+
+
+def _init_worker(flags) -> None:
+    global _worker_flags
+    _worker_flags = flags
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared pool, starting it on first use."""
+    global _pool, _cancel_flags
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context("spawn")
+            if _cancel_flags is None:
+                # Slots outlive a pool restart, so the flags are made once
+                slots = pool_size() + queue_limit()
+                _cancel_flags = context.RawArray("b", slots)
+                _free_slots.extend(range(slots))
+            # spawn rather than fork: the API process runs threads (the
+            # server's and the threadpool's), which fork does not copy safely
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(_cancel_flags,),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the pool's worker processes, if it was ever started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def in_flight() -> int:
+    """Number of admitted searches that have not finished."""
+    with _slots_lock:
+        return sum(_client_slots.values())
+
+
+def _admit(client: str) -> int:
+    """Take a free slot for client, or raise Rejected."""
+    with _slots_lock:
+        held = _client_slots.get(client, 0)
+        if held >= client_limit():
+            raise Rejected(429, "Too many searches in flight for this client")
+        if not _free_slots:
+            raise Rejected(503, "Search queue is full")
+        _client_slots[client] = held + 1
+        return _free_slots.pop()
+
+
+def _release(slot: int, client: str) -> None:
+    with _slots_lock:
+        _slot_jobs.pop(slot, None)
+        _cancel_flags[slot] = 0
+        _free_slots.append(slot)
+        held = _client_slots.pop(client) - 1
+        if held:
+            _client_slots[client] = held
+
+
+def resolve(graph: Union[GridGraph, SharedGraph]) -> GridGraph:
+    """The GridGraph a worker was sent: graph itself, or the shared grid it
+    names mapped into this process."""
+    if not isinstance(graph, SharedGraph):
+        return graph
+    entry = _attached.get(graph.name)
+    if entry is None:
+        entry = _attached[graph.name] = shared.attach(graph)
+        while len(_attached) > ATTACHED_LIMIT:
+            segment, old = _attached.pop(next(iter(_attached)))
+            del old  # the graph's views of the segment must go before it is unmapped
+            try:
+                segment.close()
+            except BufferError:
+                pass  # still in use; unmapped once the last view is gone
+    else:
+        _attached.move_to_end(graph.name)
+    return shared.view(entry[1], graph)
+
+
+def submit(client: str, fn: Callable, steps: Callable, graph: Union[GridGraph, SharedGraph],
+           start: Tuple[int, int], end: Tuple[int, int], options: Dict,
+           max_seconds: float = 0, max_expansions: int = 0,
+           trace_memory: bool = False) -> Tuple[Future, int]:
+    """Admit a search for client and queue it on the pool.
+
+    Args:
+        client: Key the per-client limit is counted under
+        fn, steps: The algorithm (e.g. bfs.bfs) and its generator version
+            (bfs.bfs_steps); both must be module-level functions
+        graph, start, end: As for the algorithm; graph may also be a
+            SharedGraph (see resolve)
+        options: Keyword arguments for fn and steps (e.g. record);
+            vectorized searches run fn in one call, so cancellation and
+            budgets do not apply to them
+        max_seconds, max_expansions: Budgets (see run_search); 0 is unlimited
+        trace_memory: See run_search
+
+    Returns:
+        The future of run_search's result and its slot, both to pass to cancel()
+
+    Raises:
+        Rejected: If the search is not admitted or the pool is broken
+    """
+    return _queue(client, run_search, fn, steps, graph, start, end, options,
+                  max_seconds, max_expansions, trace_memory)
+
+
+def submit_task(client: str, steps: Callable, graph: Union[GridGraph, SharedGraph], args: Tuple,
+                max_seconds: float = 0, max_expansions: int = 0) -> Tuple[Future, int]:
+    """Admit other work on a grid for client and queue it on the pool.
+
+    Args:
+        client: As for submit
+        steps: Module-level generator function, called as steps(graph,
+            *args), that yields the cells expanded by each piece of its
+            work and stops early when sent True (e.g.
+            distances.many_to_many_steps)
+        graph: As for submit
+        max_seconds, max_expansions: Budgets (see run_task); 0 is unlimited
+
+    Returns:
+        The future of run_task's result and its slot, both to pass to cancel()
+
+    Raises:
+        Rejected: If the work is not admitted or the pool is broken
+    """
+    return _queue(client, run_task, steps, graph, args, max_seconds, max_expansions)
+
+
+def _queue(client: str, entry: Callable, *args: Any) -> Tuple[Future, int]:
+    """Take a slot for client and run entry(slot, *args) on the pool."""
+    pool = get_pool()
+    slot = _admit(client)
+    try:
+        future = pool.submit(entry, slot, *args)
+    except (BrokenProcessPool, RuntimeError):
+        _release(slot, client)
+        # Drop the dead pool so the next search starts a fresh one
+        shutdown_pool()
+        raise Rejected(503, "Search workers are unavailable")
+    with _slots_lock:
+        _slot_jobs[slot] = future
+    future.add_done_callback(lambda _: _release(slot, client))
+    return future, slot
+
+
+def cancel(slot: int, future: Future) -> None:
+    """Ask the search holding slot, whose future is future, to stop at its
+    next check.
+
+    The slot is freed once the worker has actually let go of it. If that
+    has already happened the slot may be another search's by now, so this
+    does nothing.
+    """
+    with _slots_lock:
+        if _slot_jobs.get(slot) is future:
+            _cancel_flags[slot] = 1
+
+
+def run_search(slot: int, fn: Callable, steps: Callable, graph: Union[GridGraph, SharedGraph],
+               start: Tuple[int, int], end: Tuple[int, int], options: Dict,
+               max_seconds: float, max_expansions: int, trace_memory: bool) -> Optional[Dict]:
+    """Worker-side entry point for submit(): run one search under its budgets.
+
+    The search is driven through its generator, checking the slot's cancel
+    flag and the budgets every CHECK_INTERVAL expansions (or every
+    max_expansions, if that is smaller).
+
+    Args:
+        max_seconds: Stop after this much search time; 0 is unlimited
+        max_expansions: Stop after this many expansions; 0 is unlimited
+        trace_memory: Run under tracemalloc and add peak_memory_bytes to
+            the result's profile
+
+    Returns:
+        The algorithm's result dict, or None if the search was cancelled.
+        A search stopped by a budget returns found=False, an empty path,
+        the cells visited so far and budget_exceeded=True.
+    """
+    graph = resolve(graph)
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        if options.get("vectorized"):
+            result = fn(graph, start, end, **options)
+        else:
+            result = _run_budgeted(slot, steps, graph, start, end, max_seconds, max_expansions, options)
+        if trace_memory and result is not None:
+            result["profile"]["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        return result
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+
+def _run_budgeted(slot: int, steps: Callable, graph: GridGraph, start: Tuple[int, int],
+                  end: Tuple[int, int], max_seconds: float, max_expansions: int,
+                  options: Optional[Dict] = None) -> Optional[Dict]:
+    options = options or {}
+    interval = min(CHECK_INTERVAL, max_expansions) if max_expansions else CHECK_INTERVAL
+    search = steps(graph, start, end, batch_size=interval, **options)
+    # Without a visit order to count, every batch stands for interval
+    # expansions (HPA* batches can be larger, so its count is a lower bound)
+    record = options.get("record", True)
+    expanded = 0
+    # (row, col) tuples, or flat indices on an index_view()
+    visited = graph.cells(())
+    began = time.perf_counter_ns()
+    deadline = began + int(max_seconds * 1e9) if max_seconds else 0
+    try:
+        while True:
+            batch = next(search)
+            visited.extend(batch)
+            expanded += len(batch) if record else interval
+            if _worker_flags is not None and _worker_flags[slot]:
+                search.close()
+                return None
+            if ((max_expansions and expanded >= max_expansions)
+                    or (deadline and time.perf_counter_ns() >= deadline)):
+                search.close()
+                elapsed_ns = time.perf_counter_ns() - began
+                return {
+                    "found": False,
+                    "time_taken": elapsed_ns / 1e9,
+                    "nodes_expanded": expanded,
+                    "path": [],
+                    "path_cost": 0,
+                    "visited": visited,
+                    "profile": {"search_ns": elapsed_ns, "path_ns": 0},
+                    "budget_exceeded": True,
+                }
+    except StopIteration as done:
+        result = done.value
+    if visited:
+        result["visited"] = visited + result["visited"]
+    return result
+
+
+def run_task(slot: int, steps: Callable, graph: Union[GridGraph, SharedGraph], args: Tuple,
+             max_seconds: float, max_expansions: int) -> Optional[Any]:
+    """Worker-side entry point for submit_task().
+
+    The slot's cancel flag and the budgets are checked each time the work
+    pauses; once a budget is spent, the work is told to stop.
+
+    Returns:
+        What steps returns, or None if the work was cancelled
+    """
+    task = steps(resolve(graph), *args)
+    deadline = time.perf_counter_ns() + int(max_seconds * 1e9) if max_seconds else 0
+    try:
+        expanded = next(task)
+        while True:
+            if _worker_flags is not None and _worker_flags[slot]:
+                task.close()
+                return None
+            spent = bool((max_expansions and expanded >= max_expansions)
+                         or (deadline and time.perf_counter_ns() >= deadline))
+            expanded += task.send(spent)
+    except StopIteration as done:
+        return done.value
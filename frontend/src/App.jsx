@@ -15,6 +15,7 @@ function App() {
       end,
       rows: settings.rows,
       cols: settings.cols,
+      connectivity: settings.connectivity,
     };
 
     // Reset visualization before solving
@@ -94,6 +95,7 @@ function App() {
     algorithm: "A*",
     rows: 50,
     cols: 50,
+    connectivity: 4,
   });
 
   const [stats, setStats] = useState({
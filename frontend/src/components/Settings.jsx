@@ -6,6 +6,11 @@ function Settings({ settings, setSettings, onSolve, stats, onResetWalls }) {
     setSettings((prev) => ({ ...prev, algorithm: value }));
   };
 
+  const handleConnectivityChange = (e) => {
+    const value = Number(e.target.value);
+    setSettings((prev) => ({ ...prev, connectivity: value }));
+  };
+
   return (
     <div className="w-64 md:w-1/5 lg:w-1/6 min-w-[200px] bg-neutral-900 p-6 border-r border-gray-700 flex flex-col justify-between">
       
@@ -24,8 +29,25 @@ function Settings({ settings, setSettings, onSolve, stats, onResetWalls }) {
               <option>A*</option>
               <option>Bidirectional BFS</option>
               <option>Dijkstra</option>
+              <option>Bidirectional Dijkstra</option>
+              <option>Bidirectional A*</option>
+              <option>ALT</option>
               <option>BFS</option>
               <option>DFS</option>
+              <option>Jump Point Search</option>
+              <option>HPA*</option>
+            </select>
+          </label>
+
+          <label className="text-gray-200 font-medium">
+            Movement:
+            <select
+              value={settings.connectivity}
+              onChange={handleConnectivityChange}
+              className="mt-1 w-full p-2 rounded-md bg-neutral-800 text-white border border-gray-600 focus:outline-none focus:ring-2 focus:ring-blue-400"
+            >
+              <option value={4}>4-directional</option>
+              <option value={8}>8-directional (diagonals)</option>
             </select>
           </label>
 